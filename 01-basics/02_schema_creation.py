@@ -1,171 +1,34 @@
-import requests
+import argparse
+import copy
 import json
 import os
+import sys
+from datetime import datetime
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
-class WeaviateClient:
-    def __init__(self):
-        self.weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-        self.headers = {"Content-Type": "application/json"}
-
-    def create_class(self, class_definition):
-        """创建数据类"""
-        url = f"{self.weaviate_url}/v1/schema"
-        response = requests.post(url, json=class_definition, headers=self.headers)
-        return response
-
-    def list_classes(self):
-        """列出所有数据类"""
-        url = f"{self.weaviate_url}/v1/schema"
-        response = requests.get(url)
-        return response
-
-    def delete_class(self, class_name):
-        """删除数据类"""
-        url = f"{self.weaviate_url}/v1/schema/{class_name}"
-        response = requests.delete(url)
-        return response
+# 将项目根目录加入模块搜索路径，以便导入 utils / config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.schema_definitions import ARTICLE_CLASS, MOVIE_CLASS, SCHEMA
+from config.weaviate_config import config
+from utils.bulk_delete import BulkDeleter
+from utils.embedding import ClientVectorizer, create_embedder
+from utils.query_builder import Filter
+from utils.reindex import Reindexer
+from utils.schema import SchemaRegistry
+from utils.weaviate_client import WeaviateClient
+
 
 def create_movie_schema():
-    """创建电影数据 Schema"""
-    movie_class = {
-        "class": "Movie",
-        "description": "电影信息数据",
-        "vectorizer": "text2vec-ollama",
-        "moduleConfig": {
-            "text2vec-ollama": {
-                "model": "bge-m3",
-                "apiEndpoint": "http://192.168.1.4:11434"
-            }
-        },
-        "properties": [
-            {
-                "name": "title",
-                "dataType": ["text"],
-                "description": "电影标题",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": False,
-                        "vectorizePropertyName": False
-                    }
-                }
-            },
-            {
-                "name": "description",
-                "dataType": ["text"],
-                "description": "电影简介",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": False,
-                        "vectorizePropertyName": False
-                    }
-                }
-            },
-            {
-                "name": "year",
-                "dataType": ["int"],
-                "description": "上映年份",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            },
-            {
-                "name": "genre",
-                "dataType": ["text"],
-                "description": "电影类型",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            },
-            {
-                "name": "rating",
-                "dataType": ["number"],
-                "description": "评分 (0-10)",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            }
-        ]
-    }
-    return movie_class
+    """创建电影数据 Schema（定义见 config/schema_definitions.py）"""
+    return copy.deepcopy(MOVIE_CLASS)
 
 def create_article_schema():
-    """创建文章数据 Schema"""
-    article_class = {
-        "class": "Article",
-        "description": "新闻文章数据",
-        "vectorizer": "text2vec-ollama",
-        "moduleConfig": {
-            "text2vec-ollama": {
-                "model": "bge-m3",
-                "apiEndpoint": "http://192.168.1.4:11434"
-            }
-        },
-        "properties": [
-            {
-                "name": "title",
-                "dataType": ["text"],
-                "description": "文章标题",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": False,
-                        "vectorizePropertyName": False
-                    }
-                }
-            },
-            {
-                "name": "content",
-                "dataType": ["text"],
-                "description": "文章内容",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": False,
-                        "vectorizePropertyName": False
-                    }
-                }
-            },
-            {
-                "name": "author",
-                "dataType": ["text"],
-                "description": "作者",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            },
-            {
-                "name": "publishDate",
-                "dataType": ["date"],
-                "description": "发布日期",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            },
-            {
-                "name": "category",
-                "dataType": ["text"],
-                "description": "文章分类",
-                "moduleConfig": {
-                    "text2vec-ollama": {
-                        "skip": True
-                    }
-                }
-            }
-        ]
-    }
-    return article_class
+    """创建文章数据 Schema（定义见 config/schema_definitions.py）"""
+    return copy.deepcopy(ARTICLE_CLASS)
 
 def test_create_schema():
     """测试创建 Schema"""
@@ -242,8 +105,110 @@ def clean_existing_schema():
             else:
                 print(f"   [X] {class_name} 删除失败: {delete_response.status_code}")
 
+def print_delete_stats(stats, verbose=False):
+    """输出批量删除结果"""
+    print(f"   {stats.class_name}: 匹配 {stats.matched} 个, 已删除 {stats.deleted} 个, 失败 {stats.failed} 个 "
+          f"({stats.requests} 个请求)")
+    if verbose:
+        for obj in stats.objects[:20]:
+            print(f"     - {obj['id']} {obj.get('status', '')} {obj.get('errors') or ''}".rstrip())
+        if len(stats.objects) > 20:
+            print(f"     ... 共 {len(stats.objects)} 个对象")
+    if stats.dry_run:
+        print("   (dry-run，未删除任何对象)")
+
+def truncate_classes(dry_run=False):
+    """清空数据但保留 Schema（代替删除数据类后重新创建）"""
+    client = WeaviateClient()
+    deleter = BulkDeleter(client)
+
+    print("\n清空数据类（保留 Schema）...")
+    for definition in SCHEMA:
+        try:
+            stats = deleter.truncate(definition["class"], dry_run=dry_run)
+        except RuntimeError as e:
+            print(f"   [X] {e}")
+            continue
+        print_delete_stats(stats)
+
+def purge_articles(before, dry_run=False, verbose=False):
+    """删除发布日期早于 before 的文章（一个批量删除请求，不需要先导出）"""
+    client = WeaviateClient()
+    where = Filter.by_property("publishDate").less_than(before)
+
+    print(f"\n删除 {before:%Y-%m-%d %H:%M:%S} 之前发布的文章...")
+    try:
+        stats = BulkDeleter(client).delete("Article", where, dry_run=dry_run, verbose=verbose)
+    except RuntimeError as e:
+        print(f"   [X] {e}")
+        return
+    print_delete_stats(stats, verbose)
+
+def migrate_schema(dry_run=False):
+    """增量迁移：只创建缺失的数据类和属性，已有数据保持不变"""
+    client = WeaviateClient()
+    registry = SchemaRegistry(client)
+
+    print("\n比较 Schema 差异...")
+    try:
+        diff = registry.migrate(SCHEMA, dry_run=dry_run)
+    except RuntimeError as e:
+        print(f"   [X] 迁移失败: {e}")
+        return
+    for line in str(diff).splitlines():
+        print(f"   {line}")
+
+    if diff.is_empty:
+        print("   [OK] 无需变更")
+    elif dry_run:
+        print("   (dry-run，未执行任何变更)")
+    else:
+        print("   [OK] 迁移完成")
+    if diff.conflicts:
+        print("   [!] 存在冲突，需要使用 --reset 重建（会删除数据）")
+
+def reindex_class(class_name, drop_source=False):
+    """零停机重建：按新定义创建影子数据类，复制数据后切换别名"""
+    definitions = {definition["class"]: definition for definition in SCHEMA}
+    if class_name not in definitions:
+        print(f"   [X] 未找到 {class_name} 的定义")
+        return
+
+    client = WeaviateClient()
+    vectorizer = None
+    if config.get_import_config()["client_embedding"]:
+        vectorizer = ClientVectorizer(create_embedder(), definitions[class_name])
+
+    print(f"\n重建 {class_name}（影子数据类 + 别名切换，可中断后继续）...")
+    reindexer = Reindexer(client, class_name, definitions[class_name],
+                          batch_size=config.get_import_config()["batch_size"],
+                          vectorizer=vectorizer, drop_source=drop_source)
+    try:
+        state = reindexer.run()
+    except RuntimeError as e:
+        print(f"   [X] {e}")
+        return
+    print(f"   [OK] {class_name} -> {state['target']}（复制 {state['copied']} 个对象）")
+    if state.get("previous"):
+        print(f"   旧数据类 {state['previous']} 仍然保留，确认无误后可手动删除")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Weaviate Schema 创建 / 迁移")
+    parser.add_argument("--reset", action="store_true", help="删除所有数据类后重新创建（会清空数据）")
+    parser.add_argument("--dry-run", action="store_true", help="只显示差异 / 匹配数量，不执行变更")
+    parser.add_argument("--truncate", action="store_true", help="清空所有数据类的对象，保留 Schema")
+    parser.add_argument("--purge-articles-before", metavar="DATE", type=datetime.fromisoformat,
+                        help="删除发布日期早于 DATE（如 2024-01-01）的文章")
+    parser.add_argument("--verbose", action="store_true", help="批量删除时列出每个对象的结果")
+    parser.add_argument("--reindex", metavar="CLASS", help="零停机重建指定数据类（影子数据类 + 别名切换）")
+    parser.add_argument("--drop-source", action="store_true",
+                        help="首次 --reindex 时允许删除同名的原数据类以创建别名")
+    return parser.parse_args()
+
 def main():
     """主函数"""
+    args = parse_args()
+
     print("=" * 60)
     print("Weaviate Schema 创建测试")
     print("=" * 60)
@@ -257,14 +222,27 @@ def main():
     # 1. 列出现有的 Schema
     list_existing_schema()
 
-    # 2. 自动清理现有数据
-    print("\n自动清理现有数据类...")
-    clean_existing_schema()
+    if args.truncate or args.purge_articles_before:
+        # 2. 按条件批量删除数据（Schema 不变）
+        if args.truncate:
+            truncate_classes(dry_run=args.dry_run)
+        if args.purge_articles_before:
+            purge_articles(args.purge_articles_before, dry_run=args.dry_run, verbose=args.verbose)
+        return
 
-    # 3. 创建新的 Schema
-    test_create_schema()
+    if args.reindex:
+        # 2. 零停机重建
+        reindex_class(args.reindex, drop_source=args.drop_source)
+    elif args.reset:
+        # 2. 清理现有数据后重新创建
+        print("\n清理现有数据类（--reset）...")
+        clean_existing_schema()
+        test_create_schema()
+    else:
+        # 2. 增量迁移（默认）
+        migrate_schema(dry_run=args.dry_run)
 
-    # 4. 再次列出 Schema 确认创建结果
+    # 3. 再次列出 Schema 确认创建结果
     print("\n" + "=" * 60)
     print("创建结果确认:")
     list_existing_schema()
@@ -276,4 +254,4 @@ def main():
     print("   3. 运行 05_vector_search.py 体验向量搜索")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
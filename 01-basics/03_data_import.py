@@ -1,6 +1,7 @@
-import requests
+import argparse
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 import random
 from dotenv import load_dotenv
@@ -8,48 +9,21 @@ from dotenv import load_dotenv
 # 加载环境变量
 load_dotenv()
 
-class WeaviateClient:
-    def __init__(self):
-        self.weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-        self.headers = {"Content-Type": "application/json"}
-
-    def create_object(self, class_name, data_object):
-        """创建单个对象"""
-        url = f"{self.weaviate_url}/v1/objects"
-        payload = {
-            "class": class_name,
-            "properties": data_object
-        }
-        response = requests.post(url, json=payload, headers=self.headers)
-        return response
-
-    def batch_create_objects(self, objects):
-        """批量创建对象"""
-        url = f"{self.weaviate_url}/v1/batch/objects"
-        payload = {"objects": objects}
-        response = requests.post(url, json=payload, headers=self.headers)
-        return response
-
-    def get_object_count(self, class_name):
-        """获取对象数量"""
-        url = f"{self.weaviate_url}/v1/objects"
-        params = {"class": class_name, "limit": 1}
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('totalResults', 0)
-        return 0
+# 将项目根目录加入模块搜索路径，以便导入 utils / config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.schema_definitions import NATURAL_KEYS
+from config.weaviate_config import config
+from utils.batch_importer import BatchImporter, ConcurrentBatchImporter
+from utils.data_loader import load_objects, read_records
+from utils.delta_sync import ChangeLogSource, DeltaSync, UpdatedAtSource
+from utils.embedding import ClientVectorizer, create_embedder
+from utils.partial_update import PartialUpdater
+from utils.resumable_import import ResumableImport
+from utils.schema import fetch_class_definition
+from utils.upsert import upsert_objects
+from utils.weaviate_client import WeaviateClient
 
-    def list_objects(self, class_name, limit=10):
-        """列出对象"""
-        url = f"{self.weaviate_url}/v1/objects"
-        params = {
-            "class": class_name,
-            "limit": limit,
-            "include": ["vector"]
-        }
-        response = requests.get(url, params=params)
-        return response
 
 def generate_movie_data():
     """生成电影测试数据"""
@@ -115,7 +89,8 @@ def generate_movie_data():
 
 def generate_article_data():
     """生成文章测试数据"""
-    base_date = datetime.now() - timedelta(days=365)
+    # 固定日期：内容不变时重复导入会被识别为“未变化”而跳过
+    base_date = datetime(2024, 1, 1)
 
     articles = [
         {
@@ -163,41 +138,175 @@ def generate_article_data():
     ]
     return articles
 
+def print_import_errors(stats):
+    """打印导入失败的对象"""
+    for error in stats.errors:
+        title = (error.get('properties') or {}).get('title', 'N/A')
+        print(f"   [X] 失败: {title} - {error['message']}")
+
+def create_importer(client):
+    """根据导入配置创建导入器（IMPORT_CONCURRENCY > 1 时并发导入）"""
+    import_config = config.get_import_config()
+    if import_config["concurrency"] > 1:
+        return ConcurrentBatchImporter(
+            client,
+            batch_size=import_config["batch_size"],
+            max_concurrency=import_config["concurrency"],
+            adaptive=import_config["adaptive"],
+        )
+    return BatchImporter(client, batch_size=import_config["batch_size"])
+
+def load_class_definition(client, class_name):
+    """获取数据类定义（重建后 class_name 是别名时取它指向的数据类），失败时返回 None"""
+    try:
+        return fetch_class_definition(client, class_name)
+    except RuntimeError as e:
+        print(f"   [X] {e}")
+        print("   请先运行 02_schema_creation.py 创建 Schema")
+        return None
+
+def create_vectorizer(client, class_name, class_definition=None):
+    """CLIENT_EMBEDDING=true 时创建客户端向量化器，否则返回 None（由 Weaviate 向量化）"""
+    if not config.get_import_config()["client_embedding"]:
+        return None
+
+    if class_definition is None:
+        try:
+            class_definition = fetch_class_definition(client, class_name)
+        except RuntimeError as e:
+            print(f"   [X] {e}，改由服务端向量化")
+            return None
+
+    print(f"   客户端向量化: {config.ollama_model} @ {config.ollama_api_endpoint}")
+    return ClientVectorizer(create_embedder(), class_definition)
+
+def import_records(client, class_name, records, vectorizer, key_fields=None):
+    """按自然键幂等导入：未变化的记录跳过，新增和变化的记录批量写入（upsert）"""
+    key_fields = key_fields or NATURAL_KEYS[class_name]
+    with create_importer(client) as importer:
+        upsert = upsert_objects(importer, class_name, records, key_fields, vectorizer)
+    stats = importer.stats
+    print_import_errors(stats)
+    print(f"   新增 {upsert.created} 条, 更新 {upsert.updated} 条, 未变化跳过 {upsert.unchanged} 条 "
+          f"(自然键: {', '.join(key_fields)})")
+    return stats, upsert
+
 def import_movies(client):
     """导入电影数据"""
     print("\n导入电影数据...")
     movies = generate_movie_data()
+    vectorizer = create_vectorizer(client, "Movie")
 
-    success_count = 0
-    for movie in movies:
-        response = client.create_object("Movie", movie)
-        if response.status_code == 200:
-            success_count += 1
-            print(f"   [OK] 导入: {movie['title']}")
-        else:
-            print(f"   [X] 失败: {movie['title']} - {response.status_code}")
+    stats, upsert = import_records(client, "Movie", movies, vectorizer)
 
-    print(f"\n电影导入完成: {success_count}/{len(movies)} 成功")
-    return success_count
+    print(f"\n电影导入完成: {stats.succeeded}/{stats.added} 成功 ({stats.batches} 个批次)")
+    return stats.succeeded + upsert.unchanged
 
 def import_articles(client):
     """导入文章数据"""
     print("\n导入文章数据...")
     articles = generate_article_data()
+    vectorizer = create_vectorizer(client, "Article")
 
-    success_count = 0
-    for article in articles:
-        response = client.create_object("Article", article)
-        if response.status_code == 200:
-            success_count += 1
-            print(f"   [OK] 导入: {article['title']}")
-        else:
-            print(f"   [X] 失败: {article['title']} - {response.status_code}")
-            if response.text:
-                print(f"     错误: {response.text}")
+    stats, upsert = import_records(client, "Article", articles, vectorizer)
+
+    print(f"\n文章导入完成: {stats.succeeded}/{stats.added} 成功 ({stats.batches} 个批次)")
+    return stats.succeeded + upsert.unchanged
+
+def import_from_file(client, class_name, path, key_fields=None):
+    """从 JSONL / CSV / Parquet 文件流式导入数据
 
-    print(f"\n文章导入完成: {success_count}/{len(articles)} 成功")
-    return success_count
+    列名按 02_schema_creation.py 中定义的属性映射并做类型转换，
+    文件逐行读取，内存占用与文件大小无关。
+    """
+    print(f"\n从文件导入 {class_name} 数据: {path}")
+    class_definition = load_class_definition(client, class_name)
+    if class_definition is None:
+        return 0
+
+    objects = load_objects(path, class_definition)
+    vectorizer = create_vectorizer(client, class_name, class_definition)
+    stats, upsert = import_records(client, class_name, objects, vectorizer, key_fields)
+
+    print(f"\n{class_name} 导入完成: {stats.succeeded}/{stats.added} 成功 "
+          f"({stats.batches} 个批次, {stats.objects_per_second:.0f} 条/秒)")
+    return stats.succeeded + upsert.unchanged
+
+def resumable_import_from_file(client, class_name, path, key_fields=None, restart=False):
+    """可续传导入：待写入的批次先暂存到本地，检查点记录源文件偏移，中断后重新运行从断点继续"""
+    print(f"\n可续传导入 {class_name}: {path}")
+    class_definition = load_class_definition(client, class_name)
+    if class_definition is None:
+        return 0
+
+    job = ResumableImport(
+        client, class_definition, path, key_fields or NATURAL_KEYS[class_name],
+        vectorizer=create_vectorizer(client, class_name, class_definition),
+        batch_size=config.get_import_config()["batch_size"],
+    )
+    if restart:
+        job.reset()
+
+    try:
+        state = job.run()
+    except (RuntimeError, ValueError) as e:
+        print(f"   [X] 导入中断: {e}")
+        return 0
+
+    print(f"\n{class_name} 导入完成: 写入 {state['succeeded']} 个, 未变化跳过 {state['unchanged']} 个 "
+          f"({state['acked']} 个批次)")
+    return state["succeeded"] + state["unchanged"]
+
+def sync_from_file(client, class_name, path, args, key_fields=None):
+    """增量同步：只处理水位线之后变化的行（更新时间列或变更日志），支持删除"""
+    print(f"\n增量同步 {class_name}: {path} ({args.sync})")
+    class_definition = load_class_definition(client, class_name)
+    if class_definition is None:
+        return 0
+
+    if args.sync == "changelog":
+        source = ChangeLogSource(path)
+    else:
+        source = UpdatedAtSource(path, column=args.updated_column, deleted_column=args.deleted_column)
+    sync = DeltaSync(
+        client, class_definition, source, key_fields or NATURAL_KEYS[class_name],
+        vectorizer=create_vectorizer(client, class_name, class_definition),
+        batch_size=config.get_import_config()["batch_size"],
+    )
+    if args.reset_watermark:
+        sync.reset()
+
+    try:
+        previous = sync.load_state()["watermark"]
+        stats = sync.run()
+    except (RuntimeError, ValueError) as e:
+        print(f"   [X] 同步失败: {e}")
+        return 0
+
+    print(f"   水位线: {previous} -> {stats.watermark}")
+    print(f"   变更 {stats.changes} 条: 新增 {stats.created}, 更新 {stats.updated}, "
+          f"未变化 {stats.unchanged}, 删除 {stats.deleted}")
+    return stats.changes
+
+def patch_from_file(client, class_name, path, key_fields=None):
+    """局部更新：文件中每行是自然键 + 要修改的非向量化属性（如评分、分类），不会触发重新向量化"""
+    print(f"\n局部更新 {class_name}: {path}")
+    class_definition = load_class_definition(client, class_name)
+    if class_definition is None:
+        return 0
+
+    updater = PartialUpdater(client, class_definition, key_fields or NATURAL_KEYS[class_name],
+                             concurrency=config.get_import_config()["concurrency"])
+    try:
+        stats = updater.update_records(read_records(path))
+    except ValueError as e:
+        print(f"   [X] 局部更新失败: {e}")
+        return 0
+
+    print(f"   已更新 {stats.patched}, 未变化 {stats.unchanged}, 对象不存在 {stats.missing}, 失败 {stats.failed}")
+    for error in stats.errors[:3]:
+        print(f"   [X] {error['id']}: {error['message']}")
+    return stats.patched
 
 def verify_import(client):
     """验证导入结果"""
@@ -231,8 +340,32 @@ def verify_import(client):
                 props = obj.get('properties', {})
                 print(f"   - {props.get('title', 'N/A')} - {props.get('author', 'N/A')} - {props.get('category', 'N/A')}")
 
+def parse_args():
+    """解析命令行参数（不指定文件时导入内置示例数据）"""
+    parser = argparse.ArgumentParser(description="Weaviate 数据导入")
+    parser.add_argument("--movies", help="电影数据文件（.jsonl / .csv / .parquet）")
+    parser.add_argument("--articles", help="文章数据文件（.jsonl / .csv / .parquet）")
+    parser.add_argument("--movie-key", nargs="+", help="电影的自然键字段（默认 title year）")
+    parser.add_argument("--article-key", nargs="+", help="文章的自然键字段（默认 title author）")
+    parser.add_argument("--sync", choices=("updated-at", "changelog"),
+                        help="增量同步 --movies / --articles 指定的文件，只处理水位线之后的变化")
+    parser.add_argument("--updated-column", default="updatedAt", help="updated-at 模式的更新时间列")
+    parser.add_argument("--deleted-column", help="updated-at 模式的删除标记列（为真时删除对象）")
+    parser.add_argument("--reset-watermark", action="store_true", help="清除水位线，从头同步")
+    parser.add_argument("--resumable", action="store_true",
+                        help="可续传导入 --movies / --articles：批次暂存到本地并记录检查点，中断后重新运行从断点继续")
+    parser.add_argument("--restart-import", action="store_true", help="丢弃 --resumable 的检查点和暂存批次，从头导入")
+    parser.add_argument("--patch", action="store_true",
+                        help="只局部更新 --movies / --articles 文件中的非向量化属性（评分、分类等）")
+    args = parser.parse_args()
+    if args.sync and args.patch:
+        parser.error("--sync 和 --patch 不能同时使用")
+    return args
+
 def main():
     """主函数"""
+    args = parse_args()
+
     print("=" * 60)
     print("Weaviate 数据导入测试")
     print("=" * 60)
@@ -244,11 +377,39 @@ def main():
     # 创建客户端
     client = WeaviateClient()
 
+    # 增量同步 / 局部更新：只处理指定的文件
+    if args.sync or args.patch:
+        if not args.movies and not args.articles:
+            print(f"{'--sync' if args.sync else '--patch'} 需要配合 --movies 或 --articles 使用")
+            return
+        for class_name, path, key_fields in (("Movie", args.movies, args.movie_key),
+                                             ("Article", args.articles, args.article_key)):
+            if not path:
+                continue
+            if args.sync:
+                sync_from_file(client, class_name, path, args, key_fields)
+            else:
+                patch_from_file(client, class_name, path, key_fields)
+        verify_import(client)
+        return
+
     # 1. 导入电影数据
-    movie_success = import_movies(client)
+    if args.movies and args.resumable:
+        movie_success = resumable_import_from_file(client, "Movie", args.movies, args.movie_key,
+                                                   args.restart_import)
+    elif args.movies:
+        movie_success = import_from_file(client, "Movie", args.movies, args.movie_key)
+    else:
+        movie_success = import_movies(client)
 
     # 2. 导入文章数据
-    article_success = import_articles(client)
+    if args.articles and args.resumable:
+        article_success = resumable_import_from_file(client, "Article", args.articles, args.article_key,
+                                                     args.restart_import)
+    elif args.articles:
+        article_success = import_from_file(client, "Article", args.articles, args.article_key)
+    else:
+        article_success = import_articles(client)
 
     # 3. 验证导入结果
     verify_import(client)
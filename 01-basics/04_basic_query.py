@@ -1,103 +1,63 @@
-import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
-class WeaviateClient:
-    def __init__(self):
-        self.weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-        self.headers = {"Content-Type": "application/json"}
+# 将项目根目录加入模块搜索路径，以便导入 utils / config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    def graphql_query(self, query):
-        """GraphQL查询"""
-        response = requests.post(
-            f"{self.weaviate_url}/v1/graphql",
-            json={"query": query},
-            headers=self.headers
-        )
-        return response
+from utils.counting import ObjectCounter
+from utils.query_builder import Filter, GetQuery, Sort
+from utils.query_cache import create_query_cache
+from utils.weaviate_client import WeaviateClient
 
-    def get_objects_rest(self, class_name, limit=5, where_clause=None):
-        """REST查询对象"""
-        url = f"{self.weaviate_url}/v1/objects"
-        params = {"class": class_name, "limit": limit}
-
-        if where_clause:
-            params["where"] = where_clause
-
-        response = requests.get(url, params=params)
-        return response
 
 def demo_correct_counting(client):
     """演示正确的计数方法"""
     print("\n=== 正确的数据统计 ===")
 
-    # 使用GraphQL聚合查询
-    query = """
-    {
-      Aggregate {
-        Movie {
-          meta {
-            count
-          }
-        }
-        Article {
-          meta {
-            count
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        data = result.get('data', {})
-        aggregate = data.get('Aggregate', {})
-
-        movie_data = aggregate.get('Movie', [])
-        article_data = aggregate.get('Article', [])
+    # 使用 Aggregate 聚合查询：两个数据类的计数合并为一个请求
+    counter = ObjectCounter(client)
+    movie_count, article_count = counter.count_many(["Movie", "Article"])
+    if movie_count is None and article_count is None:
+        print("   [X] 查询失败")
+        return 0, 0
 
-        movie_count = movie_data[0].get('meta', {}).get('count', 0) if movie_data else 0
-        article_count = article_data[0].get('meta', {}).get('count', 0) if article_data else 0
+    movie_count = movie_count or 0
+    article_count = article_count or 0
+    print(f"   电影总数: {movie_count}")
+    print(f"   文章总数: {article_count}")
+    print(f"   数据总计: {movie_count + article_count}")
 
-        print(f"   电影总数: {movie_count}")
-        print(f"   文章总数: {article_count}")
-        print(f"   数据总计: {movie_count + article_count}")
+    return movie_count, article_count
 
-        return movie_count, article_count
-    else:
-        print(f"   [X] 查询失败: {response.status_code}")
-        return 0, 0
 
 def demo_movie_queries(client):
     """演示电影查询"""
     print("\n=== 电影查询演示 ===")
 
-    # 1. 查询所有电影（前5条，去重）
+    fields = ["title", "year", "rating", "genre"]
+    all_query = GetQuery("Movie", ["title", "year", "genre", "rating", "description"], limit=5)
+    scifi_query = GetQuery("Movie", fields, where=Filter.by_property("genre").equal("科幻"))
+    top_rated_query = GetQuery("Movie", fields, where=Filter.by_property("rating").greater_than(9.0))
+    recent_query = GetQuery("Movie", fields, where=Filter.by_property("year").greater_than(2000))
+    top_scifi_query = GetQuery(
+        "Movie", fields,
+        where=Filter.by_property("genre").equal("科幻") & Filter.by_property("rating").greater_than(8.5),
+    )
+
+    # 5 条查询互不依赖，并发发送：总耗时约等于最慢的一条，而不是 5 条之和
+    queries = [all_query, scifi_query, top_rated_query, recent_query, top_scifi_query]
+    responses = client.gather(queries)
+    all_response, scifi_response, top_rated_response, recent_response, top_scifi_response = responses
+
+    # 1. 查询所有电影（前5条；03_data_import.py 按自然键导入，重复运行不会产生重复数据）
     print("\n1. 查询电影数据（前5条）:")
-    query = """
-    {
-      Get {
-        Movie(limit: 5) {
-          title
-          year
-          genre
-          rating
-          description
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+    if all_response.status_code == 200:
+        movies = all_query.results(all_response)
 
         print(f"   找到 {len(movies)} 部电影:")
         for movie in movies:
@@ -108,27 +68,8 @@ def demo_movie_queries(client):
 
     # 2. 查询科幻电影
     print("2. 查询科幻电影:")
-    query = """
-    {
-      Get {
-        Movie(where: {
-          path: ["genre"]
-          operator: Equal
-          valueText: "科幻"
-        }) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+    if scifi_response.status_code == 200:
+        movies = scifi_query.results(scifi_response)
 
         print(f"   找到 {len(movies)} 部科幻电影:")
         for movie in movies:
@@ -136,27 +77,8 @@ def demo_movie_queries(client):
 
     # 3. 查询高评分电影
     print("\n3. 查询高评分电影（评分 > 9.0）:")
-    query = """
-    {
-      Get {
-        Movie(where: {
-          path: ["rating"]
-          operator: GreaterThan
-          valueNumber: 9.0
-        }) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+    if top_rated_response.status_code == 200:
+        movies = top_rated_query.results(top_rated_response)
 
         print(f"   找到 {len(movies)} 部高评分电影:")
         for movie in movies:
@@ -164,27 +86,8 @@ def demo_movie_queries(client):
 
     # 4. 查询2000年后的电影
     print("\n4. 查询2000年后的电影:")
-    query = """
-    {
-      Get {
-        Movie(where: {
-          path: ["year"]
-          operator: GreaterThan
-          valueInt: 2000
-        }) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+    if recent_response.status_code == 200:
+        movies = recent_query.results(recent_response)
 
         print(f"   找到 {len(movies)} 部2000年后的电影:")
         for movie in movies:
@@ -192,37 +95,8 @@ def demo_movie_queries(client):
 
     # 5. 查询高评分的科幻电影
     print("\n5. 查询高评分的科幻电影:")
-    query = """
-    {
-      Get {
-        Movie(where: {
-          operator: And
-          operands: [
-            {
-              path: ["genre"]
-              operator: Equal
-              valueText: "科幻"
-            },
-            {
-              path: ["rating"]
-              operator: GreaterThan
-              valueNumber: 8.5
-            }
-          ]
-        }) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+    if top_scifi_response.status_code == 200:
+        movies = top_scifi_query.results(top_scifi_response)
 
         print(f"   找到 {len(movies)} 部高评分科幻电影:")
         for movie in movies:
@@ -234,27 +108,14 @@ def demo_article_queries(client):
 
     # 1. 查询科技类文章
     print("\n1. 查询科技类文章:")
-    query = """
-    {
-      Get {
-        Article(where: {
-          path: ["category"]
-          operator: Equal
-          valueText: "科技"
-        }) {
-          title
-          author
-          category
-          publishDate
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Article", ["title", "author", "category", "publishDate"],
+        where=Filter.by_property("category").equal("科技"),
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        articles = result.get('data', {}).get('Get', {}).get('Article', [])
+        articles = query.results(response)
 
         print(f"   找到 {len(articles)} 篇科技文章:")
         for article in articles:
@@ -267,46 +128,30 @@ def demo_sorting_queries(client):
 
     # 1. 按评分降序
     print("\n1. 按评分降序查询电影（前3名）:")
-    query = """
-    {
-      Get {
-        Movie(sort: [{path: "rating", order: desc}], limit: 3) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "rating", "genre"],
+        sort=[Sort("rating", "desc")],
+        limit=3,
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         for i, movie in enumerate(movies, 1):
             print(f"   {i}. {movie.get('title', 'N/A')} - 评分: {movie.get('rating', 'N/A')}")
 
     # 2. 按年份升序
     print("\n2. 按年份升序查询电影（最早的3部）:")
-    query = """
-    {
-      Get {
-        Movie(sort: [{path: "year", order: asc}], limit: 3) {
-          title
-          year
-          rating
-          genre
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "rating", "genre"],
+        sort=[Sort("year", "asc")],
+        limit=3,
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         for i, movie in enumerate(movies, 1):
             print(f"   {i}. {movie.get('title', 'N/A')} ({movie.get('year', 'N/A')})")
@@ -321,8 +166,8 @@ def main():
     weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
     print(f"Weaviate URL: {weaviate_url}")
 
-    # 创建客户端
-    client = WeaviateClient()
+    # 创建客户端（QUERY_CACHE_ENABLED=true 时启用查询结果缓存）
+    client = WeaviateClient(query_cache=create_query_cache())
 
     # 1. 正确的数据统计
     movie_count, article_count = demo_correct_counting(client)
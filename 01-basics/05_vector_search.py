@@ -1,24 +1,19 @@
-import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
 # 加载环境变量
 load_dotenv()
 
-class WeaviateClient:
-    def __init__(self):
-        self.weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
-        self.headers = {"Content-Type": "application/json"}
+# 将项目根目录加入模块搜索路径，以便导入 utils / config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.federated_search import federated_search
+from utils.query_builder import Filter, GetQuery, NearText
+from utils.query_cache import create_query_cache
+from utils.weaviate_client import WeaviateClient
 
-    def graphql_query(self, query):
-        """GraphQL查询"""
-        response = requests.post(
-            f"{self.weaviate_url}/v1/graphql",
-            json={"query": query},
-            headers=self.headers
-        )
-        return response
 
 def demo_semantic_search(client):
     """演示语义搜索"""
@@ -26,33 +21,16 @@ def demo_semantic_search(client):
 
     # 1. 搜索"关于希望的电影"
     print("\n1. 语义搜索: '关于希望的电影'")
-    query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["希望", "勇气", "坚持"]
-            distance: 0.8
-          },
-          limit: 3
-        ) {
-          title
-          year
-          genre
-          rating
-          description
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre", "rating", "description"],
+        near=NearText(["希望", "勇气", "坚持"], distance=0.8),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -63,32 +41,16 @@ def demo_semantic_search(client):
 
     # 2. 搜索"关于人工智能的文章"
     print("\n2. 语义搜索: '关于人工智能的文章'")
-    query = """
-    {
-      Get {
-        Article(
-          nearText: {
-            concepts: ["人工智能", "AI技术", "机器学习"]
-            distance: 0.7
-          },
-          limit: 3
-        ) {
-          title
-          author
-          category
-          content
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Article", ["title", "author", "category", "content"],
+        near=NearText(["人工智能", "AI技术", "机器学习"], distance=0.7),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        articles = result.get('data', {}).get('Get', {}).get('Article', [])
+        articles = query.results(response)
 
         print(f"   找到 {len(articles)} 篇相关文章:")
         for article in articles:
@@ -99,32 +61,16 @@ def demo_semantic_search(client):
 
     # 3. 搜索"关于未来科技的科幻电影"
     print("\n3. 语义搜索: '关于未来科技的科幻电影'")
-    query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["未来", "科技", "虚拟现实", "人工智能"]
-            distance: 0.75
-          },
-          limit: 3
-        ) {
-          title
-          year
-          genre
-          description
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre", "description"],
+        near=NearText(["未来", "科技", "虚拟现实", "人工智能"], distance=0.75),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -139,43 +85,17 @@ def demo_hybrid_search(client):
 
     # 1. 搜索包含"教父"或相关的电影
     print("\n1. 混合搜索: 关键词 '黑帮' + 语义 '家族'")
-    query = """
-    {
-      Get {
-        Movie(
-          where: {
-            operator: Or
-            operands: [
-              {
-                path: ["title"]
-                operator: Like
-                valueText: "*教父*"
-              }
-            ]
-          },
-          nearText: {
-            concepts: ["家族", "权力", "犯罪"]
-            distance: 0.8
-          },
-          limit: 3
-        ) {
-          title
-          year
-          genre
-          rating
-          description
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre", "rating", "description"],
+        where=Filter.any_of([Filter.by_property("title").like("*教父*")]),
+        near=NearText(["家族", "权力", "犯罪"], distance=0.8),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -185,48 +105,17 @@ def demo_hybrid_search(client):
 
     # 2. 搜索高评分的动画电影
     print("\n2. 混合搜索: 条件过滤 + 语义搜索")
-    query = """
-    {
-      Get {
-        Movie(
-          where: {
-            operator: And
-            operands: [
-              {
-                path: ["rating"]
-                operator: GreaterThan
-                valueNumber: 8.5
-              },
-              {
-                path: ["genre"]
-                operator: Equal
-                valueText: "动画"
-              }
-            ]
-          },
-          nearText: {
-            concepts: ["冒险", "成长", "魔法"]
-            distance: 0.7
-          },
-          limit: 3
-        ) {
-          title
-          year
-          genre
-          rating
-          description
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre", "rating", "description"],
+        where=Filter.by_property("rating").greater_than(8.5) & Filter.by_property("genre").equal("动画"),
+        near=NearText(["冒险", "成长", "魔法"], distance=0.7),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -241,64 +130,34 @@ def demo_similarity_threshold(client):
 
     # 1. 严格的相似度搜索
     print("\n1. 严格搜索: 相似度阈值 0.3 (高度相关)")
-    query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["监狱", "自由", "救赎"]
-            distance: 0.3
-          },
-          limit: 5
-        ) {
-          title
-          year
-          genre
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre"],
+        near=NearText(["监狱", "自由", "救赎"], distance=0.3),
+        limit=5,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部高度相关的电影:")
         for movie in movies:
             distance = movie.get('_additional', {}).get('distance', 'N/A')
             print(f"   - {movie.get('title', 'N/A')} ({movie.get('year', 'N/A')}) - 相似度: {distance:.3f}")
 
-    # 2. 宽松的相似度搜索
+    # 2. 宽松的相似度搜索（与上面结构相同，复用同一个查询模板，只有变量不同）
     print("\n2. 宽松搜索: 相似度阈值 0.9 (更多相关结果)")
-    query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["监狱", "自由", "救赎"]
-            distance: 0.9
-          },
-          limit: 5
-        ) {
-          title
-          year
-          genre
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre"],
+        near=NearText(["监狱", "自由", "救赎"], distance=0.9),
+        limit=5,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -312,67 +171,29 @@ def demo_cross_type_search(client):
     # 1. 在电影和文章中搜索相同概念
     print("\n1. 跨类型搜索: '科技发展' 相关内容")
 
-    # 搜索电影
-    print("\n   相关电影:")
-    movie_query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["科技", "未来", "创新"]
-            distance: 0.8
-          },
-          limit: 2
-        ) {
-          title
-          year
-          genre
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(movie_query)
-    if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
-        for movie in movies:
-            distance = movie.get('_additional', {}).get('distance', 'N/A')
-            print(f"   - {movie.get('title', 'N/A')} ({movie.get('year', 'N/A')}) - 相似度: {distance:.3f}")
-
-    # 搜索文章
-    print("\n   相关文章:")
-    article_query = """
-    {
-      Get {
-        Article(
-          nearText: {
-            concepts: ["科技", "未来", "创新"]
-            distance: 0.8
-          },
-          limit: 2
-        ) {
-          title
-          author
-          category
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(article_query)
-    if response.status_code == 200:
-        result = response.json()
-        articles = result.get('data', {}).get('Get', {}).get('Article', [])
-        for article in articles:
-            distance = article.get('_additional', {}).get('distance', 'N/A')
-            print(f"   - {article.get('title', 'N/A')} - {article.get('author', 'N/A')} - 相似度: {distance:.3f}")
+    # 启用客户端向量化时概念只向量化一次，所有数据类共用同一个向量（否则各自 nearText）；
+    # 各数据类的查询通过 client.gather 并发发送，结果按距离合并为全局 top-k
+    result = federated_search(
+        client,
+        {
+            "Movie": ["title", "year", "genre"],
+            "Article": ["title", "author", "category"],
+        },
+        concepts=["科技", "未来", "创新"],
+        distance=0.8,
+        limit=4,
+    )
+
+    print("\n   综合排序结果:")
+    for hit in result:
+        props = hit.properties
+        if hit.class_name == "Movie":
+            print(f"   - [电影] {props.get('title', 'N/A')} ({props.get('year', 'N/A')}) - 相似度: {hit.distance:.3f}")
+        else:
+            print(f"   - [文章] {props.get('title', 'N/A')} - {props.get('author', 'N/A')} - 相似度: {hit.distance:.3f}")
+
+    for class_name, message in result.errors.items():
+        print(f"   [X] {class_name} 查询失败: {message}")
 
 def demo_advanced_search(client):
     """演示高级搜索技巧"""
@@ -380,37 +201,17 @@ def demo_advanced_search(client):
 
     # 1. 搜索相似电影并排除某些类型
     print("\n1. 排除特定类型的搜索: 寻找类似《黑客帝国》但不是科幻的电影")
-    query = """
-    {
-      Get {
-        Movie(
-          nearText: {
-            concepts: ["虚拟现实", "黑客", "程序", "现实世界"]
-            distance: 0.7
-          },
-          where: {
-            path: ["genre"]
-            operator: NotEqual
-            valueText: "科幻"
-          },
-          limit: 3
-        ) {
-          title
-          year
-          genre
-          description
-          _additional {
-            distance
-          }
-        }
-      }
-    }
-    """
-
-    response = client.graphql_query(query)
+    query = GetQuery(
+        "Movie", ["title", "year", "genre", "description"],
+        near=NearText(["虚拟现实", "黑客", "程序", "现实世界"], distance=0.7),
+        where=Filter.by_property("genre").not_equal("科幻"),
+        limit=3,
+        additional=["distance"],
+    )
+
+    response = query.execute(client)
     if response.status_code == 200:
-        result = response.json()
-        movies = result.get('data', {}).get('Get', {}).get('Movie', [])
+        movies = query.results(response)
 
         print(f"   找到 {len(movies)} 部相关电影:")
         for movie in movies:
@@ -430,8 +231,8 @@ def main():
     print(f"Weaviate URL: {weaviate_url}")
     print(f"向量化模型: {ollama_model}")
 
-    # 创建客户端
-    client = WeaviateClient()
+    # 创建客户端（QUERY_CACHE_ENABLED=true 时启用查询结果缓存）
+    client = WeaviateClient(query_cache=create_query_cache())
 
     print("\n向量搜索是 Weaviate 的核心功能!")
     print("它可以根据语义相似度而不是关键词匹配来搜索内容。")
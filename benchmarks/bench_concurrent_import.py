@@ -0,0 +1,89 @@
+"""
+并发批量导入基准测试：不同在途批次数下的吞吐量
+
+桩服务器模拟有限的写入能力（排队变慢、过载返回 429），
+分别用固定并发度和自适应并发度导入同样的合成电影数据（benchmarks/synthetic_data.py，
+与 bench_ingest.py 相同），输出每种配置的 objects/sec。
+
+用法:
+    python benchmarks/bench_concurrent_import.py --objects 20000 --levels 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import IngestModel, StubServer
+from benchmarks.synthetic_data import synthetic_movies
+from utils.batch_importer import BatchImporter, ConcurrentBatchImporter
+from utils.weaviate_client import WeaviateClient
+
+
+def run_import(importer, count, seed=0):
+    """导入 count 个对象，返回统计"""
+    with importer:
+        for properties in synthetic_movies(count, seed=seed):
+            importer.add("Movie", properties)
+    return importer.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发批量导入吞吐量测试")
+    parser.add_argument("--objects", type=int, default=20000, help="每轮导入对象数")
+    parser.add_argument("--batch-size", type=int, default=100, help="批次大小")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="固定并发度")
+    parser.add_argument("--cores", type=int, default=4, help="模拟服务端并行处理能力")
+    parser.add_argument("--server-max-in-flight", type=int, default=12, help="超过该在途批次数返回 429")
+    parser.add_argument("--seed", type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument("--batch-latency", type=float, default=0.02, help="每批固定耗时（秒）")
+    parser.add_argument("--per-object-latency", type=float, default=0.0002, help="每个对象耗时（秒）")
+    args = parser.parse_args()
+
+    model = IngestModel(
+        batch_latency=args.batch_latency,
+        per_object_latency=args.per_object_latency,
+        cores=args.cores,
+        max_in_flight=args.server_max_in_flight,
+    )
+
+    print("=" * 60)
+    print("并发批量导入吞吐量测试")
+    print("=" * 60)
+
+    with StubServer(ingest_model=model) as server:
+        client = WeaviateClient(weaviate_url=server.url, pool_maxsize=max(args.levels) + 4, max_retries=0)
+        print(f"对象数: {args.objects} | 批次大小: {args.batch_size} | "
+              f"服务端并行度: {args.cores} | 429 阈值: {args.server_max_in_flight}\n")
+        print(f"{'模式':<12} | {'并发度':>8} | {'objects/sec':>12} | {'重试':>6} | {'失败':>6}")
+        print("-" * 58)
+
+        stats = run_import(BatchImporter(client, batch_size=args.batch_size, retry_backoff=0.05),
+                           args.objects, args.seed)
+        print(f"{'serial':<12} | {1:>8} | {stats.objects_per_second:>12.0f} | "
+              f"{stats.retried:>6} | {stats.failed:>6}")
+
+        for level in args.levels:
+            importer = ConcurrentBatchImporter(
+                client, batch_size=args.batch_size, retry_backoff=0.05,
+                max_concurrency=level, adaptive=False,
+            )
+            stats = run_import(importer, args.objects, args.seed)
+            print(f"{'fixed':<12} | {level:>8} | {stats.objects_per_second:>12.0f} | "
+                  f"{stats.retried:>6} | {stats.failed:>6}")
+
+        importer = ConcurrentBatchImporter(
+            client, batch_size=args.batch_size, retry_backoff=0.05,
+            max_concurrency=max(args.levels), adaptive=True,
+        )
+        stats = run_import(importer, args.objects, args.seed)
+        concurrency = importer.concurrency
+        print(f"{'adaptive':<12} | {concurrency.average:>8.1f} | {stats.objects_per_second:>12.0f} | "
+              f"{stats.retried:>6} | {stats.failed:>6}")
+        print(f"\n自适应模式: 平均并发 {concurrency.average:.1f}，峰值 {concurrency.peak}，"
+              f"最终 {concurrency.current}")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
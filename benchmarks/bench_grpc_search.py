@@ -0,0 +1,106 @@
+"""
+搜索传输基准测试：GraphQL JSON vs gRPC
+
+两个本地桩服务器返回相同的结果（limit 条，每条带一个 dims 维向量），
+比较 WeaviateClient.search() 分别走 REST 和 gRPC 时的 QPS。
+向量越长，JSON 浮点数解析的开销越明显。
+
+开始计时前先检查按对象 id 过滤的查询（幂等导入、局部更新都会用到）确实走 gRPC。
+
+用法:
+    python benchmarks/bench_grpc_search.py --queries 500 --dims 1024 --limit 10
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.grpc_stub_server import GrpcStubServer, stub_id
+from benchmarks.stub_server import StubHandler, StubServer
+from utils.grpc_transport import GrpcTransport
+from utils.query_builder import Filter, GetQuery, NearVector
+from utils.weaviate_client import WeaviateClient
+
+
+def make_rest_handler(vectors):
+    """返回与 gRPC 桩服务器相同结果的 GraphQL 处理器"""
+    results = [
+        {"title": f"stub-{i}", "_additional": {"id": stub_id(i),
+                                               "distance": i / len(vectors), "vector": vector.tolist()}}
+        for i, vector in enumerate(vectors)
+    ]
+    # 响应体只序列化一次，只测量客户端的开销
+    body = json.dumps({"data": {"Get": {"Movie": results}}}).encode("utf-8")
+
+    class Handler(StubHandler):
+        def do_POST(self):
+            if self.path.startswith("/v1/graphql"):
+                self._read_body()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                super().do_POST()
+
+    return Handler
+
+
+def check_id_filter(client):
+    """按对象 id 过滤的查询应当由 gRPC 返回正确的结果，且不会停用 gRPC"""
+    ids = [stub_id(1), stub_id(3)]
+    query = GetQuery("Movie", ["title"], where=Filter.by_id().contains_any(ids), limit=len(ids),
+                     additional=["id"])
+    found = sorted(item["_additional"]["id"] for item in client.search(query))
+    if found != ids or client.grpc is None:
+        raise RuntimeError(f"按 id 过滤的 gRPC 查询结果不正确: {found}（gRPC 启用: {client.grpc is not None}）")
+
+
+def run(client, query, total):
+    """串行执行 total 次搜索，返回 QPS"""
+    client.search(query)  # 预热
+    start = time.perf_counter()
+    for _ in range(total):
+        client.search(query)
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GraphQL vs gRPC 搜索基准测试")
+    parser.add_argument("--queries", type=int, default=500, help="每种传输的查询次数")
+    parser.add_argument("--dims", type=int, default=1024, help="向量维度")
+    parser.add_argument("--limit", type=int, default=10, help="每次返回的结果数")
+    args = parser.parse_args()
+
+    query = GetQuery("Movie", ["title"], near=NearVector(np.ones(args.dims, dtype=np.float32)),
+                     limit=args.limit, additional=["id", "distance", "vector"])
+
+    print("=" * 60)
+    print(f"搜索传输基准测试 (dims={args.dims}, limit={args.limit})")
+    print("=" * 60)
+
+    with GrpcStubServer(num_results=args.limit, dims=args.dims) as grpc_server:
+        handler = make_rest_handler(grpc_server.servicer.vectors)
+        with StubServer(handler_class=handler) as rest_server:
+            with WeaviateClient(rest_server.url) as rest_client:
+                rest_client.disable_grpc()
+                rest_qps = run(rest_client, query, args.queries)
+
+            transport = GrpcTransport(grpc_server.host, grpc_server.port)
+            with WeaviateClient(rest_server.url, grpc_transport=transport) as grpc_client:
+                check_id_filter(grpc_client)
+                grpc_qps = run(grpc_client, query, args.queries)
+
+    print(f"   REST/GraphQL: {rest_qps:8.1f} QPS")
+    print(f"   gRPC:         {grpc_qps:8.1f} QPS")
+    print(f"   加速比: {grpc_qps / rest_qps:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
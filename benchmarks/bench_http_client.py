@@ -0,0 +1,76 @@
+"""
+HTTP 客户端基准测试：每次新建连接 vs 连接池复用
+
+对本地桩服务器发送小的 GraphQL 请求，比较两种方式的每秒请求数（RPS）：
+  - per-call: 每次调用 requests.post（旧实现，每次都重新建立 TCP 连接）
+  - pooled:   共享的 WeaviateClient（keep-alive 连接池）
+
+用法:
+    python benchmarks/bench_http_client.py --requests 2000 --threads 1 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubServer
+from utils.weaviate_client import WeaviateClient
+
+QUERY = "{ Get { Movie(limit: 1) { title } } }"
+
+
+def per_call_request(url):
+    """旧实现：裸 requests.post，每次新建连接"""
+    return requests.post(
+        f"{url}/v1/graphql",
+        json={"query": QUERY},
+        headers={"Content-Type": "application/json"},
+    )
+
+
+def run(send, total, threads):
+    """并发发送 total 个请求，返回 RPS"""
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(total):
+            send()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: send(), range(total)))
+    elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 客户端连接池基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4], help="并发线程数")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("HTTP 客户端基准测试 (per-call vs pooled)")
+    print("=" * 60)
+
+    with StubServer() as server:
+        print(f"桩服务器: {server.url}")
+        print(f"每轮请求数: {args.requests}\n")
+        print(f"{'线程数':>6} | {'per-call RPS':>14} | {'pooled RPS':>12} | {'加速比':>6}")
+        print("-" * 50)
+
+        for threads in args.threads:
+            client = WeaviateClient(weaviate_url=server.url, pool_maxsize=max(threads, 10))
+            try:
+                per_call = run(lambda: per_call_request(server.url), args.requests, threads)
+                pooled = run(lambda: client.graphql_query(QUERY), args.requests, threads)
+            finally:
+                client.close()
+            print(f"{threads:>6} | {per_call:>14.0f} | {pooled:>12.0f} | {pooled / per_call:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+导入吞吐量基准测试（03_data_import.py 的写入路径）
+
+用合成的 Movie / Article 数据（benchmarks/synthetic_data.py）分别测量：
+- single      每个对象一个 POST /v1/objects
+- batched     BatchImporter 串行批量导入
+- concurrent  ConcurrentBatchImporter 自适应并发批量导入
+每种模式都分别在“服务端向量化”（不带向量）和“客户端向量化”（ClientVectorizer 计算向量后随对象写入）
+两种情况下运行，输出 objects/sec 和 MB/sec（请求体字节数）。
+
+默认启动本地桩服务器（benchmarks/stub_server.py），它同时提供假的 Ollama /api/embed，
+可以完全离线运行；--url 指向真实 Weaviate 时请确保 Movie / Article 已创建。
+
+每次运行的结果追加到 JSONL 文件（默认 .cache/bench_ingest.jsonl），
+加 --compare 时与文件中上一次的结果对比，便于发现性能回退。
+
+用法:
+    python benchmarks/bench_ingest.py --objects 5000 --compare
+    python benchmarks/bench_ingest.py --modes batched concurrent --classes Movie --dims 1024
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import IngestModel, StubServer
+from benchmarks.synthetic_data import GENERATORS
+from config.schema_definitions import ARTICLE_CLASS, MOVIE_CLASS
+from utils.batch_importer import BatchImporter, ConcurrentBatchImporter
+from utils.data_loader import read_jsonl
+from utils.embedding import ClientVectorizer, OllamaEmbedder
+from utils.weaviate_client import WeaviateClient
+
+MODES = ("single", "batched", "concurrent")
+DEFINITIONS = {"Movie": MOVIE_CLASS, "Article": ARTICLE_CLASS}
+
+
+def run_single(client, class_name, records, vectorizer):
+    """逐个对象写入，返回 (成功数, 失败数, 请求体字节数)"""
+    pairs = vectorizer.vectorize(records) if vectorizer else ((properties, None) for properties in records)
+    succeeded = failed = num_bytes = 0
+    for properties, vector in pairs:
+        payload = {"class": class_name, "properties": properties}
+        if vector is not None:
+            payload["vector"] = vector
+        num_bytes += len(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        response = client.create_object(class_name, properties, vector=vector)
+        if response.status_code == 200:
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed, num_bytes
+
+
+def run_batched(importer, class_name, records, vectorizer):
+    stats = importer.import_objects(class_name, records, vectorizer=vectorizer)
+    return stats.succeeded, stats.failed, stats.bytes_sent
+
+
+def run_case(client, mode, class_name, count, vectorizer, args):
+    """运行一个 (模式, 数据类, 是否客户端向量化) 组合，返回结果字典"""
+    records = GENERATORS[class_name](count, seed=args.seed)
+    started = time.perf_counter()
+    if mode == "single":
+        succeeded, failed, num_bytes = run_single(client, class_name, records, vectorizer)
+    elif mode == "batched":
+        importer = BatchImporter(client, batch_size=args.batch_size, retry_backoff=0.05)
+        succeeded, failed, num_bytes = run_batched(importer, class_name, records, vectorizer)
+    else:
+        importer = ConcurrentBatchImporter(client, batch_size=args.batch_size, retry_backoff=0.05,
+                                           max_concurrency=args.concurrency, adaptive=True)
+        succeeded, failed, num_bytes = run_batched(importer, class_name, records, vectorizer)
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "class": class_name,
+        "embedding": "client" if vectorizer else "server",
+        "objects": succeeded,
+        "failed": failed,
+        "seconds": round(elapsed, 4),
+        "objects_per_sec": round(succeeded / elapsed, 1) if elapsed > 0 else 0.0,
+        "mb_per_sec": round(num_bytes / 2 ** 20 / elapsed, 3) if elapsed > 0 else 0.0,
+        "bytes": num_bytes,
+    }
+
+
+def case_key(row):
+    return row["mode"], row["class"], row["embedding"]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_previous(path):
+    """读取结果文件中的最后一次运行，文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    for previous in read_jsonl(path):
+        pass
+    return previous
+
+
+def append_run(path, run):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def print_report(results, previous=None):
+    baseline = {case_key(row): row for row in (previous or {}).get("results", [])}
+    print("\n" + "=" * 82)
+    print(f"{'模式':<11} {'数据类':<8} {'向量化':<7} {'对象数':>7} {'失败':>5} "
+          f"{'objects/sec':>12} {'MB/sec':>8} {'对比上次':>10}")
+    print("-" * 82)
+    for row in results:
+        change = ""
+        old = baseline.get(case_key(row))
+        if old and old["objects_per_sec"]:
+            change = f"{(row['objects_per_sec'] / old['objects_per_sec'] - 1) * 100:+.1f}%"
+        print(f"{row['mode']:<11} {row['class']:<8} {row['embedding']:<7} {row['objects']:>7} "
+              f"{row['failed']:>5} {row['objects_per_sec']:>12.0f} {row['mb_per_sec']:>8.2f} {change:>10}")
+    print("=" * 82)
+
+
+def run_all(client, embed_url, args):
+    results = []
+    embedder = OllamaEmbedder(api_endpoint=embed_url, model=args.embed_model, batch_size=args.embed_batch_size)
+    try:
+        for mode in args.modes:
+            count = args.single_objects if mode == "single" else args.objects
+            for class_name in args.classes:
+                for embedding in args.embedding:
+                    vectorizer = ClientVectorizer(embedder, DEFINITIONS[class_name]) \
+                        if embedding == "client" else None
+                    row = run_case(client, mode, class_name, count, vectorizer, args)
+                    results.append(row)
+                    print(f"   {mode:<11} {class_name:<8} {embedding:<7} "
+                          f"{row['objects_per_sec']:>8.0f} obj/s  {row['mb_per_sec']:>7.2f} MB/s")
+    finally:
+        embedder.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导入吞吐量基准测试")
+    parser.add_argument("--objects", type=int, default=5000, help="批量模式每种组合导入的对象数")
+    parser.add_argument("--single-objects", type=int, default=500, help="逐个写入模式的对象数")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--classes", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--embedding", nargs="+", default=["server", "client"], choices=("server", "client"),
+                        help="server: 不带向量写入；client: 客户端向量化后带向量写入")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, help="并发模式的最大在途批次数")
+    parser.add_argument("--dims", type=int, default=1024, help="桩服务器假向量的维度")
+    parser.add_argument("--embed-batch-size", type=int, default=32, help="每次向量化请求的文本数")
+    parser.add_argument("--embed-model", default="fake", help="客户端向量化使用的模型")
+    parser.add_argument("--seed", type=int, default=0, help="合成数据的随机种子")
+    parser.add_argument("--cores", type=int, default=4, help="桩服务器模拟的并行处理能力")
+    parser.add_argument("--batch-latency", type=float, default=0.005, help="桩服务器每个请求的固定耗时（秒）")
+    parser.add_argument("--per-object-latency", type=float, default=0.0001, help="桩服务器每个对象的耗时（秒）")
+    parser.add_argument("--url", help="使用真实 Weaviate 代替桩服务器")
+    parser.add_argument("--embed-url", help="真实的 Ollama 地址（配合 --url 使用）")
+    parser.add_argument("--output", default=".cache/bench_ingest.jsonl", help="追加结果的 JSONL 文件")
+    parser.add_argument("--compare", action="store_true", help="与结果文件中的上一次运行对比")
+    args = parser.parse_args()
+
+    print("=" * 82)
+    print("导入吞吐量基准测试")
+    print("=" * 82)
+    print(f"批量对象数: {args.objects} | 逐个写入对象数: {args.single_objects} | "
+          f"批次大小: {args.batch_size} | 并发上限: {args.concurrency}")
+
+    previous = load_previous(args.output) if args.compare else None
+    if args.url:
+        with WeaviateClient(weaviate_url=args.url, pool_maxsize=args.concurrency + 4) as client:
+            results = run_all(client, args.embed_url, args)
+    else:
+        model = IngestModel(batch_latency=args.batch_latency, per_object_latency=args.per_object_latency,
+                            cores=args.cores)
+        with StubServer(ingest_model=model, embedding_dims=args.dims) as server:
+            with WeaviateClient(weaviate_url=server.url, pool_maxsize=args.concurrency + 4,
+                                max_retries=0) as client:
+                results = run_all(client, args.embed_url or server.url, args)
+
+    print_report(results, previous)
+    append_run(args.output, {
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "revision": git_revision(),
+        "target": args.url or "stub",
+        "params": {key: getattr(args, key) for key in
+                   ("objects", "single_objects", "batch_size", "concurrency", "dims", "embed_batch_size",
+                    "seed", "cores", "batch_latency", "per_object_latency")},
+        "results": results,
+    })
+    print(f"结果已追加到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+向量搜索 recall / 延迟基准测试
+
+1. 准备数据集：合成（带簇结构的向量 + 分类 + 文本），或 JSONL 文件
+   （每行 {"text": ..., "category": ..., "vector": [...]}，没有 vector 时用客户端向量化）
+2. 导入到临时数据类 BenchDoc（保留 uuid，便于把结果映射回行号）
+3. 用 numpy 暴力搜索计算每个查询的精确近邻
+4. 按查询类型和并发度回放同一组查询，输出 p50/p95/p99 延迟、QPS 和 recall@k
+
+查询类型:
+- nearVector  直接用查询向量
+- filtered    nearVector + where category = 查询所属分类（精确近邻只在该分类中计算）
+- hybrid      hybrid(query=文本, vector=查询向量, alpha)；recall 相对于纯向量的精确近邻，
+              alpha < 1 时关键词部分会让结果偏离向量近邻，数值用于比较同一 alpha 下的变化
+- nearText    由 Weaviate 向量化查询文本（需要 --vectorizer text2vec-ollama 且使用同一模型
+              在客户端计算精确近邻，因此需要 --embed）
+
+--fake 时在进程内启动 utils/fake_weaviate.py 的替身服务器（numpy 精确搜索），
+不需要真实的 Weaviate / Ollama，用来测量客户端和传输层的开销、验证整个流程。
+
+用法:
+    python benchmarks/bench_vector_search.py --objects 20000 --dims 256 --concurrency 1 4 16
+    python benchmarks/bench_vector_search.py --fake --types nearVector filtered hybrid nearText --embed --vectorizer text2vec-ollama
+    python benchmarks/bench_vector_search.py --dataset docs.jsonl --embed --vectorizer text2vec-ollama
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.vector_metrics import (brute_force_knn, latency_summary, recall_at_k, row_uuid,
+                                       synthetic_clusters, uuid_row)
+from config.weaviate_config import config
+from utils.batch_importer import BatchImporter
+from utils.data_loader import read_jsonl
+from utils.embedding import create_embedder
+from utils.fake_weaviate import FakeWeaviate, HashEmbedder
+from utils.query_builder import Filter, GetQuery, Hybrid, NearText, NearVector
+from utils.weaviate_client import WeaviateClient
+
+CLASS_NAME = "BenchDoc"
+QUERY_TYPES = ("nearVector", "filtered", "hybrid", "nearText")
+
+
+class Dataset:
+    """数据集：vectors 为 float32 矩阵，texts / categories 与之逐行对应"""
+
+    def __init__(self, vectors, texts, categories):
+        self.vectors = vectors
+        self.texts = texts
+        self.categories = np.asarray(categories)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def subset(self, rows):
+        return Dataset(self.vectors[rows], [self.texts[row] for row in rows], self.categories[rows])
+
+
+def synthetic(num_objects, dims, num_queries, clusters=20, seed=0):
+    """合成数据：分类 = 所在的簇，文本中包含簇的关键词"""
+    vectors, labels = synthetic_clusters(num_objects + num_queries, dims, clusters, seed=seed)
+    texts = [f"文档 {row} 主题{label} 关键词{label}" for row, label in enumerate(labels)]
+    data = Dataset(vectors, texts, [f"c{label}" for label in labels])
+    rows = np.arange(len(data))
+    return data.subset(rows[num_queries:]), data.subset(rows[:num_queries])
+
+
+def load_dataset(path, num_queries, embedder=None):
+    """从 JSONL 读取数据集，最后 num_queries 行作为查询"""
+    records = list(read_jsonl(path))
+    texts = [record.get("text", "") for record in records]
+    if all(record.get("vector") is not None for record in records):
+        vectors = np.asarray([record["vector"] for record in records], dtype=np.float32)
+    else:
+        if embedder is None:
+            raise SystemExit("数据集中没有 vector 字段，请使用 --embed 在客户端向量化")
+        vectors = np.asarray(embedder.embed(texts), dtype=np.float32)
+    data = Dataset(vectors, texts, [record.get("category", "") for record in records])
+    rows = np.arange(len(data))
+    return data.subset(rows[:-num_queries]), data.subset(rows[-num_queries:])
+
+
+def prepare_class(client, data, vectorizer, batch_size):
+    client.delete_class(CLASS_NAME)
+    definition = {
+        "class": CLASS_NAME,
+        "vectorizer": vectorizer,
+        "properties": [
+            {"name": "text", "dataType": ["text"]},
+            {"name": "category", "dataType": ["text"], "tokenization": "field"},
+        ],
+    }
+    if vectorizer == "text2vec-ollama":
+        definition["moduleConfig"] = {vectorizer: {"model": config.ollama_model,
+                                                   "apiEndpoint": config.ollama_api_endpoint}}
+    response = client.create_class(definition)
+    if response.status_code != 200:
+        raise SystemExit(f"创建 {CLASS_NAME} 失败: HTTP {response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    with BatchImporter(client, batch_size=batch_size) as importer:
+        for row in range(len(data)):
+            importer.add(CLASS_NAME, {"text": data.texts[row], "category": str(data.categories[row])},
+                         uuid=row_uuid(row), vector=data.vectors[row])
+    if importer.stats.failed:
+        raise SystemExit(f"导入失败 {importer.stats.failed} 个对象: {importer.stats.errors[:1]}")
+    print(f"   导入 {len(data)} 个对象，用时 {time.perf_counter() - started:.1f}s")
+
+
+def build_workload(query_type, data, queries, k, alpha):
+    """返回 (查询对象列表, 精确近邻行号)"""
+    if query_type == "filtered":
+        built, truth = [], []
+        for row in range(len(queries)):
+            category = str(queries.categories[row])
+            built.append(GetQuery(CLASS_NAME, ["category"], limit=k, additional=["id"],
+                                  near=NearVector(queries.vectors[row]),
+                                  where=Filter.by_property("category").equal(category)))
+            truth.append(brute_force_knn(data.vectors, queries.vectors[row:row + 1], k,
+                                         mask=data.categories == queries.categories[row])[0])
+        return built, truth
+
+    truth = brute_force_knn(data.vectors, queries.vectors, k)
+    if query_type == "nearVector":
+        near = [NearVector(vector) for vector in queries.vectors]
+    elif query_type == "hybrid":
+        near = [Hybrid(text, alpha=alpha, vector=vector) for text, vector in zip(queries.texts, queries.vectors)]
+    else:
+        near = [NearText([text]) for text in queries.texts]
+    return [GetQuery(CLASS_NAME, ["category"], near=item, limit=k, additional=["id"]) for item in near], truth
+
+
+def replay(client, workload, concurrency):
+    """以固定并发度回放查询，返回 (结果行号列表, 延迟列表, 总耗时)"""
+    def run(query):
+        started = time.perf_counter()
+        results = client.search(query)
+        return [uuid_row(item["_additional"]["id"]) for item in results], time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(run, workload))
+    elapsed = time.perf_counter() - started
+    return [rows for rows, _ in outcomes], [latency for _, latency in outcomes], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量搜索 recall / 延迟基准测试")
+    parser.add_argument("--dataset", help="JSONL 数据集（默认使用合成数据）")
+    parser.add_argument("--objects", type=int, default=20000, help="合成数据的对象数")
+    parser.add_argument("--dims", type=int, default=256, help="合成数据的向量维度")
+    parser.add_argument("--queries", type=int, default=200, help="查询数")
+    parser.add_argument("--k", type=int, default=10, help="recall@k 的 k")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="并发度")
+    parser.add_argument("--types", nargs="+", default=["nearVector", "filtered", "hybrid"],
+                        choices=QUERY_TYPES, help="查询类型")
+    parser.add_argument("--alpha", type=float, default=0.75, help="hybrid 的 alpha")
+    parser.add_argument("--vectorizer", default="none", help="BenchDoc 的向量化器（nearText 需要）")
+    parser.add_argument("--embed", action="store_true", help="使用客户端向量化器计算数据集向量")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--url", help="Weaviate 地址（默认 WEAVIATE_URL）")
+    parser.add_argument("--fake", action="store_true", help="使用进程内的 Weaviate 替身（离线运行）")
+    parser.add_argument("--keep", action="store_true", help="保留 BenchDoc 数据类")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if "nearText" in args.types and args.vectorizer == "none":
+        raise SystemExit("nearText 需要 --vectorizer（例如 text2vec-ollama）")
+
+    embedder = None
+    if args.embed:
+        # 替身服务器用哈希向量化器处理 nearText，客户端必须用同一个实现计算向量
+        embedder = HashEmbedder(dims=args.dims) if args.fake else create_embedder()
+    if args.dataset:
+        data, queries = load_dataset(args.dataset, args.queries, embedder)
+    elif embedder is not None:
+        data, queries = synthetic(args.objects, args.dims, args.queries)
+        data.vectors = np.asarray(embedder.embed(data.texts), dtype=np.float32)
+        queries.vectors = np.asarray(embedder.embed(queries.texts), dtype=np.float32)
+    else:
+        data, queries = synthetic(args.objects, args.dims, args.queries)
+    print(f"数据集: {len(data)} 个对象, {data.vectors.shape[1]} 维, {len(queries)} 个查询")
+
+    results = []
+    server = FakeWeaviate(embedding_dims=data.vectors.shape[1]) if args.fake else None
+    with server or nullcontext(), WeaviateClient(server.url if server else args.url) as client:
+        prepare_class(client, data, args.vectorizer, args.batch_size)
+        for query_type in args.types:
+            workload, truth = build_workload(query_type, data, queries, args.k, args.alpha)
+            client.search(workload[0])  # 预热
+            for concurrency in args.concurrency:
+                found, latencies, elapsed = replay(client, workload, concurrency)
+                row = {"type": query_type, "concurrency": concurrency,
+                       "recall": recall_at_k(found, truth), "qps": len(workload) / elapsed,
+                       **latency_summary(latencies)}
+                results.append(row)
+                print(f"   {query_type:<10} c={concurrency:<3} recall@{args.k}={row['recall']:.3f}  "
+                      f"p50={row['p50']:.2f}ms p95={row['p95']:.2f}ms p99={row['p99']:.2f}ms  "
+                      f"{row['qps']:.0f} QPS")
+        if not args.keep:
+            client.delete_class(CLASS_NAME)
+
+    print("\n" + "=" * 72)
+    print(f"{'类型':<12} {'并发':>4} {'recall@' + str(args.k):>10} {'p50':>8} {'p95':>8} {'p99':>8} {'QPS':>8}")
+    print("-" * 72)
+    for row in results:
+        print(f"{row['type']:<12} {row['concurrency']:>4} {row['recall']:>10.3f} {row['p50']:>8.2f} "
+              f"{row['p95']:>8.2f} {row['p99']:>8.2f} {row['qps']:>8.0f}")
+    print("=" * 72)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"objects": len(data), "queries": len(queries), "k": args.k, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+本地 Weaviate gRPC 桩服务器（进程内运行，用于离线测试和基准测试）
+
+实现 Search 和 BatchObjects 两个方法：
+- Search 返回固定数量的结果（按请求中的 limit 截断），请求了向量时附带 float32 向量；
+  按对象 id 过滤（与 Weaviate 一样属性名为 _id）时只返回匹配的结果，属性名写成 id 时报错
+- BatchObjects 记录收到的对象；properties 中 fail 为 true 的对象返回错误
+"""
+from concurrent import futures
+
+import grpc
+import numpy as np
+from weaviate.proto.v1 import base_pb2, batch_pb2, properties_pb2, search_get_pb2, weaviate_pb2_grpc
+
+
+def stub_id(i):
+    """第 i 条结果的对象 id"""
+    return f"00000000-0000-0000-0000-{i:012d}"
+
+
+class StubServicer(weaviate_pb2_grpc.WeaviateServicer):
+    """返回固定结果的 gRPC 服务"""
+
+    def __init__(self, num_results=10, dims=64):
+        self.num_results = num_results
+        self.vectors = np.random.default_rng(0).random((num_results, dims), dtype=np.float32)
+        self.received = []
+
+    def Search(self, request, context):
+        limit = request.limit or self.num_results
+        indices = range(self.num_results)
+        if request.HasField("filters"):
+            wanted = self._filter_ids(request.filters, context)
+            indices = [i for i in indices if stub_id(i) in wanted]
+        reply = search_get_pb2.SearchReply(took=0.1)
+        for i in list(indices)[:limit]:
+            result = reply.results.add()
+            fields = result.properties.non_ref_props.fields
+            for name in request.properties.non_ref_properties:
+                fields[name].CopyFrom(properties_pb2.Value(text_value=f"stub-{i}"))
+            metadata = result.metadata
+            if request.metadata.uuid:
+                metadata.id = stub_id(i)
+            if request.metadata.distance:
+                metadata.distance = i / self.num_results
+                metadata.distance_present = True
+            if request.metadata.vector:
+                metadata.vector_bytes = self.vectors[i].tobytes()
+        return reply
+
+    @staticmethod
+    def _filter_ids(filters, context):
+        """只支持按对象 id 的 Equal / ContainsAny，返回要保留的 id 集合"""
+        prop = filters.target.property
+        if prop != "_id":
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"no such prop with name '{prop}' found in class")
+        if filters.operator == base_pb2.Filters.OPERATOR_EQUAL:
+            return {filters.value_text}
+        if filters.operator == base_pb2.Filters.OPERATOR_CONTAINS_ANY:
+            return set(filters.value_text_array.values)
+        context.abort(grpc.StatusCode.UNIMPLEMENTED, "stub only supports Equal / ContainsAny on _id")
+
+    def BatchObjects(self, request, context):
+        reply = batch_pb2.BatchObjectsReply(took=0.1)
+        for index, obj in enumerate(request.objects):
+            self.received.append(obj)
+            fail = obj.properties.non_ref_properties.fields.get("fail")
+            if fail is not None and fail.bool_value:
+                reply.errors.add(index=index, error="stub failure")
+        return reply
+
+
+class GrpcStubServer:
+    """在后台线程池中运行的 gRPC 桩服务器"""
+
+    def __init__(self, host="127.0.0.1", port=0, num_results=10, dims=64, max_workers=8):
+        self.servicer = StubServicer(num_results, dims)
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+        weaviate_pb2_grpc.add_WeaviateServicer_to_server(self.servicer, self.server)
+        self.host = host
+        self.port = self.server.add_insecure_port(f"{host}:{port}")
+
+    def start(self):
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop(grace=None)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
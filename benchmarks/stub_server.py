@@ -0,0 +1,142 @@
+"""
+本地 Weaviate 桩服务器（用于离线基准测试）
+
+只模拟最小的 HTTP 接口，返回固定的小响应，用来测量客户端开销。
+同时提供一个假的 Ollama /api/embed 接口，向量由 utils/fake_weaviate.py 的 HashEmbedder 计算，
+与 FakeWeaviate 得到的向量完全一致。
+使用 HTTP/1.1，支持 keep-alive 连接复用。
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.fake_weaviate import HashEmbedder
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """返回固定响应的请求处理器"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，关闭 Nagle 避免与延迟 ACK 叠加出 40ms 停顿
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        # 基准测试时不输出访问日志
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/v1/meta"):
+            self._send_json(200, {"version": "stub", "hostname": "stub", "modules": {}})
+        elif self.path.startswith("/v1/schema"):
+            self._send_json(200, {"classes": []})
+        elif self.path.startswith("/v1/objects"):
+            self._send_json(200, {"objects": [], "totalResults": 0})
+        else:
+            self._send_json(404, {"error": [{"message": "not found"}]})
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.startswith("/v1/batch/objects"):
+            objects = json.loads(body).get("objects", [])
+            if not self.server.ingest(len(objects)):
+                self._send_json(429, {"error": [{"message": "too many requests"}]})
+                return
+            self._send_json(200, [
+                {"class": obj.get("class"), "id": obj.get("id"), "result": {}}
+                for obj in objects
+            ])
+        elif self.path.startswith("/api/embed"):
+            # Ollama 向量化接口
+            texts = json.loads(body).get("input", [])
+            if isinstance(texts, str):
+                texts = [texts]
+            self._send_json(200, {
+                "model": "fake",
+                "embeddings": self.server.embedder.embed(texts),
+            })
+        elif self.path.startswith("/v1/graphql"):
+            self._send_json(200, {"data": {"Get": {"Movie": [{"title": "stub"}]}}})
+        elif self.path.startswith("/v1/objects"):
+            if not self.server.ingest(1):
+                self._send_json(429, {"error": [{"message": "too many requests"}]})
+                return
+            self._send_json(200, {"id": "00000000-0000-0000-0000-000000000000"})
+        else:
+            self._send_json(404, {"error": [{"message": "not found"}]})
+
+
+class IngestModel:
+    """模拟服务端写入能力
+
+    - 每个批次耗时 batch_latency + per_object_latency * 对象数
+    - 同时处理的批次数超过 cores 时，耗时按比例变长（排队）
+    - 同时处理的批次数超过 max_in_flight 时直接返回 429
+    """
+
+    def __init__(self, batch_latency=0.0, per_object_latency=0.0, cores=4, max_in_flight=None):
+        self.batch_latency = batch_latency
+        self.per_object_latency = per_object_latency
+        self.cores = cores
+        self.max_in_flight = max_in_flight
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def ingest(self, num_objects):
+        """处理一个批次，过载时返回 False"""
+        with self._lock:
+            if self.max_in_flight is not None and self.active >= self.max_in_flight:
+                return False
+            self.active += 1
+            load = max(1.0, self.active / self.cores)
+        try:
+            delay = (self.batch_latency + self.per_object_latency * num_objects) * load
+            if delay > 0:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return True
+
+
+class StubServer:
+    """在后台线程中运行的桩服务器"""
+
+    def __init__(self, host="127.0.0.1", port=0, handler_class=StubHandler, ingest_model=None,
+                 embedding_dims=64):
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.ingest = (ingest_model or IngestModel()).ingest
+        self.httpd.embedder = HashEmbedder(dims=embedding_dims)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,183 @@
+"""
+向量索引参数扫描：recall@k vs 延迟 vs 内存
+
+对每组索引配置（HNSW 的 ef / maxConnections、flat、PQ/BQ/SQ 量化）：
+1. 创建临时数据类（vectorizer: none），导入同一份样本向量
+2. PQ/SQ 在导入完成后再启用（需要用已有数据训练）；BQ 不需要训练，
+   而且 flat 索引只能在创建时启用 BQ，因此直接写在数据类定义中
+3. 回放同一组查询，和 numpy 暴力搜索的精确结果比较，计算 recall@k
+4. 估算向量索引的常驻内存
+
+需要连接真实的 Weaviate（WEAVIATE_URL）；样本可以来自 .npy 文件，
+默认使用带簇结构的合成向量。
+
+用法:
+    python benchmarks/sweep_vector_index.py --objects 20000 --dims 1024 --queries 200 --k 10
+    python benchmarks/sweep_vector_index.py --vectors sample.npy --presets hnsw hnsw-ef256 hnsw-sq hnsw-bq
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.vector_metrics import (brute_force_knn, latency_summary, load_vectors_file,
+                                       recall_at_k, row_uuid, synthetic_dataset)
+from utils.batch_importer import BatchImporter
+from utils.query_builder import GetQuery, NearVector
+from utils.vector_index import bq, estimate_memory, flat_config, hnsw_config, pq, sq
+from utils.weaviate_client import WeaviateClient
+
+PRESETS = {
+    "hnsw": hnsw_config(),
+    "hnsw-ef64": hnsw_config(ef=64),
+    "hnsw-ef256": hnsw_config(ef=256),
+    "hnsw-m16": hnsw_config(max_connections=16),
+    "hnsw-m64": hnsw_config(max_connections=64, ef_construction=256),
+    "hnsw-pq": hnsw_config(quantizer=pq()),
+    "hnsw-bq": hnsw_config(quantizer=bq(rescore_limit=200)),
+    "hnsw-sq": hnsw_config(quantizer=sq(rescore_limit=100)),
+    "flat": flat_config(),
+    "flat-bq": flat_config(quantizer=bq(rescore_limit=200)),
+}
+
+# 需要训练数据、导入完成后再启用的量化
+DEFERRED_QUANTIZERS = ("pq", "sq")
+
+
+def create_sweep_class(client, class_name, index_type, index_config):
+    """创建临时数据类（BQ 直接启用），返回推迟启用的量化配置 {名称: 配置}"""
+    base_config = {key: value for key, value in index_config.items() if key not in DEFERRED_QUANTIZERS}
+    deferred = {key: value for key, value in index_config.items() if key in DEFERRED_QUANTIZERS}
+    client.delete_class(class_name)
+    response = client.create_class({
+        "class": class_name,
+        "vectorizer": "none",
+        "vectorIndexType": index_type,
+        "vectorIndexConfig": base_config,
+        "properties": [{"name": "row", "dataType": ["int"]}],
+    })
+    if response.status_code != 200:
+        raise RuntimeError(f"创建 {class_name} 失败: HTTP {response.status_code} {response.text[:200]}")
+    return deferred
+
+
+def enable_quantizer(client, class_name, deferred):
+    """导入完成后启用量化（PQ/SQ 用已导入的数据训练）"""
+    if not deferred:
+        return
+    definition = client.get_class(class_name).json()
+    definition["vectorIndexConfig"].update(deferred)
+    response = client.update_class(class_name, definition)
+    if response.status_code != 200:
+        raise RuntimeError(f"启用量化失败: HTTP {response.status_code} {response.text[:200]}")
+
+
+def import_vectors(client, class_name, data, batch_size):
+    started = time.perf_counter()
+    with BatchImporter(client, batch_size=batch_size) as importer:
+        for row, vector in enumerate(data):
+            importer.add(class_name, {"row": row}, uuid=row_uuid(row), vector=vector)
+    if importer.stats.failed:
+        raise RuntimeError(f"导入失败 {importer.stats.failed} 个对象: {importer.stats.errors[:1]}")
+    return time.perf_counter() - started
+
+
+def run_queries(client, class_name, queries, k):
+    """串行回放查询，返回 (每个查询的结果行号, 延迟列表)"""
+    found, latencies = [], []
+    client.search(GetQuery(class_name, ["row"], near=NearVector(queries[0]), limit=k))  # 预热
+    for vector in queries:
+        query = GetQuery(class_name, ["row"], near=NearVector(vector), limit=k)
+        started = time.perf_counter()
+        results = client.search(query)
+        latencies.append(time.perf_counter() - started)
+        found.append([item["row"] for item in results])
+    return found, latencies
+
+
+def sweep(client, presets, data, queries, truth, k, batch_size, settle, keep):
+    rows = []
+    for i, name in enumerate(presets):
+        index_type, index_config = PRESETS[name]
+        class_name = f"IndexSweep{i}"
+        print(f"\n[{name}] {index_type} {json.dumps(index_config, ensure_ascii=False)}")
+
+        deferred = create_sweep_class(client, class_name, index_type, index_config)
+        import_seconds = import_vectors(client, class_name, data, batch_size)
+        enable_quantizer(client, class_name, deferred)
+        # 等待异步索引 / 量化训练完成
+        time.sleep(settle)
+
+        found, latencies = run_queries(client, class_name, queries, k)
+        latency = latency_summary(latencies)
+        row = {
+            "preset": name,
+            "recall": recall_at_k(found, truth),
+            "p50_ms": latency["p50"],
+            "p95_ms": latency["p95"],
+            "qps": len(latencies) / sum(latencies),
+            "memory_mb": estimate_memory(len(data), data.shape[1], index_type, index_config) / 2 ** 20,
+            "import_s": import_seconds,
+        }
+        rows.append(row)
+        print(f"   recall@{k}={row['recall']:.3f}  p50={row['p50_ms']:.2f}ms  p95={row['p95_ms']:.2f}ms  "
+              f"内存≈{row['memory_mb']:.1f}MB")
+
+        if not keep:
+            client.delete_class(class_name)
+    return rows
+
+
+def print_report(rows, k):
+    print("\n" + "=" * 78)
+    print(f"{'配置':<12} {'recall@' + str(k):>10} {'p50(ms)':>9} {'p95(ms)':>9} {'QPS':>8} "
+          f"{'内存(MB)':>10} {'导入(s)':>8}")
+    print("-" * 78)
+    for row in rows:
+        print(f"{row['preset']:<12} {row['recall']:>10.3f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+              f"{row['qps']:>8.0f} {row['memory_mb']:>10.1f} {row['import_s']:>8.1f}")
+    print("=" * 78)
+    print("内存为向量索引常驻内存的估算值（不含对象存储和倒排索引）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量索引参数扫描")
+    parser.add_argument("--objects", type=int, default=20000, help="合成数据的对象数")
+    parser.add_argument("--dims", type=int, default=1024, help="合成数据的向量维度")
+    parser.add_argument("--vectors", help="使用 .npy 样本向量代替合成数据")
+    parser.add_argument("--queries", type=int, default=200, help="查询数")
+    parser.add_argument("--k", type=int, default=10, help="recall@k 的 k")
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS), choices=list(PRESETS))
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--settle", type=float, default=2.0, help="导入后等待索引完成的秒数")
+    parser.add_argument("--keep", action="store_true", help="保留临时数据类")
+    parser.add_argument("--output", help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    if args.vectors:
+        data = load_vectors_file(args.vectors)
+        data, queries = data[args.queries:], data[:args.queries]
+    else:
+        data, queries = synthetic_dataset(args.objects, args.dims, args.queries)
+    print(f"样本: {len(data)} 个对象, {data.shape[1]} 维, {len(queries)} 个查询")
+
+    print("计算精确近邻（numpy 暴力搜索）...")
+    truth = brute_force_knn(data, queries, args.k)
+
+    with WeaviateClient() as client:
+        rows = sweep(client, args.presets, data, queries, truth, args.k,
+                     args.batch_size, args.settle, args.keep)
+    print_report(rows, args.k)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"objects": len(data), "dims": int(data.shape[1]), "k": args.k, "results": rows},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+合成 Movie / Article 数据（字段与 config/schema_definitions.py 一致）
+
+用固定的随机种子生成任意数量的记录，文本长度与真实数据接近，
+用于导入基准测试和本地压测。
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+GENRES = ["科幻", "剧情", "动作", "喜剧", "爱情", "悬疑", "动画", "犯罪"]
+CATEGORIES = ["科技", "财经", "体育", "文化", "健康", "教育"]
+SUBJECTS = ["人工智能", "宇航员", "侦探", "少年", "科学家", "城市", "家族", "机器人", "旅人", "乐队"]
+ACTIONS = ["穿越时空", "寻找真相", "拯救世界", "重建家园", "追逐梦想", "揭开阴谋", "面对抉择", "踏上旅程"]
+DETAILS = [
+    "在一次意外之后，一切都发生了改变。",
+    "故事围绕信任、勇气与牺牲展开。",
+    "影片以细腻的镜头语言描绘了人物的内心世界。",
+    "紧凑的节奏和出人意料的反转让人印象深刻。",
+    "这是一个关于成长与和解的故事。",
+    "技术的进步带来了新的机遇，也带来了新的挑战。",
+]
+
+
+def _sentence(rng):
+    return f"{rng.choice(SUBJECTS)}{rng.choice(ACTIONS)}，{rng.choice(DETAILS)}"
+
+
+def synthetic_movies(count, seed=0):
+    """生成器：产出 count 条电影记录"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "title": f"{rng.choice(SUBJECTS)}{rng.choice(ACTIONS)} {i}",
+            "description": "".join(_sentence(rng) for _ in range(rng.randint(2, 6))),
+            "year": rng.randint(1950, 2025),
+            "genre": rng.choice(GENRES),
+            "rating": round(rng.uniform(5.0, 9.8), 1),
+        }
+
+
+def synthetic_articles(count, seed=0):
+    """生成器：产出 count 条文章记录"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        published = start + timedelta(minutes=rng.randint(0, 6 * 365 * 24 * 60))
+        yield {
+            "title": f"{rng.choice(CATEGORIES)}观察：{rng.choice(SUBJECTS)}{rng.choice(ACTIONS)} {i}",
+            "content": "".join(_sentence(rng) for _ in range(rng.randint(8, 30))),
+            "author": f"作者{rng.randint(1, 500)}",
+            "publishDate": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "category": rng.choice(CATEGORIES),
+        }
+
+
+GENERATORS = {
+    "Movie": synthetic_movies,
+    "Article": synthetic_articles,
+}
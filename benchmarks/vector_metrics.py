@@ -0,0 +1,98 @@
+"""
+向量搜索基准测试的公共工具
+
+- 合成数据集（带簇结构的归一化向量）和 .npy 文件加载
+- numpy 暴力搜索得到精确近邻（ground truth）
+- recall@k 和延迟分位数统计
+"""
+import uuid
+
+import numpy as np
+
+
+def normalize(vectors):
+    """按行 L2 归一化"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def synthetic_clusters(num_objects, dims, clusters=50, noise=0.35, seed=0):
+    """生成带簇结构的归一化向量（真实 embedding 也是成簇分布的），返回 (向量, 簇编号)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dims), dtype=np.float32)
+    labels = rng.integers(0, clusters, size=num_objects)
+    points = centers[labels] + noise * rng.standard_normal((num_objects, dims), dtype=np.float32)
+    return normalize(points), labels
+
+
+def synthetic_dataset(num_objects, dims, num_queries, clusters=50, noise=0.35, seed=0):
+    """生成同分布的数据向量和查询向量"""
+    vectors, _ = synthetic_clusters(num_objects + num_queries, dims, clusters, noise, seed)
+    return vectors[num_queries:], vectors[:num_queries]
+
+
+def load_vectors_file(path):
+    """读取 .npy 向量文件（float32 二维矩阵）"""
+    return np.ascontiguousarray(np.load(path), dtype=np.float32)
+
+
+def brute_force_knn(data, queries, k, distance="cosine", chunk_size=256, mask=None):
+    """精确 k 近邻，返回 (len(queries), k) 的行号矩阵
+
+    distance 支持 cosine / dot / l2-squared；mask 为布尔数组时只在 mask 为 True 的行中搜索。
+    """
+    data = np.asarray(data, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    candidates = np.arange(len(data)) if mask is None else np.flatnonzero(mask)
+    subset = data[candidates]
+    if distance == "cosine":
+        subset, queries = normalize(subset), normalize(queries)
+    elif distance == "l2-squared":
+        subset_norms = (subset ** 2).sum(axis=1)
+
+    k = min(k, len(candidates))
+    results = np.empty((len(queries), k), dtype=np.int64)
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        if distance == "l2-squared":
+            # ‖q‖² - 2·q·xᵀ + ‖x‖²，用矩阵乘法避免 chunk × N × dims 的中间数组
+            scores = (chunk ** 2).sum(axis=1)[:, None] - 2 * (chunk @ subset.T) + subset_norms[None, :]
+        else:
+            # 余弦/点积距离越小越近，取负的相似度
+            scores = -chunk @ subset.T
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)
+        results[start:start + len(chunk)] = candidates[np.take_along_axis(top, order, axis=1)]
+    return results
+
+
+def recall_at_k(found, truth):
+    """平均 recall@k：found / truth 为每个查询的行号列表"""
+    if not len(truth):
+        return 0.0
+    total = 0.0
+    for found_rows, truth_rows in zip(found, truth):
+        truth_set = set(int(row) for row in truth_rows)
+        if truth_set:
+            total += len(truth_set.intersection(int(row) for row in found_rows)) / len(truth_set)
+    return total / len(truth)
+
+
+def latency_summary(latencies):
+    """延迟统计（毫秒）"""
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "mean": float(values.mean())}
+
+
+def row_uuid(row):
+    """数据行号 -> 确定性的对象 uuid（便于把搜索结果映射回行号）"""
+    return str(uuid.UUID(int=row + 1))
+
+
+def uuid_row(object_id):
+    return uuid.UUID(object_id).int - 1
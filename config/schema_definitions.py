@@ -0,0 +1,162 @@
+"""
+Schema 定义（声明式）
+
+数据类定义只是数据：utils.schema.SchemaRegistry 会把它们与服务器上的 Schema
+比较，只创建缺失的数据类和属性，不会删除已有数据。
+修改这里的定义后重新运行 02_schema_creation.py 即可完成迁移。
+向量索引参数（ef、maxConnections、PQ/BQ/SQ 压缩等）见 utils/vector_index.py。
+"""
+import copy
+
+from utils.upsert import HASH_PROPERTY_DEFINITION
+from utils.vector_index import hnsw_config, with_vector_index
+
+MOVIE_CLASS = {
+    "class": "Movie",
+    "description": "电影信息数据",
+    "vectorizer": "text2vec-ollama",
+    "moduleConfig": {
+        "text2vec-ollama": {
+            "model": "bge-m3",
+            "apiEndpoint": "http://192.168.1.4:11434"
+        }
+    },
+    "properties": [
+        {
+            "name": "title",
+            "dataType": ["text"],
+            "description": "电影标题",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": False,
+                    "vectorizePropertyName": False
+                }
+            }
+        },
+        {
+            "name": "description",
+            "dataType": ["text"],
+            "description": "电影简介",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": False,
+                    "vectorizePropertyName": False
+                }
+            }
+        },
+        {
+            "name": "year",
+            "dataType": ["int"],
+            "description": "上映年份",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        },
+        {
+            "name": "genre",
+            "dataType": ["text"],
+            "description": "电影类型",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        },
+        {
+            "name": "rating",
+            "dataType": ["number"],
+            "description": "评分 (0-10)",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        }
+    ]
+}
+
+ARTICLE_CLASS = {
+    "class": "Article",
+    "description": "新闻文章数据",
+    "vectorizer": "text2vec-ollama",
+    "moduleConfig": {
+        "text2vec-ollama": {
+            "model": "bge-m3",
+            "apiEndpoint": "http://192.168.1.4:11434"
+        }
+    },
+    "properties": [
+        {
+            "name": "title",
+            "dataType": ["text"],
+            "description": "文章标题",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": False,
+                    "vectorizePropertyName": False
+                }
+            }
+        },
+        {
+            "name": "content",
+            "dataType": ["text"],
+            "description": "文章内容",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": False,
+                    "vectorizePropertyName": False
+                }
+            }
+        },
+        {
+            "name": "author",
+            "dataType": ["text"],
+            "description": "作者",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        },
+        {
+            "name": "publishDate",
+            "dataType": ["date"],
+            "description": "发布日期",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        },
+        {
+            "name": "category",
+            "dataType": ["text"],
+            "description": "文章分类",
+            "moduleConfig": {
+                "text2vec-ollama": {
+                    "skip": True
+                }
+            }
+        }
+    ]
+}
+
+# 显式写出向量索引配置（目前与 Weaviate 默认值相同）。ef / dynamicEf* / 量化可以在线修改，
+# efConstruction / maxConnections / distance / 索引类型需要通过 --reindex 重建
+MOVIE_CLASS = with_vector_index(MOVIE_CLASS, hnsw_config())
+ARTICLE_CLASS = with_vector_index(ARTICLE_CLASS, hnsw_config())
+
+# 幂等导入（utils/upsert.py）：contentHash 用于跳过未变化的记录，
+# 自然键决定对象的 uuid（同一部电影 / 同一篇文章总是写到同一个对象上）
+for _definition in (MOVIE_CLASS, ARTICLE_CLASS):
+    _definition["properties"].append(copy.deepcopy(HASH_PROPERTY_DEFINITION))
+
+NATURAL_KEYS = {
+    "Movie": ("title", "year"),
+    "Article": ("title", "author"),
+}
+
+# 按创建顺序排列（有交叉引用时被引用的类要排在前面）
+SCHEMA = [MOVIE_CLASS, ARTICLE_CLASS]
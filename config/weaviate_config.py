@@ -7,6 +7,16 @@ from dotenv import load_dotenv
 # 加载环境变量
 load_dotenv()
 
+# 项目根目录（配置中的相对路径都相对于它，而不是当前工作目录）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def project_path(path):
+    """把相对路径解析到项目根目录下；空值原样返回"""
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
 
 class WeaviateConfig:
     """Weaviate 配置类"""
@@ -15,12 +25,79 @@ class WeaviateConfig:
         self.weaviate_url = os.getenv("WEAVIATE_URL", "http://localhost:8080")
         self.ollama_api_endpoint = os.getenv("OLLAMA_API_ENDPOINT", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "bge-m3")
+        self.ollama_embed_batch_size = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "64"))
+        self.ollama_timeout = float(os.getenv("OLLAMA_TIMEOUT", "120"))
+        # 客户端向量化：导入时在客户端批量计算向量，而不是由 Weaviate 逐个调用 Ollama
+        self.client_embedding = os.getenv("CLIENT_EMBEDDING", "false").lower() == "true"
+        # 客户端向量缓存（默认不缓存；相对路径相对于项目根目录）
+        self.embedding_cache_path = project_path(os.getenv("EMBEDDING_CACHE_PATH", ""))
+        self.embedding_cache_max_mb = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))
+
+        # HTTP 连接池配置
+        self.pool_connections = int(os.getenv("WEAVIATE_POOL_CONNECTIONS", "10"))
+        self.pool_maxsize = int(os.getenv("WEAVIATE_POOL_MAXSIZE", "20"))
+        self.connect_timeout = float(os.getenv("WEAVIATE_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = float(os.getenv("WEAVIATE_READ_TIMEOUT", "15"))
+        self.max_retries = int(os.getenv("WEAVIATE_MAX_RETRIES", "3"))
+
+        # gRPC 传输（搜索和批量导入），不可用时自动回退到 REST
+        self.grpc_enabled = os.getenv("WEAVIATE_GRPC_ENABLED", "false").lower() == "true"
+        self.grpc_host = os.getenv("WEAVIATE_GRPC_HOST", "")  # 留空则使用 WEAVIATE_URL 的主机名
+        self.grpc_port = int(os.getenv("WEAVIATE_GRPC_PORT", "50051"))
+        self.grpc_secure = os.getenv("WEAVIATE_GRPC_SECURE", "false").lower() == "true"
+
+        # GraphQL 查询结果缓存
+        self.query_cache_enabled = os.getenv("QUERY_CACHE_ENABLED", "false").lower() == "true"
+        self.query_cache_size = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+        self.query_cache_ttl = float(os.getenv("QUERY_CACHE_TTL", "30"))
+        self.query_cache_validate_interval = float(os.getenv("QUERY_CACHE_VALIDATE_INTERVAL", "5"))
+
+        # 数据导入配置
+        self.import_batch_size = int(os.getenv("IMPORT_BATCH_SIZE", "100"))
+        self.import_concurrency = int(os.getenv("IMPORT_CONCURRENCY", "1"))
+        self.import_adaptive = os.getenv("IMPORT_ADAPTIVE", "true").lower() == "true"
 
     def get_connection_params(self):
         """获取连接参数"""
         return {
             "url": self.weaviate_url,
-            "timeout_config": (5, 15),  # (连接超时, 读取超时)
+            "timeout_config": (self.connect_timeout, self.read_timeout),  # (连接超时, 读取超时)
+        }
+
+    def get_pool_config(self):
+        """获取 HTTP 连接池配置"""
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "max_retries": self.max_retries,
+        }
+
+    def get_grpc_config(self):
+        """获取 gRPC 传输配置"""
+        return {
+            "enabled": self.grpc_enabled,
+            "host": self.grpc_host,
+            "port": self.grpc_port,
+            "secure": self.grpc_secure,
+            "timeout": self.read_timeout,
+        }
+
+    def get_query_cache_config(self):
+        """获取查询缓存配置"""
+        return {
+            "enabled": self.query_cache_enabled,
+            "max_entries": self.query_cache_size,
+            "ttl": self.query_cache_ttl,
+            "validate_interval": self.query_cache_validate_interval,
+        }
+
+    def get_import_config(self):
+        """获取数据导入配置"""
+        return {
+            "batch_size": self.import_batch_size,
+            "concurrency": self.import_concurrency,
+            "adaptive": self.import_adaptive,
+            "client_embedding": self.client_embedding,
         }
 
     def get_ollama_config(self):
@@ -28,6 +105,15 @@ class WeaviateConfig:
         return {
             "api_endpoint": self.ollama_api_endpoint,
             "model": self.ollama_model,
+            "batch_size": self.ollama_embed_batch_size,
+            "timeout": (self.connect_timeout, self.ollama_timeout),
+        }
+
+    def get_embedding_cache_config(self):
+        """获取向量缓存配置"""
+        return {
+            "path": self.embedding_cache_path,
+            "max_bytes": self.embedding_cache_max_mb * 1024 * 1024,
         }
 
     def __str__(self):
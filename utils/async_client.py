@@ -0,0 +1,158 @@
+"""
+异步 Weaviate 客户端（asyncio + httpx）
+
+与 WeaviateClient.graphql_query 的用法一致，另外提供 gather()：
+一次并发发送多条查询，总耗时约等于最慢的那一条，而不是所有查询延迟之和。
+
+用法:
+    async with AsyncWeaviateClient() as client:
+        movies, articles = await client.gather([movie_query, article_query])
+
+同步代码中已有 WeaviateClient 时调用 client.gather([...])：复用同一个异步客户端
+（后台事件循环线程），并沿用同步客户端的查询缓存、超时、连接池和重试配置。
+
+AsyncWeaviateClient.from_client(client) 可以在自己的事件循环中得到同样配置的异步客户端。
+"""
+import asyncio
+import threading
+
+import httpx
+
+from config.weaviate_config import config as default_config
+from utils.query_cache import make_key
+
+# 只读的 GraphQL 查询遇到这些状态码时重试（与 WeaviateClient 的 RETRY_STATUS_CODES 一致）
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+RETRY_BACKOFF = 0.3
+
+
+class AsyncWeaviateClient:
+    """基于 httpx.AsyncClient 连接池的异步客户端"""
+
+    def __init__(self, weaviate_url=None, pool_maxsize=None, timeout=None, max_retries=None,
+                 max_concurrency=None, weaviate_config=None, query_cache=None, fingerprint=None):
+        weaviate_config = weaviate_config or default_config
+        pool_config = weaviate_config.get_pool_config()
+        connection_params = weaviate_config.get_connection_params()
+
+        self.weaviate_url = (weaviate_url or connection_params["url"]).rstrip("/")
+        connect_timeout, read_timeout = timeout or connection_params["timeout_config"]
+        if pool_maxsize is None:
+            pool_maxsize = pool_config["pool_maxsize"]
+        if max_retries is None:
+            max_retries = pool_config["max_retries"]
+        self.max_retries = max_retries
+        # 可选的查询结果缓存（utils.query_cache.QueryCache）；fingerprint 为计算数据指纹的同步函数
+        self.query_cache = query_cache
+        self.fingerprint = fingerprint
+
+        # 同时在途的请求数上限，默认与连接池大小一致
+        self.max_concurrency = max_concurrency or pool_maxsize
+        self.http = httpx.AsyncClient(
+            base_url=self.weaviate_url,
+            headers={"Content-Type": "application/json"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+            # httpx 只对建立连接失败进行重试
+            transport=httpx.AsyncHTTPTransport(retries=max_retries),
+        )
+
+    @classmethod
+    def from_client(cls, client, max_concurrency=None):
+        """按同步 WeaviateClient 的配置创建异步客户端（共用同一个查询缓存）"""
+        return cls(weaviate_url=client.weaviate_url, pool_maxsize=client.pool_maxsize, timeout=client.timeout,
+                   max_retries=client.max_retries, max_concurrency=max_concurrency,
+                   query_cache=client.query_cache, fingerprint=client.data_fingerprint)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def graphql_query(self, query, variables=None):
+        """GraphQL查询（启用查询缓存时，相同的查询直接返回缓存结果）"""
+        if self.query_cache is None:
+            return await self._graphql(query, variables)
+
+        if self.fingerprint is not None and self.query_cache.needs_validation():
+            self.query_cache.validate(await asyncio.to_thread(self.fingerprint))
+
+        key = make_key(query, variables)
+        response = self.query_cache.get(key)
+        if response is None:
+            response = await self._graphql(query, variables)
+            # 只缓存成功且没有 GraphQL 错误的结果
+            if response.status_code == 200 and not response.json().get("errors"):
+                self.query_cache.put(key, response)
+        return response
+
+    async def _graphql(self, query, variables=None):
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        attempt = 0
+        while True:
+            response = await self.http.post("/v1/graphql", json=payload)
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+    async def execute(self, query):
+        """执行 utils.query_builder 构建的查询"""
+        text, variables = query.build()
+        return await self.graphql_query(text, variables)
+
+    async def gather(self, queries, max_concurrency=None, return_exceptions=False):
+        """并发执行多条查询，按输入顺序返回响应
+
+        queries 中的元素可以是查询字符串、(查询字符串, 变量) 元组，
+        或 utils.query_builder 中的查询对象。
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(item):
+            async with semaphore:
+                if hasattr(item, "build"):
+                    return await self.execute(item)
+                if isinstance(item, tuple):
+                    return await self.graphql_query(*item)
+                return await self.graphql_query(item)
+
+        return await asyncio.gather(*(run(item) for item in queries),
+                                    return_exceptions=return_exceptions)
+
+
+class BackgroundLoop:
+    """在后台线程中运行的事件循环，让同步代码反复使用同一个异步客户端"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="async-client", daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine):
+        """在后台循环中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def run_queries(queries, weaviate_url=None, max_concurrency=None):
+    """在同步代码中并发执行多条查询（内部创建事件循环和客户端）
+
+    已有 WeaviateClient 时请使用 client.gather(queries)，它复用连接和查询缓存。
+    """
+    async def main():
+        async with AsyncWeaviateClient(weaviate_url=weaviate_url,
+                                       max_concurrency=max_concurrency) as client:
+            return await client.gather(queries)
+
+    return asyncio.run(main())
@@ -0,0 +1,396 @@
+"""
+流式批量导入器
+
+把对象按数量或字节大小分组，通过 /v1/batch/objects 批量写入。
+批量响应中逐个对象的错误会被解析出来，只重试失败的那部分对象。
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils.grpc_transport import GrpcError, GrpcUnavailable
+
+# 整批请求失败时，这些状态码值得重试
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class ImportStats:
+    """导入统计"""
+
+    def __init__(self, max_errors=100):
+        self.added = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self.bytes_sent = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.started_at = time.perf_counter()
+        # 并发导入时多个线程会同时更新统计
+        self._lock = threading.Lock()
+
+    def record_added(self):
+        with self._lock:
+            self.added += 1
+
+    def record_request(self, num_bytes):
+        with self._lock:
+            self.batches += 1
+            self.bytes_sent += num_bytes
+
+    def record_succeeded(self, count):
+        with self._lock:
+            self.succeeded += count
+
+    def record_retried(self, count):
+        with self._lock:
+            self.retried += count
+
+    def record_error(self, obj, message):
+        """记录失败对象（只保留前 max_errors 条，避免内存无限增长）"""
+        with self._lock:
+            self.failed += 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append({
+                    "class": obj.get("class"),
+                    "id": obj.get("id"),
+                    "properties": obj.get("properties"),
+                    "message": message,
+                })
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    @property
+    def objects_per_second(self):
+        elapsed = self.elapsed
+        return self.succeeded / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"ImportStats(succeeded={self.succeeded}, failed={self.failed}, "
+                f"retried={self.retried}, batches={self.batches}, "
+                f"{self.objects_per_second:.0f} obj/s)")
+
+
+class BatchImporter:
+    """按数量/字节上限分批的流式导入器
+
+    用法:
+        with BatchImporter(client, batch_size=200) as importer:
+            for row in rows:
+                importer.add("Movie", row)
+        print(importer.stats)
+    """
+
+    def __init__(self, client, batch_size=100, max_batch_bytes=5 * 1024 * 1024,
+                 max_retries=3, retry_backoff=0.5, on_batch=None):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_batch = on_batch
+        self.stats = ImportStats()
+
+        self._objects = []
+        self._encoded = []
+        self._pending_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finish()
+
+    def add(self, class_name, properties, uuid=None, vector=None):
+        """添加一个对象，达到批次上限时自动发送"""
+        obj = {"class": class_name, "properties": properties}
+        if uuid is not None:
+            obj["id"] = str(uuid)
+        if vector is not None:
+            # 接受 numpy 数组（如 float32 矩阵中的一行）
+            obj["vector"] = vector.tolist() if hasattr(vector, "tolist") else vector
+
+        # 每个对象只序列化一次：既用来统计字节数，也直接作为请求体的一部分
+        encoded = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        if self._objects and self._pending_bytes + len(encoded) > self.max_batch_bytes:
+            self.flush()
+
+        self._objects.append(obj)
+        self._encoded.append(encoded)
+        self._pending_bytes += len(encoded) + 1
+        self.stats.record_added()
+
+        if len(self._objects) >= self.batch_size:
+            self.flush()
+
+    def import_objects(self, class_name, records, vectorizer=None):
+        """从任意可迭代对象流式导入，内存占用只与批次大小有关
+
+        传入 vectorizer（utils.embedding.ClientVectorizer）时在客户端批量计算向量，
+        并随对象一起写入。
+        """
+        if vectorizer is None:
+            for properties in records:
+                self.add(class_name, properties)
+        else:
+            for properties, vector in vectorizer.vectorize(records):
+                self.add(class_name, properties, vector=vector)
+        self.finish()
+        return self.stats
+
+    def finish(self):
+        """发送剩余对象并等待所有请求完成"""
+        self.flush()
+
+    def flush(self):
+        """发送当前缓冲区中的对象"""
+        if not self._objects:
+            return
+        objects, encoded = self._objects, self._encoded
+        self._objects, self._encoded, self._pending_bytes = [], [], 0
+        self._send_with_retry(objects, encoded)
+
+    def _send_with_retry(self, objects, encoded):
+        """发送一批对象，只重试失败的对象"""
+        attempt = 0
+        while objects:
+            failures = self._send(objects, encoded)
+
+            if not failures:
+                break
+            if attempt >= self.max_retries:
+                for index, message in failures:
+                    self.stats.record_error(objects[index], message)
+                break
+
+            attempt += 1
+            self.stats.record_retried(len(failures))
+            time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            objects = [objects[index] for index, _ in failures]
+            encoded = [encoded[index] for index, _ in failures]
+
+        if self.on_batch:
+            self.on_batch(self.stats)
+
+    def _send(self, objects, encoded):
+        """发送一次请求，返回失败对象的 (下标, 错误信息) 列表"""
+        if self.client.grpc is not None:
+            try:
+                return self._send_grpc(objects)
+            except GrpcUnavailable:
+                # 包括通道被其他线程停用时在途的请求：这一批改走 REST 重发
+                self.client.disable_grpc()
+
+        body = b'{"objects":[' + b",".join(encoded) + b"]}"
+        self.stats.record_request(len(body))
+
+        started = time.perf_counter()
+        try:
+            response = self.client.batch_create_objects_encoded(body)
+        except requests.RequestException as e:
+            self._observe(time.perf_counter() - started, overloaded=True)
+            return [(index, f"请求异常: {e}") for index in range(len(objects))]
+
+        overloaded = response.status_code == 429 or response.status_code >= 500
+        self._observe(time.perf_counter() - started, overloaded)
+
+        if response.status_code != 200:
+            message = f"HTTP {response.status_code}: {response.text[:200]}"
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                return [(index, message) for index in range(len(objects))]
+            # 整批被拒绝（如 422 校验错误），重试也没有意义
+            for obj in objects:
+                self.stats.record_error(obj, message)
+            return []
+
+        failures = parse_batch_errors(response.json())
+        self.stats.record_succeeded(len(objects) - len(failures))
+        return failures
+
+    def _send_grpc(self, objects):
+        """通过 gRPC 发送一次请求（GrpcUnavailable 交给调用方回退到 REST）"""
+        started = time.perf_counter()
+        try:
+            failures, num_bytes = self.client.batch_create_objects_grpc(objects)
+        except GrpcUnavailable:
+            raise
+        except GrpcError as e:
+            self._observe(time.perf_counter() - started, overloaded=e.retryable)
+            if e.retryable:
+                return [(index, str(e)) for index in range(len(objects))]
+            for obj in objects:
+                self.stats.record_error(obj, str(e))
+            return []
+
+        self._observe(time.perf_counter() - started, overloaded=False)
+        self.stats.record_request(num_bytes)
+        self.stats.record_succeeded(len(objects) - len(failures))
+        return failures
+
+    def _observe(self, latency, overloaded):
+        """请求完成回调，供并发导入器调整并发度"""
+
+
+class AdaptiveConcurrency:
+    """AIMD（加性增、乘性减）并发度控制器
+
+    - 请求成功且延迟正常：每完成约 limit 个请求，并发上限 +1
+    - 遇到 429/5xx/超时：并发上限减半
+    - 延迟超过基线的 latency_tolerance 倍：并发上限 x0.75
+
+    减小并发之后会有一个冷却期，避免同一拨在途请求把上限连续砍好几次。
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=16,
+                 latency_tolerance=2.0, adaptive=True):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.adaptive = adaptive
+
+        self.in_flight = 0
+        self.baseline_latency = None
+        self.peak = int(initial)
+        self._samples = 0
+        self._limit_sum = 0.0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def current(self):
+        return max(self.min_limit, int(self.limit))
+
+    @property
+    def average(self):
+        return self._limit_sum / self._samples if self._samples else float(self.current)
+
+    def acquire(self):
+        """获取一个在途名额，已满时阻塞（对生产者形成背压）"""
+        with self._cond:
+            while self.in_flight >= self.current:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def observe(self, latency, overloaded):
+        """根据一次请求的延迟和结果调整并发上限"""
+        with self._cond:
+            self._samples += 1
+            self._limit_sum += self.current
+            if not self.adaptive:
+                return
+
+            now = time.perf_counter()
+            if not overloaded:
+                if self.baseline_latency is None or latency < self.baseline_latency:
+                    self.baseline_latency = latency
+
+            slow = (self.baseline_latency is not None
+                    and latency > self.baseline_latency * self.latency_tolerance)
+            if overloaded or slow:
+                if now >= self._cooldown_until:
+                    factor = 0.5 if overloaded else 0.75
+                    self.limit = max(self.min_limit, self.limit * factor)
+                    self._cooldown_until = now + latency
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.current)
+
+            self.peak = max(self.peak, self.current)
+            self._cond.notify_all()
+
+
+class ConcurrentBatchImporter(BatchImporter):
+    """同时保持多个批次在途的导入器
+
+    flush 时把批次提交到线程池；在途批次数由 AdaptiveConcurrency 控制，
+    达到上限时 add() 会阻塞，从而对数据源形成背压。
+
+    用法:
+        with ConcurrentBatchImporter(client, max_concurrency=8) as importer:
+            for row in rows:
+                importer.add("Movie", row)
+        print(importer.stats, importer.concurrency.average)
+    """
+
+    def __init__(self, client, batch_size=100, max_batch_bytes=5 * 1024 * 1024,
+                 max_retries=3, retry_backoff=0.5, on_batch=None,
+                 initial_concurrency=2, min_concurrency=1, max_concurrency=16,
+                 adaptive=True, latency_tolerance=2.0):
+        super().__init__(client, batch_size=batch_size, max_batch_bytes=max_batch_bytes,
+                         max_retries=max_retries, retry_backoff=retry_backoff,
+                         on_batch=on_batch)
+        if not adaptive:
+            initial_concurrency = max_concurrency
+        self.concurrency = AdaptiveConcurrency(
+            initial=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+            latency_tolerance=latency_tolerance,
+            adaptive=adaptive,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="batch-import")
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+
+    def flush(self):
+        """把当前批次提交到线程池（在途批次已满时阻塞）"""
+        if not self._objects:
+            return
+        objects, encoded = self._objects, self._encoded
+        self._objects, self._encoded, self._pending_bytes = [], [], 0
+
+        self.concurrency.acquire()
+        future = self._executor.submit(self._send_with_retry, objects, encoded)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        self.concurrency.release()
+        with self._futures_lock:
+            self._futures.discard(future)
+
+    def finish(self):
+        """发送剩余对象并等待所有在途批次完成"""
+        self.flush()
+        with self._futures_lock:
+            pending = list(self._futures)
+        for future in pending:
+            future.result()
+
+    def close(self):
+        self.finish()
+        self._executor.shutdown(wait=True)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _observe(self, latency, overloaded):
+        self.concurrency.observe(latency, overloaded)
+
+
+def parse_batch_errors(results):
+    """解析批量响应，返回失败对象的 (下标, 错误信息) 列表
+
+    /v1/batch/objects 按请求顺序返回每个对象的结果，
+    失败的对象会带有 result.errors.error[].message。
+    """
+    failures = []
+    for index, item in enumerate(results):
+        errors = (item.get("result") or {}).get("errors") or {}
+        messages = [error.get("message", "") for error in errors.get("error", [])]
+        if messages:
+            failures.append((index, "; ".join(messages)))
+    return failures
@@ -0,0 +1,91 @@
+"""
+按条件批量删除（DELETE /v1/batch/objects）
+
+一个请求删除所有满足 where 条件的对象，代替“导出 id 再逐个 DELETE”或删除整个数据类。
+where 使用与查询相同的 Filter（utils/query_builder.py）。
+
+Weaviate 每个请求最多处理 QUERY_MAXIMUM_RESULTS（默认 10000）个对象，
+响应中的 matches 达到 limit 时说明可能还有剩余，BulkDeleter 会继续发送直到全部删除。
+dry-run 只统计匹配数量，不删除；verbose 时返回每个对象的 id 和状态。
+
+清空数据类（truncate）同样走批量删除：Schema、索引配置和别名都保持不变。
+
+用法:
+    deleter = BulkDeleter(client)
+    print(deleter.delete("Article", Filter.by_property("publishDate").less_than(cutoff)))
+    print(deleter.truncate("Movie"))
+"""
+from utils.query_builder import Filter
+
+# 匹配所有对象的条件（批量删除接口必须给出 where）
+MATCH_ALL = Filter.by_id().like("*")
+
+
+class DeleteStats:
+    """批量删除统计"""
+
+    def __init__(self, class_name, dry_run=False):
+        self.class_name = class_name
+        self.dry_run = dry_run
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+        self.requests = 0
+        # verbose 时的逐个结果: [{"id", "status", "error"?}]
+        self.objects = []
+
+    def __str__(self):
+        return (f"DeleteStats(class={self.class_name}, dry_run={self.dry_run}, matched={self.matched}, "
+                f"deleted={self.deleted}, failed={self.failed}, requests={self.requests})")
+
+
+class BulkDeleter:
+    """按 where 条件批量删除对象"""
+
+    def __init__(self, client, max_requests=1000):
+        self.client = client
+        # 防止删除失败时无限循环
+        self.max_requests = max_requests
+
+    def delete(self, class_name, where, dry_run=False, verbose=False, tenant=None):
+        """删除满足条件的对象，返回 DeleteStats；请求失败时抛出 RuntimeError
+
+        where 为 Filter 或 REST where JSON。dry_run 时只发送一次请求，匹配数量超过单次上限且
+        where 为 Filter 时再用 Aggregate 统计总数（否则 matched 为单次上限）。
+        """
+        query_filter = where if isinstance(where, Filter) else None
+        where = where.to_dict() if query_filter is not None else where
+        stats = DeleteStats(class_name, dry_run)
+        while True:
+            results = self._send(class_name, where, dry_run, verbose, tenant)
+            stats.requests += 1
+            stats.matched += results.get("matches", 0)
+            stats.deleted += results.get("successful", 0)
+            stats.failed += results.get("failed", 0)
+            stats.objects.extend(results.get("objects") or [])
+
+            limit = results.get("limit")
+            truncated = bool(limit) and results.get("matches", 0) >= limit
+            if not truncated:
+                return stats
+            if dry_run:
+                if query_filter is not None:
+                    stats.matched = self.client.get_object_count(class_name, tenant=tenant, where=query_filter)
+                return stats
+            if not results.get("successful"):
+                # 这一轮一个都没删掉，再发也是同样的结果
+                return stats
+            if stats.requests >= self.max_requests:
+                raise RuntimeError(f"删除 {class_name} 已发送 {stats.requests} 个请求仍未完成: {stats}")
+
+    def truncate(self, class_name, dry_run=False, tenant=None):
+        """清空数据类（或其中一个租户）的所有对象，保留 Schema"""
+        return self.delete(class_name, MATCH_ALL, dry_run=dry_run, tenant=tenant)
+
+    def _send(self, class_name, where, dry_run, verbose, tenant):
+        response = self.client.batch_delete_objects(class_name, where, dry_run=dry_run, verbose=verbose,
+                                                    tenant=tenant)
+        if response.status_code != 200:
+            raise RuntimeError(f"批量删除 {class_name} 失败: HTTP {response.status_code} {response.text[:200]}")
+        return response.json().get("results") or {}
+
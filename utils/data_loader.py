@@ -0,0 +1,235 @@
+"""
+流式数据加载工具
+
+从 JSONL / CSV / Parquet 文件逐行读取记录（生成器，不会把整个文件读进内存），
+并按照 Weaviate 数据类的属性定义完成列名映射和类型转换。
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import date, datetime, timezone
+
+
+def _open_text(path, encoding="utf-8"):
+    """打开文本文件，支持 .gz 压缩"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding=encoding, newline="")
+    return open(path, "r", encoding=encoding, newline="")
+
+
+def read_jsonl(path, encoding="utf-8"):
+    """逐行读取 JSONL 文件"""
+    with _open_text(path, encoding) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number} 不是合法的 JSON: {e}") from e
+
+
+def read_csv(path, delimiter=",", encoding="utf-8"):
+    """逐行读取 CSV 文件（第一行为表头）"""
+    with _open_text(path, encoding) as f:
+        for row in csv.DictReader(f, delimiter=delimiter):
+            yield row
+
+
+def read_parquet(path, columns=None, batch_size=10000):
+    """按 row group 分批读取 Parquet 文件（需要 pyarrow）"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("读取 Parquet 需要安装 pyarrow: pip install pyarrow") from e
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        for row in batch.to_pylist():
+            yield row
+
+
+READERS = {
+    ".jsonl": read_jsonl,
+    ".ndjson": read_jsonl,
+    ".csv": read_csv,
+    ".parquet": read_parquet,
+}
+
+
+def detect_format(path):
+    """根据扩展名判断文件格式"""
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"不支持的文件格式: {path}（支持 {', '.join(READERS)}）")
+    return ext
+
+
+def read_records(path, file_format=None, **kwargs):
+    """按文件格式读取原始记录"""
+    ext = file_format or detect_format(path)
+    return READERS[ext](path, **kwargs)
+
+
+# ============ 可续读 ============
+
+class _LineCounter:
+    """逐行解码二进制文件并记录已读取的字节数
+
+    csv 模块按需逐行读取，每产出一条记录时恰好停在该记录的行尾。
+    """
+
+    def __init__(self, f, encoding):
+        self.f = f
+        self.encoding = encoding
+        self.position = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode(self.encoding)
+
+    def seek(self, position):
+        self.f.seek(position)
+        self.position = position
+
+
+def _read_jsonl_from(path, position=0, encoding="utf-8"):
+    with open(path, "rb") as f:
+        f.seek(position)
+        for line in f:
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line.decode(encoding)), position
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path} 偏移 {position - len(line)} 处不是合法的 JSON: {e}") from e
+
+
+def _read_csv_from(path, position=0, delimiter=",", encoding="utf-8"):
+    with open(path, "rb") as f:
+        lines = _LineCounter(f, encoding)
+        # 每次都从文件开头读取表头，再跳到续读位置
+        fieldnames = next(csv.reader(lines, delimiter=delimiter), None)
+        if fieldnames is None:
+            return
+        if position > lines.position:
+            lines.seek(position)
+        for row in csv.DictReader(lines, fieldnames=fieldnames, delimiter=delimiter):
+            yield row, lines.position
+
+
+SEEKABLE_READERS = {
+    ".jsonl": _read_jsonl_from,
+    ".ndjson": _read_jsonl_from,
+    ".csv": _read_csv_from,
+}
+
+
+def read_records_from(path, file_format=None, position=0, **kwargs):
+    """从续读位置开始读取原始记录，产出 (记录, 这条记录之后的续读位置)
+
+    未压缩的 JSONL / CSV 的位置是字节偏移，直接 seek 过去；其余格式（.gz、Parquet）
+    的位置是已读取的记录数，续读时跳过前面的原始记录（不做类型转换）。
+    """
+    ext = file_format or detect_format(path)
+    if ext in SEEKABLE_READERS and not path.endswith(".gz"):
+        yield from SEEKABLE_READERS[ext](path, position, **kwargs)
+        return
+    for count, row in enumerate(read_records(path, ext, **kwargs), 1):
+        if count > position:
+            yield row, count
+
+
+# ============ 类型转换 ============
+
+def to_rfc3339(value):
+    """把日期/时间转换为 Weaviate 需要的 RFC3339 字符串"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return f"{value.isoformat()}T00:00:00Z"
+
+    text = str(value).strip()
+    if len(text) == 10:
+        # 只有日期部分: 2024-01-31
+        return f"{text}T00:00:00Z"
+    return to_rfc3339(datetime.fromisoformat(text.replace("Z", "+00:00")))
+
+
+def to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "t")
+
+
+CONVERTERS = {
+    "text": str,
+    "string": str,
+    "int": lambda v: int(float(v)) if isinstance(v, str) else int(v),
+    "number": float,
+    "boolean": to_bool,
+    "date": to_rfc3339,
+    "uuid": str,
+}
+
+
+class PropertyMapper:
+    """把源数据的一行映射为 Weaviate 对象属性
+
+    class_definition 是 /v1/schema 中的数据类定义（或 02_schema_creation.py 中的 dict），
+    field_map 把源列名映射到属性名，未映射的列按同名属性处理，不在 Schema 中的列会被丢弃。
+    """
+
+    def __init__(self, class_definition, field_map=None):
+        self.class_name = class_definition["class"]
+        self.field_map = field_map or {}
+        self.converters = {}
+
+        for prop in class_definition.get("properties", []):
+            data_type = prop["dataType"][0]
+            if data_type.endswith("[]"):
+                item_converter = CONVERTERS.get(data_type[:-2], lambda v: v)
+                self.converters[prop["name"]] = self._array_converter(item_converter)
+            else:
+                self.converters[prop["name"]] = CONVERTERS.get(data_type, lambda v: v)
+
+    @staticmethod
+    def _array_converter(item_converter):
+        def convert(value):
+            if isinstance(value, str):
+                value = json.loads(value) if value.startswith("[") else value.split("|")
+            return [item_converter(item) for item in value]
+        return convert
+
+    def map(self, row):
+        """转换一行数据，空值（None / 空字符串）会被省略"""
+        properties = {}
+        for column, value in row.items():
+            name = self.field_map.get(column, column)
+            converter = self.converters.get(name)
+            if converter is None or value is None or value == "":
+                continue
+            try:
+                properties[name] = converter(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{self.class_name}.{name} 的值无法转换: {value!r} ({e})") from e
+        return properties
+
+
+def load_objects(path, class_definition, field_map=None, file_format=None, **reader_kwargs):
+    """流式读取文件并映射为数据类属性（生成器）"""
+    mapper = PropertyMapper(class_definition, field_map)
+    for row in read_records(path, file_format, **reader_kwargs):
+        yield mapper.map(row)
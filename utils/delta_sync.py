@@ -0,0 +1,230 @@
+"""
+增量同步：只处理上次同步之后变化的记录
+
+两种数据源：
+- UpdatedAtSource: 普通数据文件（JSONL / CSV / Parquet）中带更新时间列，只处理更新时间
+  不早于水位线的行；可选的删除标记列为真时删除对应对象。文件不要求按时间排序，
+  因此整个文件处理完成后才推进水位线。
+- ChangeLogSource: 追加写入的 JSONL 变更日志，每行 {"op": "upsert" | "delete", "record": {...}}，
+  水位线是已处理到的字节偏移，每写完一段就推进，中断后从断点继续。
+
+写入复用 utils/upsert.py：对象 id 由自然键确定，内容没有变化的记录直接跳过
+（水位线边界上的行被重复处理也没有代价）；删除按 id 批量执行（utils/bulk_delete.py）。
+水位线通过 utils/state_file.py 原子写入，只有一段变更全部写入成功之后才会推进。
+
+用法:
+    sync = DeltaSync(client, class_definition, ChangeLogSource("changes.jsonl"), ("title", "year"))
+    print(sync.run())
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+from utils.batch_importer import BatchImporter
+from utils.bulk_delete import BulkDeleter
+from utils.data_loader import PropertyMapper, read_records, to_bool
+from utils.query_builder import Filter
+from utils.state_file import load_state, remove_state, save_state
+from utils.upsert import object_uuid, upsert_objects
+
+
+def default_state_path(class_name):
+    return os.path.join(".cache", f"sync-{class_name}.json")
+
+
+def watermark_value(value):
+    """把更新时间列的值转换为可比较的水位线：数值原样保留，日期统一为 UTC 的定长字符串"""
+    if isinstance(value, bool):
+        raise ValueError(f"无法作为更新时间: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, datetime):
+        text = str(value).strip()
+        try:
+            return float(text)
+        except ValueError:
+            pass
+        try:
+            value = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"无法解析更新时间: {value!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class UpdatedAtSource:
+    """按更新时间列筛选变化的行"""
+
+    kind = "updated-at"
+    checkpointable = False
+
+    def __init__(self, path, column="updatedAt", deleted_column=None, file_format=None):
+        self.path = path
+        self.column = column
+        self.deleted_column = deleted_column
+        self.file_format = file_format
+        self.watermark = None
+
+    def changes(self, watermark):
+        """生成器：产出 (op, 原始行)；结束后 self.watermark 为新的水位线"""
+        self.watermark = watermark
+        for row in read_records(self.path, self.file_format):
+            value = row.get(self.column)
+            if value is None or value == "":
+                raise ValueError(f"{self.path} 中有缺少更新时间列 {self.column} 的行: {row}")
+            updated_at = watermark_value(value)
+            try:
+                if watermark is not None and updated_at < watermark:
+                    continue
+                if self.watermark is None or updated_at > self.watermark:
+                    self.watermark = updated_at
+            except TypeError:
+                raise ValueError(f"更新时间 {value!r} 与水位线 {watermark!r} 类型不一致，请重置水位线")
+            deleted = self.deleted_column and to_bool(row.get(self.deleted_column) or False)
+            yield ("delete" if deleted else "upsert"), row
+
+
+class ChangeLogSource:
+    """追加写入的 JSONL 变更日志（水位线为字节偏移）"""
+
+    kind = "changelog"
+    checkpointable = True
+
+    def __init__(self, path):
+        self.path = path
+        self.watermark = None
+
+    def changes(self, watermark):
+        """生成器：产出 (op, record)；self.watermark 始终指向最后产出的一行之后"""
+        offset = self.watermark = watermark or 0
+        size = os.path.getsize(self.path)
+        if offset > size:
+            raise RuntimeError(f"变更日志 {self.path} 只有 {size} 字节，小于水位线 {offset}，"
+                               f"文件可能被截断或轮转，请重置水位线")
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # 最后一行还没有写完，下次再处理
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{self.path} 偏移 {offset - len(line)} 处不是合法的 JSON: {e}") from e
+                op = entry.get("op", "upsert")
+                if op not in ("upsert", "delete"):
+                    raise ValueError(f"不支持的变更类型: {op!r}")
+                self.watermark = offset
+                yield op, entry.get("record") or {}
+
+
+class SyncStats:
+    """增量同步统计"""
+
+    def __init__(self):
+        self.changes = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.watermark = None
+
+    def __str__(self):
+        return (f"SyncStats(changes={self.changes}, created={self.created}, updated={self.updated}, "
+                f"unchanged={self.unchanged}, deleted={self.deleted}, watermark={self.watermark!r})")
+
+
+class DeltaSync:
+    """把数据源中的变化同步到一个数据类"""
+
+    def __init__(self, client, class_definition, source, key_fields, state_path=None, vectorizer=None,
+                 batch_size=100, chunk_size=1000, field_map=None):
+        self.client = client
+        self.class_name = class_definition["class"]
+        self.source = source
+        self.key_fields = tuple(key_fields)
+        self.state_path = state_path or default_state_path(self.class_name)
+        self.vectorizer = vectorizer
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.class_definition = class_definition
+        self.mapper = PropertyMapper(class_definition, field_map)
+
+    def load_state(self):
+        state = load_state(self.state_path)
+        if state is None:
+            return {"class": self.class_name, "kind": self.source.kind,
+                    "source": os.path.abspath(self.source.path), "watermark": None}
+        if (state.get("class"), state.get("kind")) != (self.class_name, self.source.kind) \
+                or state.get("source") != os.path.abspath(self.source.path):
+            raise RuntimeError(f"状态文件 {self.state_path} 属于另一个数据源"
+                               f"（{state.get('kind')} {state.get('source')} -> {state.get('class')}），"
+                               f"请指定其他状态文件或重置水位线")
+        return state
+
+    def reset(self):
+        """删除水位线，下次同步从头开始"""
+        remove_state(self.state_path)
+
+    def run(self):
+        """同步一次，返回 SyncStats；写入失败时抛出 RuntimeError（水位线不推进）"""
+        state = self.load_state()
+        stats = SyncStats()
+        chunk = []
+        for op, row in self.source.changes(state["watermark"]):
+            chunk.append((op, row))
+            if len(chunk) >= self.chunk_size:
+                self._apply(chunk, stats)
+                chunk = []
+                if self.source.checkpointable:
+                    self._save(state, stats)
+        if chunk:
+            self._apply(chunk, stats)
+        self._save(state, stats)
+        return stats
+
+    def _save(self, state, stats):
+        state["watermark"] = stats.watermark = self.source.watermark
+        state["synced_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        save_state(self.state_path, state)
+
+    def _apply(self, chunk, stats):
+        """写入一段变更：同一对象出现多次时以最后一次为准"""
+        latest = {}
+        for op, row in chunk:
+            properties = self.mapper.map(row)
+            if op == "delete" and row.get("id") and not all(field in properties for field in self.key_fields):
+                # 删除记录可以只给出对象 id
+                object_id = str(row["id"])
+            else:
+                object_id = object_uuid(self.class_name, properties, self.key_fields)
+            latest[object_id] = (op, properties)
+        stats.changes += len(chunk)
+
+        upserts = [properties for op, properties in latest.values() if op == "upsert"]
+        deletes = [object_id for object_id, (op, _) in latest.items() if op == "delete"]
+        if upserts:
+            with BatchImporter(self.client, batch_size=self.batch_size) as importer:
+                upsert = upsert_objects(importer, self.class_name, upserts, self.key_fields, self.vectorizer,
+                                        class_definition=self.class_definition)
+            if importer.stats.failed:
+                raise RuntimeError(f"同步 {self.class_name} 时 {importer.stats.failed} 个对象写入失败，"
+                                   f"水位线未推进: {importer.stats.errors[0]['message']}")
+            stats.created += upsert.created
+            stats.updated += upsert.updated
+            stats.unchanged += upsert.unchanged
+        for start in range(0, len(deletes), self.batch_size):
+            stats.deleted += self._delete(deletes[start:start + self.batch_size])
+
+    def _delete(self, ids):
+        try:
+            stats = BulkDeleter(self.client).delete(self.class_name, Filter.by_id().contains_any(ids))
+        except RuntimeError as e:
+            raise RuntimeError(f"{e}，水位线未推进") from e
+        if stats.failed:
+            raise RuntimeError(f"删除 {self.class_name} 时 {stats.failed} 个对象失败，水位线未推进")
+        return stats.deleted
@@ -0,0 +1,136 @@
+"""
+客户端向量化工具
+
+默认情况下 Weaviate 的 text2vec-ollama 模块会在导入时逐个对象调用 Ollama。
+这里提供客户端批量向量化：一次请求把多段文本发送到 Ollama 的 /api/embed，
+再把向量随对象一起写入（Weaviate 收到自带向量的对象时不会再调用向量化模块）。
+"""
+import re
+
+import numpy as np
+
+from config.weaviate_config import config as default_config
+from utils.weaviate_client import create_session
+
+
+class OllamaEmbedder:
+    """批量调用 Ollama /api/embed 的向量化器"""
+
+    def __init__(self, api_endpoint=None, model=None, batch_size=None, timeout=None,
+                 ollama_config=None):
+        ollama_config = ollama_config or default_config.get_ollama_config()
+        self.api_endpoint = (api_endpoint or ollama_config["api_endpoint"]).rstrip("/")
+        self.model = model or ollama_config["model"]
+        self.batch_size = batch_size or ollama_config["batch_size"]
+        self.timeout = timeout or ollama_config["timeout"]
+        self.session = create_session(pool_connections=1, pool_maxsize=4)
+        self.requests_sent = 0
+
+    def embed(self, texts):
+        """向量化一组文本，按 batch_size 拆分请求，返回与输入顺序一致的向量列表"""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_batch(texts[start:start + self.batch_size]))
+        return vectors
+
+    def embed_one(self, text):
+        """向量化单段文本"""
+        return self.embed([text])[0]
+
+    def _embed_batch(self, texts):
+        response = self.session.post(
+            f"{self.api_endpoint}/api/embed",
+            json={"model": self.model, "input": texts},
+            timeout=self.timeout,
+        )
+        self.requests_sent += 1
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama 向量化失败: HTTP {response.status_code} {response.text[:200]}")
+
+        embeddings = response.json().get("embeddings", [])
+        if len(embeddings) != len(texts):
+            raise RuntimeError(f"Ollama 返回了 {len(embeddings)} 个向量，期望 {len(texts)} 个")
+        return embeddings
+
+    def close(self):
+        self.session.close()
+
+
+def create_embedder(weaviate_config=None):
+    """按配置创建向量化器，配置了 EMBEDDING_CACHE_PATH 时带持久化缓存"""
+    from utils.embedding_cache import CachedEmbedder, EmbeddingCache
+
+    weaviate_config = weaviate_config or default_config
+    embedder = OllamaEmbedder(ollama_config=weaviate_config.get_ollama_config())
+
+    cache_config = weaviate_config.get_embedding_cache_config()
+    if not cache_config["path"]:
+        return embedder
+    return CachedEmbedder(embedder, EmbeddingCache(cache_config["path"], cache_config["max_bytes"]))
+
+
+def concepts_vector(embedder, concepts):
+    """把 nearText 的多个概念合成一个查询向量（取平均，与 Weaviate 的做法一致）"""
+    vectors = np.asarray(embedder.embed(list(concepts)), dtype=np.float32)
+    return vectors.mean(axis=0)
+
+
+def split_class_name(class_name):
+    """把驼峰类名拆成小写单词（与 Weaviate 的 vectorizeClassName 行为一致）"""
+    return " ".join(word.lower() for word in re.findall(r"[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])", class_name))
+
+
+def vectorized_fields(class_definition, module="text2vec-ollama"):
+    """参与向量化的属性：moduleConfig 中 skip 为 False 的 text 属性，返回 [(属性名, vectorizePropertyName)]"""
+    fields = []
+    for prop in class_definition.get("properties", []):
+        if prop["dataType"][0] not in ("text", "text[]", "string", "string[]"):
+            continue
+        prop_config = (prop.get("moduleConfig") or {}).get(module, {})
+        if prop_config.get("skip", False):
+            continue
+        fields.append((prop["name"], prop_config.get("vectorizePropertyName", False)))
+    return fields
+
+
+class ClientVectorizer:
+    """按数据类 Schema 在客户端拼接文本并批量向量化
+
+    参与向量化的属性取自 moduleConfig 中 skip 为 False 的 text 属性，
+    拼接方式近似 Weaviate text2vec 模块（类名 + 属性名(可选) + 属性值）。
+    """
+
+    def __init__(self, embedder, class_definition, module="text2vec-ollama"):
+        self.embedder = embedder
+        self.class_name = class_definition["class"]
+
+        class_module_config = (class_definition.get("moduleConfig") or {}).get(module, {})
+        self.vectorize_class_name = class_module_config.get("vectorizeClassName", True)
+        self.fields = vectorized_fields(class_definition, module)
+
+    def text_for(self, properties):
+        """拼接一个对象参与向量化的文本"""
+        parts = [split_class_name(self.class_name)] if self.vectorize_class_name else []
+        for name, vectorize_name in self.fields:
+            value = properties.get(name)
+            if value is None:
+                continue
+            if isinstance(value, list):
+                value = " ".join(str(item) for item in value)
+            parts.append(f"{name} {value}" if vectorize_name else str(value))
+        return " ".join(parts)
+
+    def vectorize(self, records):
+        """生成器：每攒够一批记录调用一次向量化接口，产出 (properties, vector)"""
+        chunk = []
+        for properties in records:
+            chunk.append(properties)
+            if len(chunk) >= self.embedder.batch_size:
+                yield from self._vectorize_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._vectorize_chunk(chunk)
+
+    def _vectorize_chunk(self, chunk):
+        vectors = self.embedder.embed([self.text_for(properties) for properties in chunk])
+        return zip(chunk, vectors)
@@ -0,0 +1,173 @@
+"""
+持久化向量缓存
+
+以 sha256(模型名 + 文本) 为键，把向量以 float32 二进制存入 SQLite。
+超过容量上限时按最近访问时间（LRU）淘汰。未命中时新计算的向量同样舍入到 float32 再返回，
+同一段文本无论是否命中缓存得到的向量都完全相同。重复导入未变化的文本、
+重复出现的 nearText 概念都不会再次调用向量化接口。
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+
+def to_float32(vector):
+    """把向量舍入为 float32 精度的 float 列表（与缓存中存储的精度一致）"""
+    return array("f", vector).tolist()
+
+
+def cache_key(model, text):
+    """计算缓存键: sha256(model \\0 text)"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """基于 SQLite 的 LRU 向量缓存"""
+
+    def __init__(self, path, max_bytes=1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access)")
+        self._conn.commit()
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, keys):
+        """批量查询，返回 {key: vector}（命中的条目会刷新访问时间）"""
+        found = {}
+        if not keys:
+            return found
+        now = time.time_ns()
+        with self._lock:
+            # SQLite 单条语句的参数个数有限制，分块查询
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items):
+        """批量写入 [(key, vector), ...]，写入后按需淘汰"""
+        if not items:
+            return
+        now = time.time_ns()
+        rows = []
+        for key, vector in items:
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+
+        with self._lock:
+            # 覆盖已有条目时要先扣掉旧条目的大小
+            replaced = 0
+            for start in range(0, len(rows), 500):
+                chunk = [row[0] for row in rows[start:start + 500]]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self.total_bytes += sum(row[2] for row in rows) - replaced
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self):
+        """超过上限时删除最久未访问的条目，直到降到上限的 90%"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        cursor = self._conn.execute("SELECT key, size FROM embeddings ORDER BY last_access")
+        victims = []
+        for key, size in cursor:
+            if self.total_bytes <= target:
+                break
+            victims.append((key,))
+            self.total_bytes -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedder:
+    """为任意向量化器（如 OllamaEmbedder）加上持久化缓存
+
+    同一批文本中的重复项只向量化一次，缓存命中的文本不会发送到 Ollama。
+    """
+
+    def __init__(self, embedder, cache):
+        self.embedder = embedder
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self):
+        return self.embedder.model
+
+    @property
+    def batch_size(self):
+        return self.embedder.batch_size
+
+    def embed(self, texts):
+        keys = [cache_key(self.model, text) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        vectors = self.cache.get_many(unique_keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            new_vectors = self.embedder.embed(list(missing.values()))
+            new_items = [(key, to_float32(vector)) for key, vector in zip(missing.keys(), new_vectors)]
+            self.cache.put_many(new_items)
+            vectors.update(new_items)
+
+        return [vectors[key] for key in keys]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def close(self):
+        self.embedder.close()
+        self.cache.close()
@@ -0,0 +1,1309 @@
+"""
+本地 Weaviate 替身（离线运行脚本、基准测试和压测）
+
+在后台线程中启动一个 HTTP 服务器，实现本仓库用到的接口：
+- /v1/meta、/v1/.well-known/ready
+- /v1/schema（数据类、属性）、/v1/aliases
+- /v1/objects（增删改查、after 游标分页）、/v1/batch/objects（批量写入 / 按条件删除）
+- /v1/graphql 的 Get / Aggregate：where、sort、limit / offset / after、tenant、
+  nearText / nearVector / hybrid / bm25，以及 _additional { id distance certainty score vector }
+- Ollama 兼容的 /api/embed
+
+向量搜索使用 numpy 精确搜索（结果就是 ground truth）。vectorizer 为 text2vec-* 的数据类
+在写入和 nearText 时使用确定性的哈希向量化器（HashEmbedder）；客户端向量化也指向
+本服务器的 /api/embed 时，两边得到的向量完全一致。
+FaultInjector 为请求注入延迟、5xx 错误和 429 限流，用来压测重试、自适应并发和降级逻辑。
+
+与真实 Weaviate 的差异：文本的 Equal 按整个值比较（忽略大小写），不实现分词规则；
+不支持交叉引用、多向量、分组和 gRPC。
+
+用法:
+    python -m utils.fake_weaviate --port 8080 --latency 0.005 --error-rate 0.01
+    # 然后设置 WEAVIATE_URL=http://localhost:8080 OLLAMA_API_ENDPOINT=http://localhost:8080
+
+    with FakeWeaviate() as server:
+        client = WeaviateClient(weaviate_url=server.url)
+"""
+import argparse
+import copy
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid as uuid_lib
+from datetime import datetime
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from utils.embedding import ClientVectorizer
+
+QUERY_DEFAULTS_LIMIT = 10
+QUERY_MAXIMUM_RESULTS = 10000
+
+
+# ============ 哈希向量化 ============
+
+_WORDS = re.compile(r"[\u4e00-\u9fff]+|[0-9A-Za-z]+")
+
+
+def tokenize(text):
+    """分词：英文/数字按单词（小写），中文按单字加相邻两字"""
+    tokens = []
+    for chunk in _WORDS.findall(text or ""):
+        if "\u4e00" <= chunk[0] <= "\u9fff":
+            tokens.extend(chunk)
+            tokens.extend(chunk[i:i + 2] for i in range(len(chunk) - 1))
+        else:
+            tokens.append(chunk.lower())
+    return tokens
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token):
+    # 不使用内置 hash()，保证不同进程之间结果一致
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HashEmbedder:
+    """确定性的特征哈希向量化器，接口与 OllamaEmbedder 一致
+
+    共享的词越多，文本的向量越接近，nearText 的结果因此有意义。
+    """
+
+    def __init__(self, dims=256, model="fake-hash", batch_size=32):
+        self.dims = dims
+        self.model = model
+        self.batch_size = batch_size
+        self.requests_sent = 0
+
+    def embed_array(self, text):
+        """向量化单段文本，返回 L2 归一化的 float32 数组"""
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for token in tokenize(text):
+            value = _token_hash(token)
+            vector[value % self.dims] += 1.0 if (value >> 32) & 1 else -1.0
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return vector / norm
+
+    def embed(self, texts):
+        self.requests_sent += 1
+        return [self.embed_array(text).tolist() for text in texts]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def close(self):
+        pass
+
+
+# ============ 故障注入 ============
+
+class FaultInjector:
+    """按概率为请求注入延迟、错误（503）和限流（429）
+
+    只作用于路径以 paths 中任一前缀开头的请求；/v1/meta 和健康检查不受影响。
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, seed=None,
+                 paths=("/v1/",)):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.paths = tuple(paths)
+        self.injected_errors = 0
+        self.injected_throttles = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self, path):
+        """按配置延迟，返回要注入的 HTTP 状态码（不注入时返回 None）"""
+        if not path.startswith(self.paths) or path.startswith(("/v1/meta", "/v1/.well-known")):
+            return None
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+            status = None
+            if roll < self.error_rate:
+                status = 503
+                self.injected_errors += 1
+            elif roll < self.error_rate + self.throttle_rate:
+                status = 429
+                self.injected_throttles += 1
+        if delay > 0:
+            time.sleep(delay)
+        return status
+
+
+# ============ where 过滤 ============
+
+class FakeError(Exception):
+    """请求错误：status 为 REST 接口返回的状态码"""
+
+    def __init__(self, message, status=422):
+        super().__init__(message)
+        self.status = status
+
+
+_VALUE_KEYS = ("valueText", "valueString", "valueInt", "valueNumber", "valueBoolean", "valueDate")
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise FakeError(f"无法解析日期: {value!r}")
+
+
+def _normalize(value, kind):
+    """把属性值 / 条件值转换为可比较的形式"""
+    if value is None:
+        return None
+    if kind == "valueDate":
+        return _parse_date(value)
+    if kind in ("valueText", "valueString"):
+        return str(value).lower()
+    if kind in ("valueInt", "valueNumber"):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise FakeError(f"{value!r} 不是数值")
+    return value
+
+
+def _property_value(obj, path):
+    if len(path) != 1:
+        raise FakeError(f"不支持交叉引用路径: {path}")
+    name = path[0]
+    if name == "id":
+        return obj["id"]
+    if name in ("_creationTimeUnix", "_lastUpdateTimeUnix"):
+        return str(obj[name[1:]])
+    return obj["properties"].get(name)
+
+
+def _like(pattern):
+    regex = "".join(".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern)
+    return re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL)
+
+
+def matches(obj, where):
+    """对象是否满足 where 条件（Weaviate 的 where JSON 结构）"""
+    if not where:
+        return True
+    operator = where.get("operator")
+    if operator == "And":
+        return all(matches(obj, operand) for operand in where.get("operands") or [])
+    if operator == "Or":
+        return any(matches(obj, operand) for operand in where.get("operands") or [])
+
+    value = _property_value(obj, where.get("path") or [])
+    if operator == "IsNull":
+        return (value is None) == bool(where.get("valueBoolean"))
+
+    kind = next((key for key in _VALUE_KEYS if key in where), None)
+    if kind is None:
+        raise FakeError(f"where 条件缺少值: {where}")
+    wanted = where[kind]
+    if value is None:
+        return operator == "NotEqual"
+
+    values = value if isinstance(value, list) else [value]
+    actual = [_normalize(item, kind) for item in values]
+    if operator in ("ContainsAny", "ContainsAll"):
+        targets = [_normalize(item, kind) for item in (wanted if isinstance(wanted, list) else [wanted])]
+        check = any if operator == "ContainsAny" else all
+        return check(target in actual for target in targets)
+
+    target = _normalize(wanted, kind)
+    if operator == "Equal":
+        return target in actual
+    if operator == "NotEqual":
+        return target not in actual
+    if operator == "Like":
+        pattern = _like(str(wanted))
+        return any(pattern.match(str(item)) for item in values)
+    comparisons = {
+        "GreaterThan": lambda a: a > target,
+        "GreaterThanEqual": lambda a: a >= target,
+        "LessThan": lambda a: a < target,
+        "LessThanEqual": lambda a: a <= target,
+    }
+    if operator not in comparisons:
+        raise FakeError(f"不支持的运算符: {operator}")
+    try:
+        return any(comparisons[operator](item) for item in actual)
+    except TypeError:
+        raise FakeError(f"{operator} 无法比较 {value!r} 与 {wanted!r}")
+
+
+# ============ 数据存储 ============
+
+class _Snapshot:
+    """一个数据类在某个版本下的只读视图：按 id 排序的对象和向量矩阵"""
+
+    def __init__(self, objects, metric):
+        self.objects = objects
+        self.rows = np.array([obj["vector"] is not None for obj in objects], dtype=bool)
+        vectors = [obj["vector"] for obj in objects if obj["vector"] is not None]
+        self.matrix = np.stack(vectors) if vectors else None
+        if self.matrix is not None and metric == "cosine":
+            norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.matrix = self.matrix / norms
+        self.has_tenants = any(obj["tenant"] for obj in objects)
+        self._postings = {}
+
+    def postings(self, names):
+        """指定文本属性上的倒排表 {词: (对象下标数组, 词频数组)}（按快照缓存）"""
+        postings = self._postings.get(names)
+        if postings is None:
+            lists = {}
+            for position, obj in enumerate(self.objects):
+                counts = {}
+                for name in names:
+                    value = obj["properties"].get(name)
+                    if value is None:
+                        continue
+                    for token in tokenize(" ".join(value) if isinstance(value, list) else str(value)):
+                        counts[token] = counts.get(token, 0) + 1
+                for token, count in counts.items():
+                    lists.setdefault(token, []).append((position, count))
+            postings = self._postings[names] = {
+                token: (np.array([p for p, _ in items], dtype=np.int64),
+                        np.array([c for _, c in items], dtype=np.float32))
+                for token, items in lists.items()
+            }
+        return postings
+
+    def distances(self, vector, metric):
+        """所有对象到 vector 的距离（没有向量的对象为 inf）"""
+        result = np.full(len(self.objects), np.inf, dtype=np.float32)
+        if self.matrix is None:
+            return result
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape[0] != self.matrix.shape[1]:
+            raise FakeError(f"向量维度 {vector.shape[0]} 与数据类的 {self.matrix.shape[1]} 不一致")
+        if metric == "cosine":
+            norm = float(np.linalg.norm(vector)) or 1.0
+            scores = 1.0 - self.matrix @ (vector / norm)
+        elif metric == "dot":
+            scores = -(self.matrix @ vector)
+        elif metric == "l2-squared":
+            scores = ((self.matrix - vector) ** 2).sum(axis=1)
+        else:
+            raise FakeError(f"不支持的距离: {metric}")
+        result[self.rows] = scores
+        return result
+
+
+class FakeStore:
+    """内存中的数据类、对象和别名（线程安全）"""
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashEmbedder()
+        self.classes = {}
+        self.aliases = {}
+        self.stats = {"objects_written": 0, "embeddings": 0, "queries": 0}
+        self._objects = {}
+        self._versions = {}
+        self._snapshots = {}
+        self._vectorizers = {}
+        self._dims = {}
+        self._lock = threading.RLock()
+
+    # ---------- Schema ----------
+
+    def resolve(self, name, required=True, aliases=True):
+        """类名或别名 -> 数据类名（首字母大小写不敏感）
+
+        与 Weaviate 一致，/v1/schema/{class} 不解析别名（aliases=False）。
+        """
+        with self._lock:
+            if name:
+                candidate = name[0].upper() + name[1:]
+                if candidate in self.classes:
+                    return candidate
+                target = self.aliases.get(candidate) if aliases else None
+                if target in self.classes:
+                    return target
+            if required:
+                raise FakeError(f"数据类 {name} 不存在", status=404)
+            return None
+
+    def create_class(self, definition):
+        definition = copy.deepcopy(definition)
+        name = definition.get("class") or ""
+        if not re.match(r"^[A-Za-z][_0-9A-Za-z]*$", name):
+            raise FakeError(f"非法的类名: {name!r}")
+        name = definition["class"] = name[0].upper() + name[1:]
+        with self._lock:
+            if name in self.classes or name in self.aliases:
+                raise FakeError(f"class name {name} already exists")
+            definition.setdefault("vectorizer", "none")
+            definition.setdefault("vectorIndexType", "hnsw")
+            definition.setdefault("vectorIndexConfig", {}).setdefault("distance", "cosine")
+            definition.setdefault("moduleConfig", {})
+            definition["properties"] = [self._normalize_property(prop)
+                                        for prop in definition.get("properties") or []]
+            self.classes[name] = definition
+            self._objects[name] = {}
+            self._touch(name)
+            return definition
+
+    def update_class(self, class_name, definition):
+        with self._lock:
+            class_name = self.resolve(class_name, aliases=False)
+            current = self.classes[class_name]
+            for key in ("vectorIndexConfig", "invertedIndexConfig", "replicationConfig",
+                        "multiTenancyConfig", "description"):
+                if key in definition:
+                    current[key] = copy.deepcopy(definition[key])
+            self._touch(class_name)
+            return current
+
+    def add_property(self, class_name, prop):
+        with self._lock:
+            class_name = self.resolve(class_name, aliases=False)
+            properties = self.classes[class_name]["properties"]
+            if any(existing["name"].lower() == prop.get("name", "").lower() for existing in properties):
+                raise FakeError(f"属性 {prop.get('name')} 已存在")
+            properties.append(self._normalize_property(prop))
+            self._touch(class_name)
+            return properties[-1]
+
+    def delete_class(self, class_name):
+        with self._lock:
+            class_name = self.resolve(class_name, required=False, aliases=False)
+            if class_name is None:
+                return
+            del self.classes[class_name]
+            del self._objects[class_name]
+            self._dims.pop(class_name, None)
+            self._touch(class_name)
+
+    @staticmethod
+    def _normalize_property(prop):
+        prop = copy.deepcopy(prop)
+        if not prop.get("name") or not prop.get("dataType"):
+            raise FakeError(f"属性定义缺少 name 或 dataType: {prop}")
+        if prop["dataType"][0] in ("text", "text[]"):
+            prop.setdefault("tokenization", "word")
+        return prop
+
+    def _touch(self, class_name):
+        """数据类的数据或定义发生变化"""
+        self._versions[class_name] = self._versions.get(class_name, 0) + 1
+        self._snapshots.pop(class_name, None)
+        self._vectorizers.pop(class_name, None)
+
+    # ---------- 别名 ----------
+
+    def set_alias(self, alias, class_name, create):
+        with self._lock:
+            if create and alias in self.aliases:
+                raise FakeError(f"别名 {alias} 已存在")
+            if not create and alias not in self.aliases:
+                raise FakeError(f"别名 {alias} 不存在", status=404)
+            if alias in self.classes:
+                raise FakeError(f"已存在同名的数据类 {alias}")
+            self.aliases[alias] = self.resolve(class_name)
+            return {"alias": alias, "class": self.aliases[alias]}
+
+    def delete_alias(self, alias):
+        with self._lock:
+            if self.aliases.pop(alias, None) is None:
+                raise FakeError(f"别名 {alias} 不存在", status=404)
+
+    # ---------- 对象 ----------
+
+    def vectorizer(self, class_name):
+        """数据类的服务端向量化器（vectorizer 不是 text2vec-* 时返回 None）"""
+        with self._lock:
+            definition = self.classes[class_name]
+            module = definition.get("vectorizer", "none")
+            if not module.startswith("text2vec"):
+                return None
+            if class_name not in self._vectorizers:
+                self._vectorizers[class_name] = ClientVectorizer(self.embedder, definition, module=module)
+            return self._vectorizers[class_name]
+
+    def embed_text(self, text):
+        with self._lock:
+            self.stats["embeddings"] += 1
+        return self.embedder.embed_array(text)
+
+    def write_object(self, payload, mode="upsert", class_name=None, object_id=None):
+        """写入对象并返回存储的对象
+
+        mode: create（已存在时报错）、upsert（整体替换）、merge（PATCH，只合并给出的属性）
+        向量化类只在参与向量化的文本变化时才重新计算向量。
+        """
+        class_name = self.resolve(class_name or payload.get("class"))
+        object_id = str(object_id or payload.get("id") or uuid_lib.uuid4()).lower()
+        try:
+            uuid_lib.UUID(object_id)
+        except ValueError:
+            raise FakeError(f"非法的 id: {object_id}")
+
+        vector = payload.get("vector")
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float32)
+            if vector.ndim != 1 or not len(vector):
+                raise FakeError("vector 必须是一维非空数组")
+
+        with self._lock:
+            objects = self._objects[class_name]
+            existing = objects.get(object_id)
+            if mode == "create" and existing is not None:
+                raise FakeError(f"id '{object_id}' already exists")
+            if mode == "merge" and existing is None:
+                raise FakeError(f"对象 {object_id} 不存在", status=404)
+
+            properties = dict(payload.get("properties") or {})
+            if mode == "merge":
+                properties = {**existing["properties"], **properties}
+
+            text = None
+            vectorizer = self.vectorizer(class_name)
+            if vector is None and vectorizer is not None:
+                text = vectorizer.text_for(properties)
+                if existing is not None and existing.get("text") == text:
+                    vector = existing["vector"]
+                else:
+                    vector = self.embed_text(text)
+            elif vector is None and mode == "merge":
+                vector = existing["vector"]
+            self._check_dims(class_name, vector)
+
+            now = int(time.time() * 1000)
+            obj = {
+                "class": class_name,
+                "id": object_id,
+                "properties": properties,
+                "vector": vector,
+                "text": text,
+                "tenant": payload.get("tenant") or (existing or {}).get("tenant"),
+                "creationTimeUnix": existing["creationTimeUnix"] if existing else now,
+                "lastUpdateTimeUnix": now,
+            }
+            objects[object_id] = obj
+            self.stats["objects_written"] += 1
+            self._touch_data(class_name)
+            return obj
+
+    def _check_dims(self, class_name, vector):
+        if vector is None:
+            return
+        dims = self._dims.setdefault(class_name, len(vector))
+        if len(vector) != dims:
+            raise FakeError(f"new node has a vector with length {len(vector)}. "
+                            f"Existing nodes have vectors with length {dims}")
+
+    def _touch_data(self, class_name):
+        # 只有数据变化，不需要重建向量化器
+        self._versions[class_name] = self._versions.get(class_name, 0) + 1
+        self._snapshots.pop(class_name, None)
+
+    def get_object(self, class_name, object_id):
+        with self._lock:
+            obj = self._objects[self.resolve(class_name)].get(str(object_id).lower())
+            if obj is None:
+                raise FakeError(f"对象 {object_id} 不存在", status=404)
+            return obj
+
+    def delete_object(self, class_name, object_id):
+        with self._lock:
+            class_name = self.resolve(class_name)
+            if self._objects[class_name].pop(str(object_id).lower(), None) is None:
+                raise FakeError(f"对象 {object_id} 不存在", status=404)
+            self._touch_data(class_name)
+
+    def delete_matching(self, class_name, where, tenant, limit, dry_run=False):
+        """删除满足 where 的对象（最多 limit 个），返回匹配的 id 列表"""
+        with self._lock:
+            class_name = self.resolve(class_name)
+            matched = [obj["id"] for obj in self.snapshot(class_name).objects
+                       if obj["tenant"] == tenant and matches(obj, where)][:limit]
+            if not dry_run and matched:
+                for object_id in matched:
+                    del self._objects[class_name][object_id]
+                self._touch_data(class_name)
+            return matched
+
+    def find_object(self, object_id):
+        """不带类名时按 id 在所有数据类中查找"""
+        with self._lock:
+            for objects in self._objects.values():
+                obj = objects.get(str(object_id).lower())
+                if obj is not None:
+                    return obj
+        raise FakeError(f"对象 {object_id} 不存在", status=404)
+
+    def snapshot(self, class_name):
+        """当前版本的只读视图（同一版本内的查询共用一份向量矩阵）"""
+        with self._lock:
+            class_name = self.resolve(class_name)
+            snapshot = self._snapshots.get(class_name)
+            if snapshot is None:
+                objects = sorted(self._objects[class_name].values(), key=lambda obj: obj["id"])
+                metric = self.classes[class_name]["vectorIndexConfig"].get("distance", "cosine")
+                snapshot = self._snapshots[class_name] = _Snapshot(objects, metric)
+            return snapshot
+
+    def distance_metric(self, class_name):
+        return self.classes[class_name]["vectorIndexConfig"].get("distance", "cosine")
+
+
+def render_object(obj, include_vector=False):
+    """对象的 REST 表示"""
+    result = {
+        "class": obj["class"],
+        "id": obj["id"],
+        "properties": obj["properties"],
+        "creationTimeUnix": obj["creationTimeUnix"],
+        "lastUpdateTimeUnix": obj["lastUpdateTimeUnix"],
+    }
+    if obj["tenant"]:
+        result["tenant"] = obj["tenant"]
+    if include_vector and obj["vector"] is not None:
+        result["vector"] = obj["vector"].tolist()
+    return result
+
+
+# ============ GraphQL ============
+
+class GraphQLError(Exception):
+    pass
+
+
+_TOKEN = re.compile(r'''
+    (?P<skip>[\s,]+|\#[^\n]*)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+  | (?P<punct>\.\.\.|[{}()\[\]:!$=@])
+''', re.VERBOSE)
+
+
+def _tokenize_graphql(text):
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise GraphQLError(f"无法解析的 GraphQL（位置 {position}）: {text[position:position + 20]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        if kind != "skip":
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+class _GraphQLParser:
+    """只支持查询操作的最小 GraphQL 解析器（字段、别名、参数、变量）"""
+
+    def __init__(self, text, variables):
+        self.tokens = _tokenize_graphql(text)
+        self.position = 0
+        self.variables = variables or {}
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise GraphQLError("GraphQL 意外结束")
+        self.position += 1
+        return token
+
+    def _expect(self, value):
+        kind, text = self._next()
+        if text != value:
+            raise GraphQLError(f"GraphQL 语法错误: 期望 {value!r}，实际 {text!r}")
+
+    def parse(self):
+        kind, text = self._peek()
+        if kind == "name":
+            if text != "query":
+                raise GraphQLError(f"不支持的操作类型: {text}")
+            self._next()
+            if self._peek()[0] == "name":
+                self._next()
+            if self._peek()[1] == "(":
+                self._skip_balanced("(", ")")
+        return self._selection_set()
+
+    def _skip_balanced(self, opening, closing):
+        depth = 0
+        while True:
+            _, text = self._next()
+            if text == opening:
+                depth += 1
+            elif text == closing:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _selection_set(self):
+        self._expect("{")
+        fields = []
+        while self._peek()[1] != "}":
+            fields.append(self._field())
+        self._next()
+        return fields
+
+    def _field(self):
+        kind, name = self._next()
+        if kind != "name":
+            raise GraphQLError(f"GraphQL 语法错误: 期望字段名，实际 {name!r}")
+        alias = None
+        if self._peek()[1] == ":":
+            self._next()
+            alias, (_, name) = name, self._next()
+        args = {}
+        if self._peek()[1] == "(":
+            self._next()
+            while self._peek()[1] != ")":
+                _, key = self._next()
+                self._expect(":")
+                args[key] = self._value()
+            self._next()
+        selections = self._selection_set() if self._peek()[1] == "{" else []
+        return {"alias": alias, "name": name, "args": args, "selections": selections}
+
+    def _value(self):
+        kind, text = self._next()
+        if text == "$":
+            _, name = self._next()
+            if name not in self.variables:
+                raise GraphQLError(f"未提供变量 ${name}")
+            return self.variables[name]
+        if kind == "string":
+            return json.loads(text)
+        if kind == "number":
+            return float(text) if any(char in text for char in ".eE") else int(text)
+        if text == "[":
+            items = []
+            while self._peek()[1] != "]":
+                items.append(self._value())
+            self._next()
+            return items
+        if text == "{":
+            result = {}
+            while self._peek()[1] != "}":
+                _, key = self._next()
+                self._expect(":")
+                result[key] = self._value()
+            self._next()
+            return result
+        if kind == "name":
+            return {"true": True, "false": False, "null": None}.get(text, text)
+        raise GraphQLError(f"GraphQL 语法错误: 意外的 {text!r}")
+
+
+GET_ARGS = {"where", "sort", "limit", "offset", "after", "tenant", "nearText", "nearVector", "hybrid", "bm25"}
+AGGREGATE_ARGS = {"where", "tenant", "nearText", "nearVector", "objectLimit"}
+
+
+class GraphQLExecutor:
+    """在 FakeStore 上执行 Get / Aggregate 查询"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def execute(self, query, variables=None):
+        """返回 GraphQL 响应体 {"data": ..., "errors": [...]}"""
+        try:
+            roots = _GraphQLParser(query, variables).parse()
+        except GraphQLError as e:
+            return {"data": None, "errors": [{"message": str(e)}]}
+
+        data, errors = {}, []
+        for root in roots:
+            resolver = {"Get": self._get, "Aggregate": self._aggregate}.get(root["name"])
+            if resolver is None:
+                errors.append({"message": f'Cannot query field "{root["name"]}" on type "WeaviateQuery".'})
+                continue
+            results = {}
+            for field in root["selections"]:
+                key = field["alias"] or field["name"]
+                try:
+                    results[key] = resolver(field)
+                except (GraphQLError, FakeError) as e:
+                    results[key] = None
+                    errors.append({"message": str(e), "path": [root["name"], key]})
+            data[root["alias"] or root["name"]] = results
+        with self.store._lock:
+            self.store.stats["queries"] += 1
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return response
+
+    def _class_name(self, field, allowed):
+        class_name = self.store.resolve(field["name"], required=False)
+        if class_name is None:
+            raise GraphQLError(f'Cannot query field "{field["name"]}" on type "GetObjectsObj".')
+        unknown = set(field["args"]) - allowed
+        if unknown:
+            raise GraphQLError(f"不支持的参数: {', '.join(sorted(unknown))}")
+        return class_name
+
+    def _candidates(self, class_name, args):
+        """(快照, 满足 tenant 和 where 的对象下标数组)"""
+        snapshot = self.store.snapshot(class_name)
+        tenant = args.get("tenant")
+        where = args.get("where")
+        if where is None and tenant is None and not snapshot.has_tenants:
+            return snapshot, np.arange(len(snapshot.objects))
+        rows = [i for i, obj in enumerate(snapshot.objects) if obj["tenant"] == tenant and matches(obj, where)]
+        return snapshot, np.asarray(rows, dtype=np.int64)
+
+    def _query_vector(self, near):
+        if "vector" in near:
+            return np.asarray(near["vector"], dtype=np.float32)
+        concepts = near.get("concepts") or []
+        if not concepts:
+            raise GraphQLError("nearText 需要 concepts")
+        return np.mean([self.store.embed_text(concept) for concept in concepts], axis=0)
+
+    def _vector_search(self, class_name, snapshot, rows, args):
+        """返回按距离排序的 (下标数组, 距离数组)，已应用 distance / certainty 阈值"""
+        near_name = "nearText" if "nearText" in args else "nearVector"
+        near = args[near_name]
+        if near_name == "nearText" and not self.store.vectorizer(class_name):
+            raise GraphQLError(f"数据类 {class_name} 没有配置向量化器，无法使用 nearText")
+        metric = self.store.distance_metric(class_name)
+        distances = snapshot.distances(self._query_vector(near), metric)[rows]
+        keep = np.isfinite(distances)
+        if near.get("distance") is not None:
+            keep &= distances <= float(near["distance"])
+        if near.get("certainty") is not None:
+            keep &= 1.0 - distances / 2.0 >= float(near["certainty"])
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return rows[order], distances[order]
+
+    def _keyword_scores(self, class_name, snapshot, rows, query, properties=None):
+        """简化的 BM25：查询词在文本属性中的词频 + IDF"""
+        definition = self.store.classes[class_name]
+        names = properties or [prop["name"] for prop in definition["properties"]
+                               if prop["dataType"][0] in ("text", "text[]")]
+        names = tuple(name.split("^")[0] for name in names)
+        postings = snapshot.postings(names)
+        in_rows = np.zeros(len(snapshot.objects), dtype=bool)
+        in_rows[rows] = True
+        scores = np.zeros(len(snapshot.objects), dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in postings:
+                continue
+            positions, tf = postings[term]
+            keep = in_rows[positions]
+            positions, tf = positions[keep], tf[keep]
+            idf = math.log(1 + (len(rows) - len(positions) + 0.5) / (len(positions) + 0.5))
+            scores[positions] += idf * tf * 2.2 / (tf + 1.2)
+        return scores[rows]
+
+    def _get(self, field):
+        class_name = self._class_name(field, GET_ARGS)
+        args = field["args"]
+        snapshot, rows = self._candidates(class_name, args)
+        extras = {}
+
+        if "nearText" in args or "nearVector" in args:
+            rows, distances = self._vector_search(class_name, snapshot, rows, args)
+            extras["distance"] = distances
+        elif "hybrid" in args:
+            rows, extras["score"] = self._hybrid(class_name, snapshot, rows, args["hybrid"])
+        elif "bm25" in args:
+            scores = self._keyword_scores(class_name, snapshot, rows, args["bm25"].get("query", ""),
+                                          args["bm25"].get("properties"))
+            order = np.argsort(-scores, kind="stable")
+            keep = order[scores[order] > 0]
+            rows, extras["score"] = rows[keep], scores[keep]
+        elif args.get("sort"):
+            rows = self._sort(snapshot, rows, args["sort"])
+        elif args.get("after"):
+            after = str(args["after"]).lower()
+            rows = np.asarray([row for row in rows if snapshot.objects[row]["id"] > after], dtype=np.int64)
+
+        offset = int(args.get("offset") or 0)
+        limit = int(args["limit"]) if args.get("limit") is not None else QUERY_DEFAULTS_LIMIT
+        if offset + limit > QUERY_MAXIMUM_RESULTS:
+            raise GraphQLError("query maximum results exceeded")
+        selected = slice(offset, offset + limit)
+        rows = rows[selected]
+        extras = {key: values[selected] for key, values in extras.items()}
+
+        metric = self.store.distance_metric(class_name)
+        results = []
+        for i, row in enumerate(rows):
+            obj = snapshot.objects[row]
+            results.append(self._project(class_name, obj, field["selections"], metric,
+                                         {key: values[i] for key, values in extras.items()}))
+        return results
+
+    def _hybrid(self, class_name, snapshot, rows, hybrid):
+        """relativeScoreFusion：向量相似度和关键词得分各自归一化到 [0, 1] 后按 alpha 加权"""
+        alpha = float(hybrid.get("alpha", 0.75))
+        query = hybrid.get("query", "")
+        scores = np.zeros(len(rows), dtype=np.float32)
+        if alpha > 0:
+            if hybrid.get("vector") is not None:
+                vector = np.asarray(hybrid["vector"], dtype=np.float32)
+            elif self.store.vectorizer(class_name):
+                vector = self.store.embed_text(query)
+            else:
+                raise GraphQLError(f"数据类 {class_name} 没有向量化器，hybrid 需要提供 vector")
+            distances = snapshot.distances(vector, self.store.distance_metric(class_name))[rows]
+            similarity = np.where(np.isfinite(distances), -distances, np.nan)
+            scores += alpha * _min_max(similarity)
+        if alpha < 1:
+            scores += (1 - alpha) * _min_max(self._keyword_scores(class_name, snapshot, rows, query,
+                                                                  hybrid.get("properties")))
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    @staticmethod
+    def _sort(snapshot, rows, sort):
+        rows = list(rows)
+        for item in reversed(sort if isinstance(sort, list) else [sort]):
+            path = item.get("path") or []
+            reverse = item.get("order", "asc") == "desc"
+            present = [row for row in rows if _property_value(snapshot.objects[row], path) is not None]
+            missing = [row for row in rows if _property_value(snapshot.objects[row], path) is None]
+            present.sort(key=lambda row: _property_value(snapshot.objects[row], path), reverse=reverse)
+            rows = present + missing
+        return np.asarray(rows, dtype=np.int64)
+
+    def _project(self, class_name, obj, selections, metric, extras):
+        definition = self.store.classes[class_name]
+        known = {prop["name"] for prop in definition["properties"]}
+        result = {}
+        for selection in selections:
+            key = selection["alias"] or selection["name"]
+            name = selection["name"]
+            if name == "_additional":
+                result[key] = self._additional(obj, selection["selections"], metric, extras)
+            elif name in known or name in obj["properties"]:
+                result[key] = obj["properties"].get(name)
+            else:
+                raise GraphQLError(f'Cannot query field "{name}" on type "{class_name}".')
+        return result
+
+    @staticmethod
+    def _additional(obj, selections, metric, extras):
+        result = {}
+        for selection in selections:
+            name = selection["name"]
+            if name == "id":
+                value = obj["id"]
+            elif name == "distance":
+                value = float(extras["distance"]) if "distance" in extras else None
+            elif name == "certainty":
+                value = (1.0 - float(extras["distance"]) / 2.0
+                         if "distance" in extras and metric == "cosine" else None)
+            elif name == "score":
+                value = str(float(extras["score"])) if "score" in extras else None
+            elif name == "vector":
+                value = obj["vector"].tolist() if obj["vector"] is not None else None
+            elif name in ("creationTimeUnix", "lastUpdateTimeUnix"):
+                value = str(obj[name])
+            else:
+                raise GraphQLError(f'不支持的 _additional 字段: {name}')
+            result[selection["alias"] or name] = value
+        return result
+
+    def _aggregate(self, field):
+        class_name = self._class_name(field, AGGREGATE_ARGS)
+        args = field["args"]
+        snapshot, rows = self._candidates(class_name, args)
+        if "nearText" in args or "nearVector" in args:
+            rows, _ = self._vector_search(class_name, snapshot, rows, args)
+            if args.get("objectLimit") is not None:
+                rows = rows[:int(args["objectLimit"])]
+        objects = [snapshot.objects[row] for row in rows]
+
+        result = {}
+        for selection in field["selections"]:
+            key = selection["alias"] or selection["name"]
+            if selection["name"] == "meta":
+                result[key] = {sub["alias"] or sub["name"]: len(objects) for sub in selection["selections"]}
+            else:
+                values = [obj["properties"].get(selection["name"]) for obj in objects]
+                result[key] = _aggregate_values([value for value in values if value is not None],
+                                                selection["selections"])
+        return [result]
+
+
+def _min_max(values):
+    values = np.nan_to_num(np.asarray(values, dtype=np.float32), nan=-np.inf)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.zeros(len(values), dtype=np.float32)
+    low, high = values[finite].min(), values[finite].max()
+    normalized = np.zeros(len(values), dtype=np.float32)
+    normalized[finite] = (values[finite] - low) / (high - low) if high > low else 1.0
+    return normalized
+
+
+def _aggregate_values(values, selections):
+    """属性聚合：count / minimum / maximum / mean / sum / median / topOccurrences"""
+    numeric = [value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool)]
+    result = {}
+    for selection in selections:
+        name = selection["name"]
+        key = selection["alias"] or name
+        if name == "count":
+            result[key] = len(values)
+        elif name in ("minimum", "maximum", "mean", "sum", "median"):
+            if not numeric:
+                result[key] = None
+                continue
+            array = np.asarray(numeric, dtype=np.float64)
+            result[key] = float({"minimum": array.min, "maximum": array.max, "mean": array.mean,
+                                 "sum": array.sum, "median": lambda: np.median(array)}[name]())
+        elif name == "topOccurrences":
+            counts = {}
+            for value in values:
+                for item in value if isinstance(value, list) else [value]:
+                    counts[item] = counts.get(item, 0) + 1
+            limit = int(selection["args"].get("limit", 5))
+            top = sorted(counts.items(), key=lambda item: -item[1])[:limit]
+            result[key] = [{sub["alias"] or sub["name"]: (value if sub["name"] == "value" else occurs)
+                            for sub in selection["selections"]} for value, occurs in top]
+        else:
+            raise GraphQLError(f"不支持的聚合: {name}")
+    return result
+
+
+# ============ HTTP 接口 ============
+
+_UUID = r"([0-9a-fA-F-]{36})"
+_NAME = r"([_A-Za-z][_0-9A-Za-z]*)"
+
+ROUTES = [
+    ("GET", r"/v1/meta", "meta"),
+    ("GET", r"/v1/\.well-known/(?:ready|live)", "ready"),
+    ("GET", r"/v1/schema", "list_classes"),
+    ("POST", r"/v1/schema", "create_class"),
+    ("GET", rf"/v1/schema/{_NAME}", "get_class"),
+    ("PUT", rf"/v1/schema/{_NAME}", "update_class"),
+    ("DELETE", rf"/v1/schema/{_NAME}", "delete_class"),
+    ("POST", rf"/v1/schema/{_NAME}/properties", "add_property"),
+    ("GET", r"/v1/aliases", "list_aliases"),
+    ("POST", r"/v1/aliases", "create_alias"),
+    ("GET", rf"/v1/aliases/{_NAME}", "get_alias"),
+    ("PUT", rf"/v1/aliases/{_NAME}", "update_alias"),
+    ("DELETE", rf"/v1/aliases/{_NAME}", "delete_alias"),
+    ("GET", r"/v1/objects", "list_objects"),
+    ("POST", r"/v1/objects", "create_object"),
+    ("GET", rf"/v1/objects/{_NAME}/{_UUID}", "get_object"),
+    ("HEAD", rf"/v1/objects/{_NAME}/{_UUID}", "head_object"),
+    ("PUT", rf"/v1/objects/{_NAME}/{_UUID}", "replace_object"),
+    ("PATCH", rf"/v1/objects/{_NAME}/{_UUID}", "patch_object"),
+    ("DELETE", rf"/v1/objects/{_NAME}/{_UUID}", "delete_object"),
+    ("GET", rf"/v1/objects/{_UUID}", "get_object_by_id"),
+    ("POST", r"/v1/batch/objects", "batch_objects"),
+    ("DELETE", r"/v1/batch/objects", "batch_delete"),
+    ("POST", r"/v1/graphql", "graphql"),
+    ("POST", r"/api/embed", "embed"),
+]
+_COMPILED_ROUTES = [(method, re.compile(f"^{pattern}/?$"), name) for method, pattern, name in ROUTES]
+
+
+class FakeWeaviateHandler(BaseHTTPRequestHandler):
+    """把 HTTP 请求分发到 FakeStore"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        parts = urlsplit(self.path)
+        path, self.params = parts.path, parse_qs(parts.query)
+
+        injected = self.server.faults.apply(path) if self.server.faults else None
+        if injected is not None:
+            self._send(injected, {"error": [{"message": "injected fault"}]})
+            return
+
+        for route_method, pattern, name in _COMPILED_ROUTES:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            self._send(404, {"error": [{"message": f"{method} {path} not found"}]})
+            return
+
+        try:
+            body = json.loads(raw) if raw else {}
+            status, payload = getattr(self, f"handle_{name}")(*match.groups(), body=body)
+        except json.JSONDecodeError as e:
+            status, payload = 400, {"error": [{"message": f"请求体不是合法的 JSON: {e}"}]}
+        except FakeError as e:
+            status, payload = e.status, {"error": [{"message": str(e)}]}
+        except Exception as e:
+            status, payload = 500, {"error": [{"message": f"{type(e).__name__}: {e}"}]}
+        self._send(status, payload)
+
+    def _send(self, status, payload):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _param(self, name, default=None):
+        values = self.params.get(name)
+        return values[0] if values else default
+
+    # ---------- meta / schema / 别名 ----------
+
+    def handle_meta(self, body):
+        return 200, {"version": "1.30.0-fake", "hostname": self.server.url,
+                     "grpcMaxMessageSize": 104858000, "modules": {"text2vec-ollama": {}}}
+
+    def handle_ready(self, body):
+        return 200, None
+
+    def handle_list_classes(self, body):
+        with self.store._lock:
+            return 200, {"classes": copy.deepcopy(list(self.store.classes.values()))}
+
+    def handle_create_class(self, body):
+        return 200, self.store.create_class(body)
+
+    def handle_get_class(self, class_name, body):
+        with self.store._lock:
+            return 200, copy.deepcopy(self.store.classes[self.store.resolve(class_name, aliases=False)])
+
+    def handle_update_class(self, class_name, body):
+        return 200, copy.deepcopy(self.store.update_class(class_name, body))
+
+    def handle_delete_class(self, class_name, body):
+        self.store.delete_class(class_name)
+        return 200, None
+
+    def handle_add_property(self, class_name, body):
+        return 200, self.store.add_property(class_name, body)
+
+    def handle_list_aliases(self, body):
+        with self.store._lock:
+            return 200, {"aliases": [{"alias": alias, "class": class_name}
+                                     for alias, class_name in self.store.aliases.items()]}
+
+    def handle_create_alias(self, body):
+        return 200, self.store.set_alias(body.get("alias"), body.get("class"), create=True)
+
+    def handle_get_alias(self, alias, body):
+        with self.store._lock:
+            if alias not in self.store.aliases:
+                raise FakeError(f"别名 {alias} 不存在", status=404)
+            return 200, {"alias": alias, "class": self.store.aliases[alias]}
+
+    def handle_update_alias(self, alias, body):
+        return 200, self.store.set_alias(alias, body.get("class"), create=False)
+
+    def handle_delete_alias(self, alias, body):
+        self.store.delete_alias(alias)
+        return 204, None
+
+    # ---------- 对象 ----------
+
+    def _include_vector(self):
+        return "vector" in ",".join(self.params.get("include", []))
+
+    def handle_list_objects(self, body):
+        class_name = self._param("class")
+        limit = int(self._param("limit", 25))
+        after = (self._param("after") or "").lower()
+        offset = int(self._param("offset", 0))
+        tenant = self._param("tenant")
+        if after and not class_name:
+            raise FakeError("after 游标需要同时指定 class")
+        classes = [self.store.resolve(class_name)] if class_name else list(self.store.classes)
+        objects = []
+        for name in classes:
+            objects.extend(obj for obj in self.store.snapshot(name).objects
+                           if obj["tenant"] == tenant and (not after or obj["id"] > after))
+        page = objects[offset:offset + limit]
+        include_vector = self._include_vector()
+        return 200, {"objects": [render_object(obj, include_vector) for obj in page],
+                     "totalResults": len(page)}
+
+    def handle_create_object(self, body):
+        return 200, render_object(self.store.write_object(body, mode="create"))
+
+    def handle_get_object(self, class_name, object_id, body):
+        return 200, render_object(self.store.get_object(class_name, object_id), self._include_vector())
+
+    def handle_head_object(self, class_name, object_id, body):
+        self.store.get_object(class_name, object_id)
+        return 204, None
+
+    def handle_get_object_by_id(self, object_id, body):
+        return 200, render_object(self.store.find_object(object_id), self._include_vector())
+
+    def handle_replace_object(self, class_name, object_id, body):
+        return 200, render_object(self.store.write_object(body, "upsert", class_name, object_id))
+
+    def handle_patch_object(self, class_name, object_id, body):
+        self.store.write_object(body, "merge", class_name, object_id)
+        return 204, None
+
+    def handle_delete_object(self, class_name, object_id, body):
+        self.store.delete_object(class_name, object_id)
+        return 204, None
+
+    def handle_batch_objects(self, body):
+        results = []
+        for payload in body.get("objects") or []:
+            item = {"class": payload.get("class"), "id": payload.get("id"),
+                    "properties": payload.get("properties"), "result": {}}
+            try:
+                item["id"] = self.store.write_object(payload, mode="upsert")["id"]
+            except FakeError as e:
+                item["result"] = {"errors": {"error": [{"message": str(e)}]}}
+            results.append(item)
+        return 200, results
+
+    def handle_batch_delete(self, body):
+        match = body.get("match") or {}
+        if not match.get("where"):
+            raise FakeError("批量删除需要 match.where")
+        dry_run = bool(body.get("dryRun"))
+        verbose = body.get("output") == "verbose"
+        matched = self.store.delete_matching(match.get("class"), match["where"], self._param("tenant"),
+                                             QUERY_MAXIMUM_RESULTS, dry_run)
+        results = {"matches": len(matched), "limit": QUERY_MAXIMUM_RESULTS,
+                   "successful": 0 if dry_run else len(matched), "failed": 0}
+        if verbose:
+            status = "DRYRUN" if dry_run else "SUCCESS"
+            results["objects"] = [{"id": object_id, "status": status} for object_id in matched]
+        return 200, {"match": match, "dryRun": dry_run, "output": body.get("output", "minimal"),
+                     "results": results}
+
+    # ---------- GraphQL / 向量化 ----------
+
+    def handle_graphql(self, body):
+        return 200, self.server.executor.execute(body.get("query") or "", body.get("variables"))
+
+    def handle_embed(self, body):
+        texts = body.get("input") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        if self.server.embed_latency:
+            time.sleep(self.server.embed_latency)
+        embedder = self.store.embedder
+        return 200, {"model": body.get("model") or embedder.model,
+                     "embeddings": [embedder.embed_array(text).tolist() for text in texts]}
+
+
+class FakeWeaviate:
+    """在后台线程中运行的 Weaviate 替身（与 benchmarks/stub_server.StubServer 的用法一致）"""
+
+    def __init__(self, host="127.0.0.1", port=0, embedding_dims=256, faults=None, embed_latency=0.0,
+                 handler_class=FakeWeaviateHandler):
+        self.store = FakeStore(HashEmbedder(dims=embedding_dims))
+        self.faults = faults
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.store = self.store
+        self.httpd.executor = GraphQLExecutor(self.store)
+        self.httpd.faults = faults
+        self.httpd.embed_latency = embed_latency
+        self.httpd.url = self.url
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 Weaviate 替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--dims", type=int, default=256, help="哈希向量的维度")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="额外的随机延迟上限（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="返回 429 的概率")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="每次 /api/embed 请求的延迟（秒）")
+    parser.add_argument("--seed", type=int, help="故障注入的随机种子")
+    args = parser.parse_args()
+
+    faults = FaultInjector(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, seed=args.seed)
+    server = FakeWeaviate(args.host, args.port, embedding_dims=args.dims, faults=faults,
+                          embed_latency=args.embed_latency)
+    print(f"Weaviate 替身已启动: {server.url}")
+    print(f"   WEAVIATE_URL={server.url} OLLAMA_API_ENDPOINT={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+多数据类联合向量搜索
+
+对多个数据类（Movie、Article ...）并发执行同一个近邻搜索，按距离合并成全局 top-k，
+每条结果都带上来源（数据类 + 对象 id）。
+
+启用客户端向量化（CLIENT_EMBEDDING，或传入 embedder / vector）时，概念只在客户端向量化
+一次，所有数据类共用同一个 nearVector；否则退化为各数据类的 nearText，由服务端向量化。
+注意：只有各数据类使用相同的向量模型和距离度量时，距离才可以直接比较。
+"""
+import asyncio
+import heapq
+
+from config.weaviate_config import config as default_config
+from utils.embedding import concepts_vector, create_embedder
+from utils.query_builder import GetQuery, NearText, NearVector
+
+
+class SearchHit:
+    """一条搜索结果（带来源）"""
+
+    def __init__(self, class_name, object_id, distance, properties):
+        self.class_name = class_name
+        self.id = object_id
+        self.distance = distance
+        self.properties = properties
+
+    def __repr__(self):
+        return f"SearchHit({self.class_name}/{self.id}, distance={self.distance:.4f})"
+
+
+class FederatedResult:
+    """联合搜索结果: hits 为按距离排序的全局 top-k，errors 为各数据类的失败信息"""
+
+    def __init__(self, hits, errors):
+        self.hits = hits
+        self.errors = errors
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def __len__(self):
+        return len(self.hits)
+
+
+def build_near(concepts=None, vector=None, distance=None, embedder=None):
+    """确定近邻条件：优先使用传入的向量，其次在客户端向量化（会阻塞，调用 Ollama），
+    未配置客户端向量化（CLIENT_EMBEDDING）时退化为 nearText，由服务端向量化"""
+    if vector is None and embedder is None and default_config.client_embedding:
+        embedder = create_embedder()
+    if vector is not None:
+        return NearVector(vector, distance=distance)
+    if embedder is not None:
+        return NearVector(concepts_vector(embedder, concepts), distance=distance)
+    return NearText(concepts, distance=distance)
+
+
+def build_queries(targets, near, limit):
+    """每个数据类一条 GetQuery；每个数据类取 limit 条即可保证全局 top-k 正确"""
+    return [
+        GetQuery(class_name, fields, near=near, limit=limit, additional=["id", "distance"])
+        for class_name, fields in targets.items()
+    ]
+
+
+def merge_hits(results, limit):
+    """把各数据类的结果按距离合并为全局 top-k"""
+    hits = []
+    for class_name, objects in results:
+        for obj in objects:
+            additional = obj.pop("_additional", None) or {}
+            distance = additional.get("distance")
+            if distance is None:
+                continue
+            hits.append(SearchHit(class_name, additional.get("id"), distance, obj))
+    return heapq.nsmallest(limit, hits, key=lambda hit: hit.distance)
+
+
+def collect_results(queries, responses, limit):
+    """解析各数据类的响应，合并为 FederatedResult"""
+    results = []
+    errors = {}
+    for query, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            errors[query.class_name] = str(response)
+            continue
+        if response.status_code != 200:
+            errors[query.class_name] = f"HTTP {response.status_code}"
+            continue
+        graphql_errors = response.json().get("errors")
+        if graphql_errors:
+            errors[query.class_name] = "; ".join(error.get("message", "") for error in graphql_errors)
+            continue
+        results.append((query.class_name, query.results(response)))
+
+    return FederatedResult(merge_hits(results, limit), errors)
+
+
+async def federated_search_async(client, targets, concepts=None, vector=None, limit=10,
+                                 distance=None, embedder=None):
+    """异步联合搜索（client 为 AsyncWeaviateClient）
+
+    targets: {数据类名: [返回字段, ...]}
+    """
+    # 向量化是同步 HTTP 调用，放到线程中执行，不阻塞事件循环
+    near = await asyncio.to_thread(build_near, concepts, vector, distance, embedder)
+    queries = build_queries(targets, near, limit)
+    responses = await client.gather(queries, return_exceptions=True)
+    return collect_results(queries, responses, limit)
+
+
+def federated_search(client, targets, concepts=None, vector=None, limit=10, distance=None, embedder=None):
+    """同步版本的联合搜索（client 为 WeaviateClient）
+
+    查询通过 client.gather 并发发送，复用它的后台事件循环和连接池。
+    """
+    near = build_near(concepts, vector, distance, embedder)
+    queries = build_queries(targets, near, limit)
+    responses = client.gather(queries, return_exceptions=True)
+    return collect_results(queries, responses, limit)
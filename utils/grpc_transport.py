@@ -0,0 +1,361 @@
+"""
+gRPC 传输（搜索 + 批量导入）
+
+Weaviate 1.23+ 在 50051 端口提供 gRPC 接口（01_connection.py 打印的
+grpcMaxMessageSize 就是它的消息大小上限）。与 REST/GraphQL JSON 相比：
+- 请求和响应使用 protobuf 编码，向量以 float32 字节串传输，解析几乎不占 CPU
+- 基于 HTTP/2，一个连接上可以多路复用大量并发请求
+
+这里只实现 GetQuery 搜索和批量写入两类高频操作，请求和返回值的格式与 REST 版本
+保持一致，由 WeaviateClient 在启用 gRPC 时自动选用；gRPC 不可用（未安装依赖、
+服务端未开放端口）时整体回退到 REST；单个查询用到了不支持的特性时只有这个查询走 REST。
+
+protobuf 定义直接使用 weaviate-client 中生成好的 weaviate.proto.v1。
+"""
+import uuid as uuid_lib
+from urllib.parse import urlparse
+
+import numpy as np
+
+try:
+    import grpc
+    from google.protobuf import struct_pb2
+    from weaviate.proto.v1 import base_pb2, base_search_pb2, batch_pb2, search_get_pb2, weaviate_pb2_grpc
+except ImportError:  # pragma: no cover - 取决于运行环境
+    grpc = None
+
+from config.weaviate_config import config as default_config
+from utils.query_builder import GetQuery, NearText, NearVector
+
+# 支持通过 gRPC 返回的 _additional 字段
+SUPPORTED_ADDITIONAL = {
+    "id": "uuid",
+    "vector": "vector",
+    "distance": "distance",
+    "certainty": "certainty",
+    "score": "score",
+    "creationTimeUnix": "creation_time_unix",
+    "lastUpdateTimeUnix": "last_update_time_unix",
+}
+
+OPERATORS = {
+    "Equal": "OPERATOR_EQUAL",
+    "NotEqual": "OPERATOR_NOT_EQUAL",
+    "GreaterThan": "OPERATOR_GREATER_THAN",
+    "GreaterThanEqual": "OPERATOR_GREATER_THAN_EQUAL",
+    "LessThan": "OPERATOR_LESS_THAN",
+    "LessThanEqual": "OPERATOR_LESS_THAN_EQUAL",
+    "And": "OPERATOR_AND",
+    "Or": "OPERATOR_OR",
+    "Like": "OPERATOR_LIKE",
+    "IsNull": "OPERATOR_IS_NULL",
+    "ContainsAny": "OPERATOR_CONTAINS_ANY",
+    "ContainsAll": "OPERATOR_CONTAINS_ALL",
+}
+
+# GraphQL / REST 过滤路径与 gRPC FilterTarget 属性名不同的特殊字段
+SPECIAL_PATHS = {
+    "id": "_id",
+}
+
+
+class GrpcError(RuntimeError):
+    """gRPC 调用失败；retryable 表示是否为暂时性错误（过载、超时等）"""
+
+    def __init__(self, message, code=None, retryable=False):
+        super().__init__(message)
+        self.code = code
+        self.retryable = retryable
+
+
+class GrpcUnavailable(GrpcError):
+    """gRPC 不可用，调用方应回退到 REST"""
+
+
+class GrpcUnsupported(GrpcError):
+    """这一个查询无法用 gRPC 表达，只有它改走 REST（gRPC 传输本身仍然可用）"""
+
+
+# ============ 请求编码 ============
+
+def filter_to_proto(where):
+    """把 utils.query_builder.Filter 转换为 gRPC Filters"""
+    operator = base_pb2.Filters.Operator.Value(OPERATORS[where.operator])
+    if where.operands:
+        return base_pb2.Filters(operator=operator, filters=[filter_to_proto(operand) for operand in where.operands])
+
+    if len(where.path) > 1:
+        # 跨引用的路径 gRPC 需要 FilterReferenceSingleTarget，这里不支持
+        raise GrpcUnsupported("gRPC 传输暂不支持跨引用的过滤路径")
+    prop = SPECIAL_PATHS.get(where.path[0], where.path[0])
+    message = base_pb2.Filters(operator=operator, target=base_pb2.FilterTarget(property=prop))
+    if where.operator == "IsNull":
+        message.value_boolean = bool(where.value)
+        return message
+
+    value = where._serialized_value()
+    if isinstance(value, list):
+        first = value[0]
+        if isinstance(first, bool):
+            message.value_boolean_array.values.extend(value)
+        elif isinstance(first, int):
+            message.value_int_array.values.extend(value)
+        elif isinstance(first, float):
+            message.value_number_array.values.extend(value)
+        else:
+            message.value_text_array.values.extend(value)
+    elif isinstance(value, bool):
+        message.value_boolean = value
+    elif isinstance(value, int):
+        message.value_int = value
+    elif isinstance(value, float):
+        message.value_number = value
+    else:
+        message.value_text = value
+    return message
+
+
+def filter_supported(where):
+    """判断过滤条件能否转换为 gRPC Filters（与 filter_to_proto 的限制一致）"""
+    if where.operator not in OPERATORS:
+        return False
+    if where.operands:
+        return all(filter_supported(operand) for operand in where.operands)
+    return len(where.path) == 1
+
+
+def supports(query):
+    """判断查询能否通过 gRPC 执行"""
+    if not isinstance(query, GetQuery):
+        return False
+    if any(field not in SUPPORTED_ADDITIONAL for field in query.additional):
+        return False
+    if query.where is not None and not filter_supported(query.where):
+        return False
+    return query.near is None or isinstance(query.near, (NearText, NearVector))
+
+
+def build_search_request(query):
+    """把 GetQuery 转换为 gRPC SearchRequest"""
+    metadata = search_get_pb2.MetadataRequest(
+        **{SUPPORTED_ADDITIONAL[field]: True for field in query.additional}
+    )
+    request = search_get_pb2.SearchRequest(
+        collection=query.class_name,
+        properties=search_get_pb2.PropertiesRequest(non_ref_properties=list(query.fields)),
+        metadata=metadata,
+        uses_123_api=True,
+        uses_125_api=True,
+        uses_127_api=True,
+    )
+    if query.tenant is not None:
+        request.tenant = query.tenant
+    if query.limit is not None:
+        request.limit = int(query.limit)
+    if query.offset is not None:
+        request.offset = int(query.offset)
+    if query.where is not None:
+        request.filters.CopyFrom(filter_to_proto(query.where))
+    for item in query.sort:
+        request.sort_by.append(search_get_pb2.SortBy(path=[item.path], ascending=item.order == "asc"))
+
+    near = query.near
+    if isinstance(near, NearVector):
+        # 向量以小端 float32 字节串传输
+        vector_bytes = np.asarray(near.vector, dtype="<f4").tobytes()
+        request.near_vector.CopyFrom(base_search_pb2.NearVector(vector_bytes=vector_bytes))
+        _set_threshold(request.near_vector, near)
+    elif isinstance(near, NearText):
+        request.near_text.CopyFrom(base_search_pb2.NearTextSearch(query=near.concepts))
+        _set_threshold(request.near_text, near)
+    return request
+
+
+def _set_threshold(message, near):
+    if near.distance is not None:
+        message.distance = float(near.distance)
+    if near.certainty is not None:
+        message.certainty = float(near.certainty)
+
+
+def to_batch_object(obj):
+    """把 REST 格式的对象 {"class", "properties", "id", "vector"} 转换为 gRPC BatchObject"""
+    properties = batch_pb2.BatchObject.Properties()
+    scalars = {}
+    for name, value in (obj.get("properties") or {}).items():
+        if isinstance(value, (list, tuple)):
+            # 数组属性必须按类型放到对应的字段中（Struct 无法区分 int 和 number）
+            if not value:
+                properties.empty_list_props.append(name)
+            elif isinstance(value[0], bool):
+                properties.boolean_array_properties.add(prop_name=name, values=value)
+            elif isinstance(value[0], int):
+                properties.int_array_properties.add(prop_name=name, values=value)
+            elif isinstance(value[0], float):
+                properties.number_array_properties.add(
+                    prop_name=name, values_bytes=np.asarray(value, dtype="<f8").tobytes())
+            else:
+                properties.text_array_properties.add(prop_name=name, values=[str(item) for item in value])
+        elif value is not None:
+            scalars[name] = value
+    properties.non_ref_properties.CopyFrom(_to_struct(scalars))
+
+    message = batch_pb2.BatchObject(
+        collection=obj["class"],
+        # gRPC 批量接口要求客户端给出 uuid
+        uuid=str(obj.get("id") or uuid_lib.uuid4()),
+        properties=properties,
+    )
+    if obj.get("tenant"):
+        message.tenant = obj["tenant"]
+    if obj.get("vector") is not None:
+        message.vector_bytes = np.asarray(obj["vector"], dtype="<f4").tobytes()
+    return message
+
+
+def _to_struct(values):
+    struct = struct_pb2.Struct()
+    struct.update(values)
+    return struct
+
+
+# ============ 响应解码 ============
+
+def decode_value(value):
+    """把 gRPC Value 转换为 Python 值（与 GraphQL JSON 中的类型一致）"""
+    kind = value.WhichOneof("kind")
+    if kind is None or kind == "null_value":
+        return None
+    if kind == "object_value":
+        return decode_properties(value.object_value)
+    if kind == "list_value":
+        return _decode_list(value.list_value)
+    if kind == "geo_value":
+        return {"latitude": value.geo_value.latitude, "longitude": value.geo_value.longitude}
+    if kind == "int_value":
+        return int(value.int_value)
+    return getattr(value, kind)
+
+
+def _decode_list(list_value):
+    kind = list_value.WhichOneof("kind")
+    if kind is None:
+        return []
+    values = getattr(list_value, kind).values
+    if kind == "number_values":
+        return np.frombuffer(values, dtype="<f8").tolist()
+    if kind == "int_values":
+        return np.frombuffer(values, dtype="<i8").tolist()
+    if kind == "object_values":
+        return [decode_properties(item) for item in values]
+    return list(values)
+
+
+def decode_properties(properties):
+    return {name: decode_value(value) for name, value in properties.fields.items()}
+
+
+def decode_result(result, query):
+    """把 SearchResult 转换为与 GraphQL Get 结果相同的字典"""
+    item = decode_properties(result.properties.non_ref_props)
+    if not query.additional:
+        return item
+
+    metadata = result.metadata
+    additional = {}
+    for field in query.additional:
+        if field == "id":
+            additional["id"] = metadata.id
+        elif field == "vector":
+            additional["vector"] = _decode_vector(metadata)
+        elif field in ("distance", "certainty", "score"):
+            present = getattr(metadata, f"{field}_present")
+            additional[field] = getattr(metadata, field) if present else None
+        else:
+            name = SUPPORTED_ADDITIONAL[field]
+            present = getattr(metadata, f"{name}_present")
+            additional[field] = str(getattr(metadata, name)) if present else None
+    item["_additional"] = additional
+    return item
+
+
+def _decode_vector(metadata):
+    """返回 float32 numpy 数组（不复制）"""
+    if metadata.vector_bytes:
+        return np.frombuffer(metadata.vector_bytes, dtype="<f4")
+    for vectors in metadata.vectors:
+        if vectors.vector_bytes:
+            return np.frombuffer(vectors.vector_bytes, dtype="<f4")
+    if metadata.vector:
+        return np.asarray(metadata.vector, dtype=np.float32)
+    return None
+
+
+# ============ 传输 ============
+
+class GrpcTransport:
+    """基于 grpc 通道的传输层（通道线程安全，可在多个线程间共享）"""
+
+    def __init__(self, host, port=50051, secure=False, timeout=15.0,
+                 max_message_size=100 * 1024 * 1024):
+        if grpc is None:
+            raise GrpcUnavailable("未安装 grpcio / weaviate-client，无法使用 gRPC 传输")
+        self.target = f"{host}:{port}"
+        self.timeout = timeout
+        options = [
+            ("grpc.max_send_message_length", max_message_size),
+            ("grpc.max_receive_message_length", max_message_size),
+            ("grpc.keepalive_time_ms", 30000),
+        ]
+        if secure:
+            self.channel = grpc.secure_channel(self.target, grpc.ssl_channel_credentials(), options)
+        else:
+            self.channel = grpc.insecure_channel(self.target, options)
+        self.stub = weaviate_pb2_grpc.WeaviateStub(self.channel)
+        # 成功调用过一次之后，UNAVAILABLE 视为暂时性错误而不是"不支持 gRPC"
+        self.connected = False
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self.channel.close()
+
+    def search(self, query):
+        """执行 GetQuery，返回结果列表（格式同 GetQuery.results）"""
+        request = build_search_request(query)
+        reply = self._call(self.stub.Search, request)
+        return [decode_result(result, query) for result in reply.results]
+
+    def batch_objects(self, objects):
+        """批量写入 REST 格式的对象，返回 (失败对象的 (下标, 错误信息) 列表, 请求字节数)"""
+        request = batch_pb2.BatchObjectsRequest(objects=[to_batch_object(obj) for obj in objects])
+        reply = self._call(self.stub.BatchObjects, request)
+        return [(error.index, error.error) for error in reply.errors], request.ByteSize()
+
+    def _call(self, method, request):
+        try:
+            reply = method(request, timeout=self.timeout)
+        except grpc.RpcError as e:
+            code = e.code()
+            message = f"gRPC {code.name}: {e.details()}"
+            if code == grpc.StatusCode.UNIMPLEMENTED or (
+                    code == grpc.StatusCode.UNAVAILABLE and not self.connected):
+                raise GrpcUnavailable(message, code.name) from e
+            if self.closed and code in (grpc.StatusCode.CANCELLED, grpc.StatusCode.UNAVAILABLE):
+                # 通道在调用途中被其他线程关闭（已停用 gRPC），请求并没有被服务端拒绝，改走 REST 重发
+                raise GrpcUnavailable(message, code.name) from e
+            retryable = code in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED,
+                                 grpc.StatusCode.RESOURCE_EXHAUSTED)
+            raise GrpcError(message, code.name, retryable) from e
+        self.connected = True
+        return reply
+
+
+def create_grpc_transport(weaviate_config=None, weaviate_url=None):
+    """按配置创建 gRPC 传输；未启用或缺少依赖时返回 None"""
+    weaviate_config = weaviate_config or default_config
+    grpc_config = weaviate_config.get_grpc_config()
+    if not grpc_config["enabled"] or grpc is None:
+        return None
+    host = grpc_config["host"] or urlparse(weaviate_url or weaviate_config.weaviate_url).hostname
+    return GrpcTransport(host, grpc_config["port"], grpc_config["secure"], grpc_config["timeout"])
@@ -0,0 +1,106 @@
+"""
+基于游标的全量遍历
+
+offset 分页越往后越慢（服务端每页都要跳过前面所有对象），这里使用 /v1/objects 的
+after 游标：每页从上一页最后一个对象的 id 之后开始读取，代价与位置无关。
+可选的预取线程会在调用方处理当前页时提前加载下一页。
+"""
+import json
+import queue
+import threading
+
+_DONE = object()
+
+
+def fetch_page(client, class_name, page_size, after=None, include_vector=False, tenant=None):
+    """读取一页对象，返回对象列表"""
+    response = client.get_objects_page(class_name, page_size, after=after,
+                                       include_vector=include_vector, tenant=tenant)
+    if response.status_code != 200:
+        raise RuntimeError(f"读取 {class_name} 失败: HTTP {response.status_code} {response.text[:200]}")
+    return response.json().get("objects") or []
+
+
+def iter_pages(client, class_name, page_size=100, include_vector=False, after=None, tenant=None):
+    """生成器：逐页遍历整个数据类（不预取）"""
+    while True:
+        objects = fetch_page(client, class_name, page_size, after, include_vector, tenant)
+        if not objects:
+            return
+        yield objects
+        after = objects[-1]["id"]
+        if len(objects) < page_size:
+            return
+
+
+def prefetched(iterable, prefetch=1, name="prefetch"):
+    """生成器：由后台线程提前取出最多 prefetch 个元素
+
+    调用方提前停止遍历时后台线程也会随之退出；后台线程中的异常会在调用方重新抛出。
+    """
+    if prefetch <= 0:
+        yield from iterable
+        return
+
+    buffer = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def offer(item):
+        """放入缓冲区；调用方已停止遍历时返回 False"""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for item in iterable:
+                if not offer(item):
+                    return
+            offer(_DONE)
+        except Exception as e:
+            offer(e)
+
+    thread = threading.Thread(target=producer, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+
+
+def iter_objects(client, class_name, page_size=100, include_vector=False, after=None,
+                 tenant=None, prefetch=1):
+    """生成器：逐个产出数据类中的所有对象
+
+    prefetch > 0 时由后台线程提前加载最多 prefetch 页；调用方提前停止遍历时
+    后台线程也会随之退出。
+    """
+    pages = iter_pages(client, class_name, page_size, include_vector, after, tenant)
+    for page in prefetched(pages, prefetch, name=f"prefetch-{class_name}"):
+        yield from page
+
+
+def export_jsonl(client, class_name, path, page_size=500, include_vector=False, on_progress=None):
+    """把整个数据类导出为 JSONL 文件（每行一个对象），返回导出数量"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for obj in iter_objects(client, class_name, page_size, include_vector):
+            record = {"id": obj["id"], "properties": obj.get("properties", {})}
+            if include_vector and obj.get("vector") is not None:
+                record["vector"] = obj["vector"]
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+            if on_progress and count % page_size == 0:
+                on_progress(count)
+    return count
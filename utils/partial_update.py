@@ -0,0 +1,159 @@
+"""
+局部更新：只 PATCH 不参与向量化的属性
+
+评分、分类这类属性在 Schema 中是 skip: True（或本身不是 text），修改它们不会改变向量。
+整体替换对象（POST /v1/batch/objects）会让 Weaviate 重新调用向量化模型，
+而 PATCH /v1/objects/{class}/{id} 只合并给出的属性，参与向量化的文本没变时沿用原来的向量。
+
+PartialUpdater 按批查询对象的当前属性，只发送真正变化的属性；
+数据类带 contentHash 时同时更新哈希（读回的值与导入记录一样先经 PropertyMapper 规范化），
+之后的幂等导入（utils/upsert.py）不会把对象当成变化。
+更新中包含参与向量化的属性时直接报错，而不是悄悄触发重新向量化。
+
+用法:
+    updater = PartialUpdater(client, MOVIE_CLASS, ("title", "year"))
+    print(updater.update_records([{"title": "流浪地球", "year": 2019, "rating": 8.1}]))
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.data_loader import PropertyMapper
+from utils.embedding import vectorized_fields
+from utils.query_builder import Filter, GetQuery
+from utils.upsert import HASH_PROPERTY, content_hash, object_uuid
+
+# 没有向量化属性的基本类型（对象引用无法通过 GraphQL 直接取回，不支持局部更新）
+PRIMITIVE_TYPES = ("text", "string", "int", "number", "boolean", "date", "uuid")
+
+
+def patchable_properties(class_definition, module="text2vec-ollama"):
+    """可以局部更新的属性名（不参与向量化的基本类型属性，不含 contentHash）"""
+    vectorized = {name for name, _ in vectorized_fields(class_definition, module)}
+    names = []
+    for prop in class_definition.get("properties", []):
+        if prop["name"] in vectorized or prop["name"] == HASH_PROPERTY:
+            continue
+        if prop["dataType"][0].rstrip("[]") in PRIMITIVE_TYPES:
+            names.append(prop["name"])
+    return names
+
+
+class PatchStats:
+    """局部更新统计"""
+
+    def __init__(self):
+        self.patched = 0
+        self.unchanged = 0
+        self.missing = 0
+        self.failed = 0
+        self.errors = []
+
+    def __str__(self):
+        return (f"PatchStats(patched={self.patched}, unchanged={self.unchanged}, "
+                f"missing={self.missing}, failed={self.failed})")
+
+
+class PartialUpdater:
+    """按对象 id 局部更新不参与向量化的属性
+
+    key_fields 为数据类的自然键（utils/upsert.py 用它生成对象 id）：修改它们会让对象 id
+    与内容对不上，因此不允许局部更新。
+    """
+
+    def __init__(self, client, class_definition, key_fields, lookup_batch_size=100, concurrency=1,
+                 module="text2vec-ollama", tenant=None):
+        if not key_fields:
+            raise ValueError("至少需要一个自然键字段")
+        self.client = client
+        self.class_name = class_definition["class"]
+        self.key_fields = tuple(key_fields)
+        self.mapper = PropertyMapper(class_definition)
+        self.patchable = set(patchable_properties(class_definition, module))
+        self.vectorized = {name for name, _ in vectorized_fields(class_definition, module)}
+        self.has_hash = any(prop["name"] == HASH_PROPERTY for prop in class_definition.get("properties", []))
+        # 计算 contentHash 需要对象的全部属性
+        self.fields = [prop["name"] for prop in class_definition.get("properties", [])
+                       if prop["dataType"][0].rstrip("[]") in PRIMITIVE_TYPES and prop["name"] != HASH_PROPERTY]
+        self.lookup_batch_size = lookup_batch_size
+        self.concurrency = concurrency
+        self.tenant = tenant
+        self.stats = PatchStats()
+
+    def check(self, properties):
+        """确认更新只涉及可局部更新的属性，否则抛出 ValueError"""
+        vectorized = sorted(name for name in properties if name in self.vectorized)
+        if vectorized:
+            raise ValueError(f"{self.class_name}.{vectorized} 参与向量化，修改它们需要整体写入对象")
+        keys = sorted(name for name in properties if name in self.key_fields)
+        if keys:
+            raise ValueError(f"{self.class_name}.{keys} 是自然键，修改后对象 id 会失效，请删除后重新导入")
+        unknown = sorted(name for name in properties if name not in self.patchable)
+        if unknown:
+            raise ValueError(f"{self.class_name} 中没有可局部更新的属性 {unknown}")
+
+    def update(self, updates):
+        """updates 为 (对象 id, 要修改的属性) 的可迭代对象，返回 PatchStats"""
+        chunk = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="patch") as executor:
+            for object_id, properties in updates:
+                properties = self.mapper.map(properties)
+                self.check(properties)
+                chunk.append((str(object_id), properties))
+                if len(chunk) >= self.lookup_batch_size:
+                    self._update_chunk(chunk, executor)
+                    chunk = []
+            if chunk:
+                self._update_chunk(chunk, executor)
+        return self.stats
+
+    def update_records(self, records):
+        """按自然键定位对象（与 utils/upsert.py 的 id 一致）；记录中的键字段只用于定位，不会被修改"""
+        def updates():
+            for record in records:
+                key = self.mapper.map({field: record.get(field) for field in self.key_fields})
+                properties = {name: value for name, value in record.items() if name not in self.key_fields}
+                yield object_uuid(self.class_name, key, self.key_fields), properties
+
+        return self.update(updates())
+
+    def fetch(self, ids):
+        """批量查询对象的当前属性，返回 {id: 属性}（不存在的 id 不在结果中）"""
+        query = GetQuery(self.class_name, self.fields, where=Filter.by_id().contains_any(ids),
+                         limit=len(ids), additional=["id"], tenant=self.tenant)
+        current = {}
+        for item in self.client.search(query):
+            object_id = item.pop("_additional")["id"]
+            current[object_id] = self.mapper.map(item)
+        return current
+
+    def _update_chunk(self, chunk, executor):
+        # 同一组内多次更新同一对象时按顺序合并
+        pending = {}
+        for object_id, properties in chunk:
+            pending.setdefault(object_id, {}).update(properties)
+
+        current = self.fetch(list(pending))
+        patches = []
+        for object_id, properties in pending.items():
+            if object_id not in current:
+                self.stats.missing += 1
+                continue
+            changed = {name: value for name, value in properties.items() if current[object_id].get(name) != value}
+            if not changed:
+                self.stats.unchanged += 1
+                continue
+            if self.has_hash:
+                changed[HASH_PROPERTY] = content_hash({**current[object_id], **changed})
+            patches.append((object_id, changed))
+
+        for object_id, response in zip((object_id for object_id, _ in patches),
+                                        executor.map(self._patch, patches)):
+            if response.status_code in (200, 204):
+                self.stats.patched += 1
+            else:
+                self.stats.failed += 1
+                self.stats.errors.append({"id": object_id, "message":
+                                          f"HTTP {response.status_code} {response.text[:200]}"})
+
+    def _patch(self, patch):
+        object_id, properties = patch
+        return self.client.patch_object(self.class_name, object_id, properties, tenant=self.tenant)
@@ -0,0 +1,414 @@
+"""
+GraphQL 查询构建器
+
+用 Python 对象描述 Get / Aggregate / nearText / nearVector / hybrid 查询，生成
+"查询模板 + GraphQL 变量"。模板只取决于查询的结构（类名、字段、过滤条件的
+路径和运算符、排序等），按结构缓存；重复调用时只需要序列化变量的值。
+所有值都通过变量传递，不会拼接进查询字符串，避免 valueText 等被注入。
+
+用法:
+    query = GetQuery(
+        "Movie", ["title", "year", "rating"],
+        where=Filter.by_property("genre").equal("科幻") & Filter.by_property("rating").greater_than(8.5),
+        sort=[Sort("rating", "desc")],
+        limit=3,
+    )
+    response = query.execute(client)
+    movies = query.results(response)
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+_IDENTIFIER = re.compile(r"^[_A-Za-z][_0-9A-Za-z]*$")
+
+
+def check_name(name):
+    """校验类名/属性名，防止被拼接进查询模板的标识符带入注入"""
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"非法的名称: {name!r}")
+    return name
+
+
+def to_date_string(value):
+    """把 date/datetime 转为 RFC3339 字符串"""
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text + "Z" if value.tzinfo is None else text.replace("+00:00", "Z")
+    if isinstance(value, date):
+        return f"{value.isoformat()}T00:00:00Z"
+    return value
+
+
+def value_field(value):
+    """根据 Python 值推断 where 条件使用的字段名和 GraphQL 变量类型"""
+    if isinstance(value, (list, tuple)):
+        if not value:
+            raise ValueError("数组条件不能为空")
+        field, gql_type = value_field(value[0])
+        return field, f"[{gql_type}]!"
+    if isinstance(value, bool):
+        return "valueBoolean", "Boolean!"
+    if isinstance(value, int):
+        return "valueInt", "Int!"
+    if isinstance(value, float):
+        return "valueNumber", "Float!"
+    if isinstance(value, (date, datetime)):
+        return "valueDate", "String!"
+    if isinstance(value, str):
+        return "valueText", "String!"
+    raise TypeError(f"不支持的过滤值类型: {type(value).__name__}")
+
+
+class _Params:
+    """收集查询中的变量（按出现顺序命名为 $v0, $v1, ...）"""
+
+    def __init__(self):
+        self.types = []
+        self.values = {}
+
+    def add(self, gql_type, value):
+        name = f"v{len(self.types)}"
+        self.types.append(gql_type)
+        self.values[name] = value
+        return name
+
+
+# ============ 过滤条件 ============
+
+class Filter:
+    """where 过滤条件
+
+    Filter.by_property("genre").equal("科幻")
+    Filter.by_property("rating").greater_than(8.5) & Filter.by_property("year").less_than(2000)
+    """
+
+    def __init__(self, operator, path=None, value=None, operands=None):
+        self.operator = operator
+        self.path = path
+        self.value = value
+        self.operands = operands or []
+
+    @staticmethod
+    def by_property(*path):
+        return _PropertyFilterBuilder([check_name(name) for name in path])
+
+    @staticmethod
+    def by_id():
+        return _PropertyFilterBuilder(["id"])
+
+    @staticmethod
+    def all_of(filters):
+        return Filter("And", operands=list(filters))
+
+    @staticmethod
+    def any_of(filters):
+        return Filter("Or", operands=list(filters))
+
+    def __and__(self, other):
+        return Filter.all_of([self, other])
+
+    def __or__(self, other):
+        return Filter.any_of([self, other])
+
+    def shape(self, params):
+        """返回过滤条件的结构（用于模板缓存），同时把值登记为变量"""
+        if self.operands:
+            return (self.operator, tuple(operand.shape(params) for operand in self.operands))
+        if self.operator == "IsNull":
+            return (self.operator, tuple(self.path), "valueBoolean", params.add("Boolean!", bool(self.value)))
+        field, gql_type = value_field(self.value)
+        return (self.operator, tuple(self.path), field, params.add(gql_type, self._serialized_value()))
+
+    def to_dict(self):
+        """转换为 REST 接口（如批量删除）使用的 where JSON"""
+        if self.operands:
+            return {"operator": self.operator, "operands": [operand.to_dict() for operand in self.operands]}
+        if self.operator == "IsNull":
+            return {"path": list(self.path), "operator": "IsNull", "valueBoolean": bool(self.value)}
+        field, _ = value_field(self.value)
+        return {"path": list(self.path), "operator": self.operator, field: self._serialized_value()}
+
+    def _serialized_value(self):
+        if isinstance(self.value, (list, tuple)):
+            return [to_date_string(item) for item in self.value]
+        return to_date_string(self.value)
+
+
+class _PropertyFilterBuilder:
+    def __init__(self, path):
+        self.path = path
+
+    def _make(self, operator, value):
+        return Filter(operator, path=self.path, value=value)
+
+    def equal(self, value):
+        return self._make("Equal", value)
+
+    def not_equal(self, value):
+        return self._make("NotEqual", value)
+
+    def greater_than(self, value):
+        return self._make("GreaterThan", value)
+
+    def greater_or_equal(self, value):
+        return self._make("GreaterThanEqual", value)
+
+    def less_than(self, value):
+        return self._make("LessThan", value)
+
+    def less_or_equal(self, value):
+        return self._make("LessThanEqual", value)
+
+    def like(self, pattern):
+        return self._make("Like", pattern)
+
+    def contains_any(self, values):
+        return self._make("ContainsAny", list(values))
+
+    def contains_all(self, values):
+        return self._make("ContainsAll", list(values))
+
+    def is_null(self, value=True):
+        return Filter("IsNull", path=self.path, value=value)
+
+
+def _render_where(shape):
+    if len(shape) == 2:
+        operator, operands = shape
+        inner = ", ".join(_render_where(operand) for operand in operands)
+        return f"{{ operator: {operator} operands: [{inner}] }}"
+    operator, path, field, variable = shape
+    path_text = ", ".join(f'"{name}"' for name in path)
+    return f"{{ path: [{path_text}] operator: {operator} {field}: ${variable} }}"
+
+
+# ============ 排序 / 近邻搜索 ============
+
+class Sort:
+    """排序条件"""
+
+    def __init__(self, path, order="asc"):
+        if order not in ("asc", "desc"):
+            raise ValueError(f"排序方向只能是 asc 或 desc: {order!r}")
+        self.path = check_name(path)
+        self.order = order
+
+    def shape(self):
+        return (self.path, self.order)
+
+
+class NearText:
+    """nearText: 由 Weaviate 向量化概念后搜索"""
+
+    def __init__(self, concepts, distance=None, certainty=None):
+        self.concepts = list(concepts)
+        self.distance = distance
+        self.certainty = certainty
+
+    def shape(self, params):
+        args = [("concepts", params.add("[String!]!", self.concepts))]
+        if self.distance is not None:
+            args.append(("distance", params.add("Float!", float(self.distance))))
+        if self.certainty is not None:
+            args.append(("certainty", params.add("Float!", float(self.certainty))))
+        return ("nearText", tuple(args))
+
+
+class NearVector:
+    """nearVector: 使用客户端提供的向量搜索（可以是列表或 numpy 数组）"""
+
+    def __init__(self, vector, distance=None, certainty=None):
+        # numpy 数组走 tolist 的 C 实现，比逐个转换 float 快得多
+        self.vector = vector.tolist() if hasattr(vector, "tolist") else [float(x) for x in vector]
+        self.distance = distance
+        self.certainty = certainty
+
+    def shape(self, params):
+        args = [("vector", params.add("[Float!]!", self.vector))]
+        if self.distance is not None:
+            args.append(("distance", params.add("Float!", float(self.distance))))
+        if self.certainty is not None:
+            args.append(("certainty", params.add("Float!", float(self.certainty))))
+        return ("nearVector", tuple(args))
+
+
+class Hybrid:
+    """hybrid: BM25 关键词搜索与向量搜索融合（alpha=1 为纯向量，alpha=0 为纯关键词）"""
+
+    def __init__(self, query, alpha=None, vector=None):
+        self.query = query
+        self.alpha = alpha
+        self.vector = None
+        if vector is not None:
+            self.vector = vector.tolist() if hasattr(vector, "tolist") else [float(x) for x in vector]
+
+    def shape(self, params):
+        args = [("query", params.add("String!", self.query))]
+        if self.alpha is not None:
+            args.append(("alpha", params.add("Float!", float(self.alpha))))
+        if self.vector is not None:
+            args.append(("vector", params.add("[Float!]!", self.vector)))
+        return ("hybrid", tuple(args))
+
+
+def _render_near(shape):
+    name, args = shape
+    inner = " ".join(f"{key}: ${variable}" for key, variable in args)
+    return f"{name}: {{ {inner} }}"
+
+
+# ============ 查询 ============
+
+class _Query:
+    """查询基类: build() 返回 (查询模板, 变量)"""
+
+    root = None
+
+    def __init__(self, class_name):
+        self.class_name = check_name(class_name)
+
+    def _shape(self, params):
+        raise NotImplementedError
+
+    def build(self):
+        params = _Params()
+        selection = (None,) + self._shape(params)
+        return _compile(self.root, (selection,), tuple(params.types)), params.values
+
+    def execute(self, client):
+        query, variables = self.build()
+        return client.graphql_query(query, variables)
+
+    def results(self, response):
+        """从响应中取出当前类的结果列表"""
+        if response.status_code != 200:
+            return []
+        data = response.json().get("data") or {}
+        return (data.get(self.root) or {}).get(self.class_name) or []
+
+
+class GetQuery(_Query):
+    """Get 查询"""
+
+    root = "Get"
+
+    def __init__(self, class_name, fields, where=None, near=None, sort=None,
+                 limit=None, offset=None, additional=None, tenant=None):
+        super().__init__(class_name)
+        self.fields = tuple(check_name(field) for field in fields)
+        self.where = where
+        self.near = near
+        self.sort = list(sort or [])
+        self.limit = limit
+        self.offset = offset
+        self.additional = tuple(check_name(field) for field in (additional or []))
+        self.tenant = tenant
+
+    def _shape(self, params):
+        # 参数顺序与 Weaviate 文档中的写法一致
+        args = []
+        if self.near is not None:
+            args.append(("near", self.near.shape(params)))
+        if self.where is not None:
+            args.append(("where", self.where.shape(params)))
+        if self.sort:
+            args.append(("sort", tuple(item.shape() for item in self.sort)))
+        if self.limit is not None:
+            args.append(("limit", params.add("Int!", int(self.limit))))
+        if self.offset is not None:
+            args.append(("offset", params.add("Int!", int(self.offset))))
+        if self.tenant is not None:
+            args.append(("tenant", params.add("String!", self.tenant)))
+        return (self.class_name, tuple(args), self.fields, self.additional)
+
+
+class AggregateQuery(_Query):
+    """Aggregate 查询（meta count）"""
+
+    root = "Aggregate"
+
+    def __init__(self, class_name, where=None, near=None, tenant=None):
+        super().__init__(class_name)
+        self.where = where
+        self.near = near
+        self.tenant = tenant
+
+    def _shape(self, params):
+        args = []
+        if self.near is not None:
+            args.append(("near", self.near.shape(params)))
+        if self.where is not None:
+            args.append(("where", self.where.shape(params)))
+        if self.tenant is not None:
+            args.append(("tenant", params.add("String!", self.tenant)))
+        return (self.class_name, tuple(args), ("meta { count }",), ())
+
+    def count(self, response):
+        results = self.results(response)
+        return results[0].get("meta", {}).get("count", 0) if results else 0
+
+
+class MultiAggregateQuery:
+    """把多个 AggregateQuery 合并成一个请求（各自使用别名 c0, c1, ...）
+
+    用于一次统计多个数据类 / 租户 / 过滤条件下的对象数量。
+    """
+
+    root = "Aggregate"
+
+    def __init__(self, queries):
+        self.queries = list(queries)
+
+    def build(self):
+        params = _Params()
+        selections = tuple((f"c{i}",) + query._shape(params) for i, query in enumerate(self.queries))
+        return _compile(self.root, selections, tuple(params.types)), params.values
+
+    def execute(self, client):
+        query, variables = self.build()
+        return client.graphql_query(query, variables)
+
+    def counts(self, response):
+        """按输入顺序返回各查询的数量（失败的条目为 None）"""
+        if response.status_code != 200:
+            return [None] * len(self.queries)
+        data = (response.json().get("data") or {}).get(self.root) or {}
+        counts = []
+        for i in range(len(self.queries)):
+            results = data.get(f"c{i}")
+            counts.append(results[0].get("meta", {}).get("count", 0) if results else None)
+        return counts
+
+
+@lru_cache(maxsize=512)
+def _compile(root, selections, variable_types):
+    """按查询结构生成模板（结构相同的查询只生成一次）"""
+    rendered = " ".join(_render_selection(selection) for selection in selections)
+    declarations = ", ".join(f"$v{i}: {gql_type}" for i, gql_type in enumerate(variable_types))
+    header = f"query({declarations}) " if declarations else ""
+    return f"{header}{{ {root} {{ {rendered} }} }}"
+
+
+def _render_selection(selection):
+    alias, class_name, args, fields, additional = selection
+
+    rendered_args = []
+    for key, value in args:
+        if key == "near":
+            rendered_args.append(_render_near(value))
+        elif key == "where":
+            rendered_args.append(f"where: {_render_where(value)}")
+        elif key == "sort":
+            items = ", ".join(f'{{ path: ["{path}"], order: {order} }}' for path, order in value)
+            rendered_args.append(f"sort: [{items}]")
+        else:
+            rendered_args.append(f"{key}: ${value}")
+
+    selection = " ".join(fields)
+    if additional:
+        selection += f" _additional {{ {' '.join(additional)} }}"
+
+    arguments = f"({', '.join(rendered_args)})" if rendered_args else ""
+    prefix = f"{alias}: " if alias else ""
+    return f"{prefix}{class_name}{arguments} {{ {selection} }}"
@@ -0,0 +1,114 @@
+"""
+GraphQL 查询结果缓存
+
+进程内 LRU 缓存，键为规范化后的查询语句 + 变量，条目有 TTL。
+客户端定期（validate_interval）计算一次 Schema + 各类对象数量的指纹，
+指纹变化说明数据或 Schema 被修改过，此时清空缓存。
+通过同一个客户端执行的写操作也会立即清空缓存。
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config.weaviate_config import config as default_config
+
+# GraphQL 字符串字面量（其中的空白不能被规范化）
+_STRING_LITERAL = re.compile(r'"(?:\\.|[^"\\])*"')
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """规范化查询：合并字符串字面量之外的空白"""
+    parts = []
+    last = 0
+    for match in _STRING_LITERAL.finditer(query):
+        parts.append(_WHITESPACE.sub(" ", query[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_WHITESPACE.sub(" ", query[last:]))
+    return "".join(parts).strip()
+
+
+def make_key(query, variables=None):
+    """计算缓存键"""
+    normalized = normalize_query(query)
+    if variables:
+        normalized += "\0" + json.dumps(variables, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """带 TTL 和容量上限的 LRU 查询缓存"""
+
+    def __init__(self, max_entries=1024, ttl=30.0, validate_interval=5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.validate_interval = validate_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._validated_at = 0.0
+
+    def get(self, key):
+        """查询缓存，未命中或已过期返回 None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """清空缓存"""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+
+    def needs_validation(self):
+        return time.monotonic() - self._validated_at >= self.validate_interval
+
+    def validate(self, fingerprint):
+        """用最新的 Schema/数量指纹校验缓存，指纹变化时清空"""
+        with self._lock:
+            self._validated_at = time.monotonic()
+            changed = self._fingerprint is not None and fingerprint != self._fingerprint
+            self._fingerprint = fingerprint
+        if changed:
+            self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def create_query_cache(weaviate_config=None):
+    """按配置创建查询缓存，未启用时返回 None"""
+    weaviate_config = weaviate_config or default_config
+    cache_config = weaviate_config.get_query_cache_config()
+    if not cache_config["enabled"]:
+        return None
+    return QueryCache(
+        max_entries=cache_config["max_entries"],
+        ttl=cache_config["ttl"],
+        validate_interval=cache_config["validate_interval"],
+    )
@@ -0,0 +1,244 @@
+"""
+零停机重建索引（影子数据类 + 别名切换）
+
+修改向量化模型或属性后，不再删除重建原数据类，而是：
+1. create   按新定义创建影子数据类 {alias}_v{N}
+2. copy     用 after 游标逐页读取当前数据，通过批量导入器写入影子数据类（保留 uuid）
+3. validate 比较两边的对象数量
+4. swap     把别名 alias 原子地切换到影子数据类（Weaviate 1.32+ /v1/aliases）
+
+查询一直通过别名进行，整个过程中搜索不受影响。每一步和复制游标都会写入
+状态文件，进程中断后重新运行会从上次的位置继续。
+
+注意：
+- 第一次迁移时 alias 还是一个普通数据类，别名不能与数据类同名，需要先删除
+  原数据类再创建别名（drop_source=True），这会有几秒钟不可用；之后的每次
+  重建都只是一次别名切换。
+- 复制期间对原数据类的新写入不会被复制，请暂停写入或在切换前做一次增量同步。
+"""
+import copy
+import os
+import re
+import time
+
+from utils.batch_importer import BatchImporter
+from utils.object_iterator import iter_pages
+from utils.state_file import load_state, remove_state, save_state
+
+STEPS = ("create", "copy", "validate", "swap", "done")
+
+
+def default_state_path(alias):
+    return os.path.join(".cache", f"reindex-{alias}.json")
+
+
+def print_progress(state):
+    """默认的进度输出"""
+    if state["step"] != "copy":
+        print(f"   [{state['step']}] {state['source']} -> {state['target']}")
+        return
+    total = state.get("source_count") or 0
+    percent = f"{state['copied'] / total:.1%}" if total else "?"
+    rate = state.get("rate") or 0.0
+    eta = f"{(total - state['copied']) / rate:.0f}s" if rate and total > state["copied"] else "-"
+    print(f"   [copy] {state['copied']}/{total} ({percent})  {rate:.0f} obj/s  剩余约 {eta}  "
+          f"失败 {state['failed']}")
+
+
+class Reindexer:
+    """可续传的影子数据类重建流程
+
+    用法:
+        reindexer = Reindexer(client, "Movie", new_movie_definition)
+        state = reindexer.run()
+    """
+
+    def __init__(self, client, alias, definition, state_path=None, page_size=500, batch_size=100,
+                 copy_vectors=None, vectorizer=None, drop_source=False, count_tolerance=0,
+                 on_progress=print_progress):
+        self.client = client
+        self.alias = alias
+        self.definition = definition
+        self.state_path = state_path or default_state_path(alias)
+        self.page_size = page_size
+        self.batch_size = batch_size
+        # None 表示自动判断：向量化配置没有变化时直接复制向量，省去重新向量化
+        self.copy_vectors = copy_vectors
+        self.vectorizer = vectorizer
+        self.drop_source = drop_source
+        self.count_tolerance = count_tolerance
+        self.on_progress = on_progress
+        self.state = None
+        # 最近一次复制中失败对象的详情（最多 100 条）
+        self.errors = []
+
+    # ============ 流程 ============
+
+    def run(self):
+        """执行（或继续执行）重建流程，返回最终状态"""
+        self.state = load_state(self.state_path) or self._initial_state()
+        handlers = {
+            "create": self._create,
+            "copy": self._copy,
+            "validate": self._validate,
+            "swap": self._swap,
+        }
+        while self.state["step"] != "done":
+            handlers[self.state["step"]]()
+            self._advance()
+        remove_state(self.state_path)
+        return self.state
+
+    def reset(self):
+        """放弃未完成的重建（影子数据类保留，需要时手动删除）"""
+        remove_state(self.state_path)
+
+    def _initial_state(self):
+        source = self.resolve_source()
+        if source is None:
+            raise RuntimeError(f"{self.alias} 既不是别名也不是数据类，无需重建，直接创建即可")
+        return {
+            "alias": self.alias,
+            "source": source,
+            "target": self._next_target_name(),
+            "step": "create",
+            "after": None,
+            "copied": 0,
+            "failed": 0,
+            "copy_vectors": None,
+            "source_count": None,
+            "target_count": None,
+        }
+
+    def _advance(self):
+        self.state["step"] = STEPS[STEPS.index(self.state["step"]) + 1]
+        self._save()
+        if self.on_progress:
+            self.on_progress(self.state)
+
+    def _save(self):
+        save_state(self.state_path, self.state)
+
+    # ============ 步骤 ============
+
+    def _create(self):
+        definition = copy.deepcopy(self.definition)
+        definition["class"] = self.state["target"]
+        response = self.client.get_class(definition["class"])
+        if response.status_code != 200:
+            response = self.client.create_class(definition)
+            if response.status_code != 200:
+                raise RuntimeError(f"创建影子数据类 {definition['class']} 失败: "
+                                   f"HTTP {response.status_code} {response.text[:200]}")
+
+        self.state["copy_vectors"] = self._should_copy_vectors()
+        self.state["source_count"] = self.client.get_object_count(self.state["source"])
+
+    def _copy(self):
+        state = self.state
+        source, target = state["source"], state["target"]
+        allowed = {prop["name"] for prop in self.definition.get("properties", [])}
+        include_vector = bool(state["copy_vectors"]) and self.vectorizer is None
+
+        importer = BatchImporter(self.client, batch_size=self.batch_size)
+        started, copied_at_start = time.perf_counter(), state["copied"]
+        for objects in iter_pages(self.client, source, self.page_size,
+                                  include_vector=include_vector, after=state["after"]):
+            # 只保留新定义中存在的属性（被删除的属性不再写入）
+            records = [{name: value for name, value in (obj.get("properties") or {}).items()
+                        if name in allowed} for obj in objects]
+            if self.vectorizer is not None:
+                vectors = [vector for _, vector in self.vectorizer.vectorize(records)]
+            else:
+                vectors = [obj.get("vector") if include_vector else None for obj in objects]
+
+            failed_before = importer.stats.failed
+            for obj, properties, vector in zip(objects, records, vectors):
+                importer.add(target, properties, uuid=obj["id"], vector=vector)
+            # 整页写完才推进游标：中断后最多重复写入一页（按 uuid 覆盖，结果相同）
+            importer.flush()
+
+            state["after"] = objects[-1]["id"]
+            state["copied"] += len(objects)
+            state["failed"] += importer.stats.failed - failed_before
+            elapsed = time.perf_counter() - started
+            state["rate"] = (state["copied"] - copied_at_start) / elapsed if elapsed > 0 else 0.0
+            self._save()
+            if self.on_progress:
+                self.on_progress(state)
+
+        self.errors = importer.stats.errors
+
+    def _validate(self):
+        state = self.state
+        state["source_count"] = self.client.get_object_count(state["source"])
+        state["target_count"] = self.client.get_object_count(state["target"])
+        difference = abs(state["source_count"] - state["target_count"])
+        if difference > self.count_tolerance:
+            self._save()
+            raise RuntimeError(
+                f"数量校验失败: {state['source']}={state['source_count']}, "
+                f"{state['target']}={state['target_count']}（复制失败 {state['failed']} 个）。"
+                f"修复后重新运行会再次校验；如需重新复制请先 reset()"
+            )
+
+    def _swap(self):
+        alias, target, source = self.alias, self.state["target"], self.state["source"]
+        response = self.client.get_alias(alias)
+        if response.status_code == 200:
+            response = self.client.update_alias(alias, target)
+        else:
+            if source == alias:
+                # 第一次迁移：alias 还是普通数据类
+                if not self.drop_source:
+                    raise RuntimeError(
+                        f"{alias} 是一个数据类而不是别名，首次切换需要删除它再创建同名别名"
+                        f"（drop_source=True，会有几秒钟不可用）；数据已完整复制到 {target}"
+                    )
+                response = self.client.delete_class(alias)
+                if response.status_code != 200:
+                    raise RuntimeError(f"删除 {alias} 失败: HTTP {response.status_code} {response.text[:200]}")
+                self.state["source"] = source = None
+                self._save()
+            response = self.client.create_alias(alias, target)
+        if response.status_code != 200:
+            raise RuntimeError(f"切换别名 {alias} -> {target} 失败: "
+                               f"HTTP {response.status_code} {response.text[:200]}")
+        self.state["previous"] = source
+
+    # ============ 辅助 ============
+
+    def resolve_source(self):
+        """返回别名当前指向的数据类；alias 本身是数据类时返回 alias；都不是时返回 None"""
+        response = self.client.get_alias(self.alias)
+        if response.status_code == 200:
+            return response.json().get("class")
+        response = self.client.get_class(self.alias)
+        return self.alias if response.status_code == 200 else None
+
+    def _next_target_name(self):
+        response = self.client.list_classes()
+        if response.status_code != 200:
+            raise RuntimeError(f"获取 Schema 失败: HTTP {response.status_code}")
+        pattern = re.compile(rf"^{re.escape(self.alias)}_v(\d+)$")
+        versions = [int(match.group(1)) for cls in response.json().get("classes") or []
+                    if (match := pattern.match(cls["class"]))]
+        return f"{self.alias}_v{max(versions, default=1) + 1}"
+
+    def _should_copy_vectors(self):
+        """向量化器和模型配置都没有变化时可以直接复制向量"""
+        if self.copy_vectors is not None:
+            return self.copy_vectors
+        if self.vectorizer is not None:
+            return False
+        response = self.client.get_class(self.state["source"])
+        if response.status_code != 200:
+            return False
+        current = response.json()
+        vectorizer = self.definition.get("vectorizer")
+        if vectorizer != current.get("vectorizer"):
+            return False
+        wanted = (self.definition.get("moduleConfig") or {}).get(vectorizer) or {}
+        actual = (current.get("moduleConfig") or {}).get(vectorizer) or {}
+        # 服务端会补全默认值，只比较新定义中显式给出的配置
+        return all(actual.get(key) == value for key, value in wanted.items())
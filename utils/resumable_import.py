@@ -0,0 +1,217 @@
+"""
+可续传的文件导入（本地暂存 + 检查点）
+
+长时间的导入中途失败后不必从头再来：
+1. 按 batch_size 行读取源文件，过滤掉未变化的记录（utils/upsert.py），需要时在客户端向量化
+2. 把这一批待写入的对象（带确定性 id 和向量）先写入本地暂存目录（fsync + 原子重命名）
+3. 发送这一批，服务器确认后删除暂存文件，并把源文件位置和已确认批次数原子地写入检查点
+
+重新运行时先重发暂存目录中残留的批次（不需要重新读取和向量化），再从检查点的位置继续读取：
+未压缩的 JSONL / CSV 记录字节偏移并直接 seek 过去，其余格式跳过已读取的原始记录（不做类型转换）。
+对象 id 由自然键确定，重复发送同一批只会覆盖成同样的内容，因此任何时刻中断都是安全的：
+- 暂存之后、发送之前中断：重启后重发暂存文件，位置取暂存文件中记录的值
+- 发送之后、删除暂存文件之前中断：重发一次，结果相同
+- 删除暂存文件之后、写检查点之前中断：重新读取这一批，内容哈希相同，直接跳过
+
+某一批重试后仍有失败时停止导入并保留暂存文件，修复问题后重新运行即可继续。
+
+用法:
+    job = ResumableImport(client, class_definition, "movies.jsonl", ("title", "year"))
+    state = job.run()
+"""
+import json
+import os
+import shutil
+import tempfile
+from itertools import islice
+
+from utils.batch_importer import BatchImporter
+from utils.data_loader import PropertyMapper, read_records_from
+from utils.state_file import load_state, remove_state, save_state
+from utils.upsert import ChangeDetector
+
+
+def default_state_path(class_name):
+    return os.path.join(".cache", f"import-{class_name}.json")
+
+
+def default_spool_dir(class_name):
+    return os.path.join(".cache", f"import-{class_name}.spool")
+
+
+def print_progress(state):
+    """默认的进度输出"""
+    print(f"   [checkpoint] 已读取 {state['offset']} 行, 已确认 {state['acked']} 批, "
+          f"写入 {state['succeeded']} 个, 未变化 {state['unchanged']} 个")
+
+
+def _write_durable(path, lines):
+    """把若干行原子地写入文件（先写临时文件并 fsync，再重命名）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for line in lines:
+                f.write(line)
+                f.write(b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class ResumableImport:
+    """带本地暂存和检查点的幂等文件导入"""
+
+    def __init__(self, client, class_definition, path, key_fields, vectorizer=None, batch_size=100,
+                 state_path=None, spool_dir=None, field_map=None, file_format=None,
+                 on_progress=print_progress, progress_every=10):
+        self.client = client
+        self.class_definition = class_definition
+        self.class_name = class_definition["class"]
+        self.path = path
+        self.key_fields = tuple(key_fields)
+        self.vectorizer = vectorizer
+        self.batch_size = batch_size
+        self.state_path = state_path or default_state_path(self.class_name)
+        self.spool_dir = spool_dir or default_spool_dir(self.class_name)
+        self.field_map = field_map
+        self.file_format = file_format
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.state = None
+        self.importer = None
+        # 最近一次失败批次的错误详情（最多 100 条）
+        self.errors = []
+
+    # ============ 流程 ============
+
+    def run(self):
+        """执行（或继续执行）导入，完成后删除检查点和暂存目录并返回最终状态
+
+        某一批最终写入失败时抛出 RuntimeError，检查点和暂存文件保留。
+        """
+        self.state = self._load()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self.importer = BatchImporter(self.client, batch_size=self.batch_size)
+
+        pending = self.spooled_batches()
+        if pending:
+            print(f"   重发 {len(pending)} 个暂存批次...")
+        for spool_path in pending:
+            self._send_spooled(spool_path)
+
+        detector = ChangeDetector(self.client, self.class_name, self.key_fields, self.batch_size,
+                                  self.class_definition)
+        mapper = PropertyMapper(self.class_definition, self.field_map)
+        rows = read_records_from(self.path, self.file_format, self.state["position"])
+        while True:
+            chunk = list(islice(rows, self.batch_size))
+            if not chunk:
+                break
+            offset = self.state["offset"] + len(chunk)
+            position = chunk[-1][1]
+            before = detector.stats.unchanged
+            objects = self._prepare(detector.changed(mapper.map(row) for row, _ in chunk))
+            self.state["unchanged"] += detector.stats.unchanged - before
+            if objects:
+                spool_path = self._spool(objects, offset, position)
+                self._send_spooled(spool_path)
+            else:
+                self.state["offset"] = offset
+                self.state["position"] = position
+                self._save()
+
+        remove_state(self.state_path)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        return self.state
+
+    def reset(self):
+        """放弃未完成的导入（删除检查点和暂存批次）"""
+        remove_state(self.state_path)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+    def spooled_batches(self):
+        """暂存目录中尚未确认的批次（按序号排列）"""
+        if not os.path.isdir(self.spool_dir):
+            return []
+        names = sorted(name for name in os.listdir(self.spool_dir) if name.startswith("batch-"))
+        return [os.path.join(self.spool_dir, name) for name in names]
+
+    # ============ 状态 ============
+
+    def _source_info(self):
+        stat = os.stat(self.path)
+        return {"source": os.path.abspath(self.path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load(self):
+        source = self._source_info()
+        state = load_state(self.state_path)
+        if state is None:
+            return {"class": self.class_name, **source, "key_fields": list(self.key_fields),
+                    "offset": 0, "position": 0, "next_batch": 0, "acked": 0, "succeeded": 0, "unchanged": 0}
+        if (state.get("class") != self.class_name or state.get("key_fields") != list(self.key_fields)
+                or "position" not in state):
+            raise RuntimeError(f"检查点 {self.state_path} 属于另一次导入"
+                               f"（{state.get('class')}，自然键 {state.get('key_fields')}），请先重置")
+        if any(state.get(key) != value for key, value in source.items()):
+            raise RuntimeError(f"{self.path} 与检查点记录的源文件不一致（路径、大小或修改时间变化），"
+                               f"偏移已经无效，请重置后重新导入")
+        return state
+
+    def _save(self):
+        save_state(self.state_path, self.state)
+
+    # ============ 批次 ============
+
+    def _prepare(self, changed):
+        """把变化的记录转换为批量导入的对象（需要时在客户端向量化）"""
+        changed = list(changed)
+        if self.vectorizer is None:
+            return [{"class": self.class_name, "id": object_id, "properties": properties}
+                    for object_id, properties in changed]
+        vectorized = self.vectorizer.vectorize(properties for _, properties in changed)
+        return [{"class": self.class_name, "id": object_id, "properties": properties,
+                 "vector": vector.tolist() if hasattr(vector, "tolist") else vector}
+                for (object_id, _), (properties, vector) in zip(changed, vectorized)]
+
+    def _spool(self, objects, offset, position):
+        """把一批对象写入暂存目录，返回暂存文件路径"""
+        seq = self.state["next_batch"]
+        self.state["next_batch"] += 1
+        spool_path = os.path.join(self.spool_dir, f"batch-{seq:08d}.jsonl")
+        header = {"batch": seq, "offset": offset, "position": position, "count": len(objects)}
+        lines = [json.dumps(header).encode("utf-8")]
+        lines.extend(json.dumps(obj, ensure_ascii=False).encode("utf-8") for obj in objects)
+        _write_durable(spool_path, lines)
+        return spool_path
+
+    def _send_spooled(self, spool_path):
+        """发送一个暂存批次；全部成功后删除暂存文件并推进检查点"""
+        with open(spool_path, "rb") as f:
+            header = json.loads(f.readline())
+            objects = [json.loads(line) for line in f if line.strip()]
+
+        stats = self.importer.stats
+        failed = stats.failed
+        for obj in objects:
+            self.importer.add(obj["class"], obj["properties"], uuid=obj.get("id"), vector=obj.get("vector"))
+        self.importer.flush()
+        if stats.failed > failed:
+            self.errors = stats.errors[-(stats.failed - failed):]
+            raise RuntimeError(f"批次 {header['batch']} 中 {stats.failed - failed} 个对象写入失败，"
+                               f"已保留暂存文件 {spool_path}，修复后重新运行即可继续: "
+                               f"{self.errors[0]['message']}")
+
+        os.unlink(spool_path)
+        self.state["offset"] = max(self.state["offset"], header["offset"])
+        self.state["position"] = max(self.state["position"], header["position"])
+        self.state["next_batch"] = max(self.state["next_batch"], header["batch"] + 1)
+        self.state["acked"] += 1
+        self.state["succeeded"] += len(objects)
+        self._save()
+        if self.on_progress and self.state["acked"] % self.progress_every == 0:
+            self.on_progress(self.state)
@@ -0,0 +1,236 @@
+"""
+Schema 注册表与增量迁移
+
+SchemaRegistry 缓存服务器上的 Schema（/v1/schema），并把声明式的数据类定义
+（config.schema_definitions）与之比较：
+- 缺失的数据类 -> 创建
+- 已有数据类中缺失的属性 -> 通过 /v1/schema/{class}/properties 添加
+- 可在线修改的向量索引参数（ef、dynamicEf*、量化）-> 通过 PUT /v1/schema/{class} 更新
+- 无法在线修改的差异（属性类型、向量化器）-> 只报告为冲突，不做任何删除
+
+零停机重建（utils/reindex.py）之后，声明的类名是指向 Movie_v2 这类数据类的别名，
+/v1/schema 中不会列出它；注册表同时读取 /v1/aliases，按别名指向的数据类比较和更新。
+
+迁移是幂等的：Schema 已经是最新时不会发出任何写请求，重新部署只需要几秒钟。
+
+用法:
+    registry = SchemaRegistry(client)
+    diff = registry.migrate(SCHEMA)
+    print(diff)
+"""
+import copy
+import threading
+import time
+
+from utils.vector_index import MUTABLE_INDEX_KEYS
+
+
+class SchemaDiff:
+    """声明的 Schema 与服务器 Schema 之间的差异"""
+
+    def __init__(self):
+        self.missing_classes = []     # [数据类定义]
+        self.missing_properties = []  # [(类名, 属性定义)]
+        self.index_updates = []       # [(类名, {可在线修改的向量索引参数})]
+        self.conflicts = []           # [(类名, 属性名或 None, 说明)]
+
+    @property
+    def is_empty(self):
+        """没有需要执行的变更（冲突不计入）"""
+        return not self.missing_classes and not self.missing_properties and not self.index_updates
+
+    def __str__(self):
+        lines = []
+        for definition in self.missing_classes:
+            lines.append(f"+ 数据类 {definition['class']}（{len(definition.get('properties', []))} 个属性）")
+        for class_name, prop in self.missing_properties:
+            lines.append(f"+ 属性 {class_name}.{prop['name']} ({', '.join(prop['dataType'])})")
+        for class_name, changes in self.index_updates:
+            lines.append(f"~ 向量索引 {class_name}: {', '.join(sorted(changes))}")
+        for class_name, prop_name, message in self.conflicts:
+            target = f"{class_name}.{prop_name}" if prop_name else class_name
+            lines.append(f"! 冲突 {target}: {message}")
+        return "\n".join(lines) if lines else "Schema 已是最新"
+
+
+def diff_schema(definitions, server_classes, aliases=None):
+    """比较声明的数据类定义与服务器上的数据类 {类名: 定义}，返回 SchemaDiff
+
+    aliases 为 {别名: 数据类}：声明的类名是别名时与它指向的数据类比较，变更也作用于该数据类。
+    """
+    diff = SchemaDiff()
+    existing = {name.lower(): definition for name, definition in server_classes.items()}
+    targets = {alias.lower(): class_name for alias, class_name in (aliases or {}).items()}
+
+    for definition in definitions:
+        class_name = targets.get(definition["class"].lower(), definition["class"])
+        current = existing.get(class_name.lower())
+        if current is None:
+            diff.missing_classes.append(definition)
+            continue
+
+        vectorizer = definition.get("vectorizer")
+        if vectorizer and current.get("vectorizer") and vectorizer != current["vectorizer"]:
+            diff.conflicts.append((class_name, None,
+                                   f"向量化器 {current['vectorizer']} -> {vectorizer} 需要重建数据类"))
+
+        _diff_vector_index(diff, class_name, definition, current)
+
+        current_props = {prop["name"].lower(): prop for prop in current.get("properties") or []}
+        for prop in definition.get("properties", []):
+            current_prop = current_props.get(prop["name"].lower())
+            if current_prop is None:
+                diff.missing_properties.append((class_name, prop))
+            elif current_prop.get("dataType") != prop["dataType"]:
+                diff.conflicts.append((class_name, prop["name"],
+                                       f"类型 {current_prop.get('dataType')} -> {prop['dataType']} 需要重建数据类"))
+    return diff
+
+
+def _diff_vector_index(diff, class_name, definition, current):
+    """比较向量索引配置：可在线修改的参数记为更新，其余差异记为冲突"""
+    index_type = definition.get("vectorIndexType")
+    if index_type and current.get("vectorIndexType") and index_type != current["vectorIndexType"]:
+        diff.conflicts.append((class_name, None,
+                               f"索引类型 {current['vectorIndexType']} -> {index_type} 需要重建数据类"))
+        return
+
+    current_config = current.get("vectorIndexConfig") or {}
+    changes = {}
+    for key, value in (definition.get("vectorIndexConfig") or {}).items():
+        if _matches(value, current_config.get(key)):
+            continue
+        if key in MUTABLE_INDEX_KEYS:
+            changes[key] = value
+        else:
+            diff.conflicts.append((class_name, None,
+                                   f"向量索引 {key} {current_config.get(key)} -> {value} 需要重建数据类"))
+    if changes:
+        diff.index_updates.append((class_name, changes))
+
+
+def _matches(wanted, actual):
+    """wanted 中给出的配置是否都与 actual 一致（服务端会补全默认值，多出的键忽略）"""
+    if isinstance(wanted, dict):
+        return isinstance(actual, dict) and all(_matches(value, actual.get(key))
+                                                for key, value in wanted.items())
+    return wanted == actual
+
+
+class SchemaRegistry:
+    """带缓存的服务器 Schema 视图"""
+
+    def __init__(self, client, ttl=60.0):
+        self.client = client
+        self.ttl = ttl
+        self._classes = None
+        self._aliases = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def classes(self, refresh=False):
+        """返回 {类名: 定义}（缓存 ttl 秒）"""
+        with self._lock:
+            expired = time.monotonic() - self._fetched_at > self.ttl
+            if refresh or self._classes is None or expired:
+                response = self.client.list_classes()
+                if response.status_code != 200:
+                    raise RuntimeError(f"获取 Schema 失败: HTTP {response.status_code} {response.text[:200]}")
+                self._classes = {cls["class"]: cls for cls in response.json().get("classes") or []}
+                self._aliases = self._fetch_aliases()
+                self._fetched_at = time.monotonic()
+            return self._classes
+
+    def aliases(self, refresh=False):
+        """返回 {别名: 数据类}（与 classes 一起缓存）"""
+        self.classes(refresh)
+        return self._aliases
+
+    def resolve(self, class_name):
+        """别名返回它指向的数据类，其余原样返回"""
+        return self.aliases().get(class_name, class_name)
+
+    def get(self, class_name):
+        """返回单个数据类（或别名指向的数据类）的定义（副本），不存在时返回 None"""
+        definition = self.classes().get(self.resolve(class_name))
+        return copy.deepcopy(definition) if definition is not None else None
+
+    def exists(self, class_name):
+        return self.resolve(class_name) in self.classes()
+
+    def invalidate(self):
+        """清空缓存（Schema 被其他途径修改后调用）"""
+        with self._lock:
+            self._classes = None
+            self._aliases = None
+
+    def diff(self, definitions):
+        classes = self.classes(refresh=True)
+        return diff_schema(definitions, classes, self._aliases)
+
+    def _fetch_aliases(self):
+        response = self.client.list_aliases()
+        if response.status_code in (404, 405):
+            # 不支持别名的旧版本
+            return {}
+        if response.status_code != 200:
+            raise RuntimeError(f"获取别名失败: HTTP {response.status_code} {response.text[:200]}")
+        return {item["alias"]: item["class"] for item in response.json().get("aliases") or []}
+
+    def apply(self, diff):
+        """执行 SchemaDiff 中的变更，失败时抛出 RuntimeError"""
+        try:
+            for definition in diff.missing_classes:
+                response = self.client.create_class(definition)
+                if response.status_code != 200:
+                    raise RuntimeError(f"创建数据类 {definition['class']} 失败: "
+                                       f"HTTP {response.status_code} {response.text[:200]}")
+            for class_name, prop in diff.missing_properties:
+                response = self.client.add_property(class_name, prop)
+                if response.status_code != 200:
+                    raise RuntimeError(f"添加属性 {class_name}.{prop['name']} 失败: "
+                                       f"HTTP {response.status_code} {response.text[:200]}")
+            for class_name, changes in diff.index_updates:
+                self._update_vector_index(class_name, changes)
+        finally:
+            self.invalidate()
+
+    def _update_vector_index(self, class_name, changes):
+        """合并索引参数后通过 PUT /v1/schema/{class} 更新"""
+        response = self.client.get_class(class_name)
+        if response.status_code != 200:
+            raise RuntimeError(f"获取数据类 {class_name} 失败: HTTP {response.status_code}")
+        definition = response.json()
+        index_config = definition.setdefault("vectorIndexConfig", {})
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(index_config.get(key), dict):
+                index_config[key] = {**index_config[key], **value}
+            else:
+                index_config[key] = value
+        response = self.client.update_class(class_name, definition)
+        if response.status_code != 200:
+            raise RuntimeError(f"更新 {class_name} 向量索引失败: "
+                               f"HTTP {response.status_code} {response.text[:200]}")
+
+    def migrate(self, definitions, dry_run=False):
+        """比较并只应用缺失的部分，返回 SchemaDiff"""
+        diff = self.diff(definitions)
+        if not dry_run and not diff.is_empty:
+            self.apply(diff)
+        return diff
+
+
+def fetch_class_definition(client, class_name):
+    """获取数据类定义；class_name 是别名时取它指向的数据类，失败时抛出 RuntimeError
+
+    返回的定义中类名仍是 class_name：导入按类名生成确定性 id（utils/upsert.py），
+    重建并切换别名前后必须一致。
+    """
+    response = client.get_alias(class_name)
+    target = response.json().get("class", class_name) if response.status_code == 200 else class_name
+    response = client.get_class(target)
+    if response.status_code != 200:
+        raise RuntimeError(f"获取 {class_name} Schema 失败: HTTP {response.status_code} {response.text[:200]}")
+    definition = response.json()
+    definition["class"] = class_name
+    return definition
@@ -0,0 +1,40 @@
+"""
+小型 JSON 状态文件（断点续传用）
+
+写入时先写临时文件再 os.replace 覆盖，进程在写入过程中被杀掉也不会留下
+半个 JSON：读到的要么是旧状态，要么是新状态。
+"""
+import json
+import os
+import tempfile
+
+
+def load_state(path, default=None):
+    """读取状态文件，不存在时返回 default"""
+    if not path or not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(path, state):
+    """原子地写入状态文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def remove_state(path):
+    """删除状态文件（不存在时忽略）"""
+    if path and os.path.exists(path):
+        os.unlink(path)
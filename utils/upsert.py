@@ -0,0 +1,165 @@
+"""
+幂等导入：确定性 UUID + 内容哈希
+
+- 对象 id 由数据类名和自然键（如电影的 title + year）通过 uuid5 生成，
+  同一条记录无论导入多少次都写到同一个对象上，不会产生重复。
+- 每个对象保存 contentHash 属性（属性值的 SHA-256）。导入前按批查询已有对象的哈希，
+  哈希相同的记录直接跳过（不写入、不向量化），只有新增和变化的记录才会写入。
+- 哈希之前属性先按 Schema 经 PropertyMapper 规范化（如日期统一为 RFC3339），
+  与 utils/partial_update.py 从服务器读回的值使用同一种形式，两条写入路径算出的哈希一致。
+- /v1/batch/objects 对已存在的 id 是整体替换，因此变化的记录直接批量写入即可。
+
+用法:
+    with BatchImporter(client) as importer:
+        upsert = upsert_objects(importer, "Movie", records, key_fields=("title", "year"))
+    print(upsert)
+"""
+import hashlib
+import json
+import uuid
+from collections import deque
+
+from utils.data_loader import PropertyMapper
+from utils.query_builder import Filter, GetQuery
+from utils.schema import fetch_class_definition
+
+# 固定的命名空间：改变它会改变所有对象的 id
+NAMESPACE = uuid.UUID("8f6c1a52-3d1e-5b7a-9c4e-2f0d6b8a7e31")
+
+HASH_PROPERTY = "contentHash"
+
+# 添加到数据类定义中的哈希属性（不参与向量化，只用于比较）
+HASH_PROPERTY_DEFINITION = {
+    "name": HASH_PROPERTY,
+    "dataType": ["text"],
+    "description": "属性内容的 SHA-256（用于跳过未变化的记录）",
+    "tokenization": "field",
+    "indexSearchable": False,
+    "moduleConfig": {
+        "text2vec-ollama": {
+            "skip": True
+        }
+    }
+}
+
+
+def _canonical(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def object_uuid(class_name, properties, key_fields):
+    """按数据类名和自然键生成确定性的 uuid5"""
+    missing = [field for field in key_fields if properties.get(field) is None]
+    if missing:
+        raise ValueError(f"{class_name} 记录缺少自然键字段 {missing}: {properties}")
+    key = [properties[field] for field in key_fields]
+    return str(uuid.uuid5(NAMESPACE, f"{class_name}:{_canonical(key)}"))
+
+
+def content_hash(properties):
+    """属性内容的哈希（不含 contentHash 本身，与键的顺序无关）"""
+    content = {key: value for key, value in properties.items() if key != HASH_PROPERTY}
+    return hashlib.sha256(_canonical(content).encode("utf-8")).hexdigest()
+
+
+def fetch_hashes(client, class_name, ids):
+    """批量查询已有对象的 contentHash，返回 {id: 哈希}（不存在的 id 不在结果中）"""
+    if not ids:
+        return {}
+    query = GetQuery(class_name, [HASH_PROPERTY], where=Filter.by_id().contains_any(ids),
+                     limit=len(ids), additional=["id"])
+    return {item["_additional"]["id"]: item.get(HASH_PROPERTY) for item in client.search(query)}
+
+
+class UpsertStats:
+    """幂等导入统计"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    @property
+    def written(self):
+        return self.created + self.updated
+
+    def __str__(self):
+        return f"UpsertStats(created={self.created}, updated={self.updated}, unchanged={self.unchanged})"
+
+
+class ChangeDetector:
+    """给记录分配确定性 id 和内容哈希，过滤掉服务器上已经是最新的记录
+
+    记录按 lookup_batch_size 分组，每组只发一次查询。
+    没有传入 class_definition 时从服务器读取一次 Schema，用于哈希前的规范化。
+    """
+
+    def __init__(self, client, class_name, key_fields, lookup_batch_size=100, class_definition=None):
+        if not key_fields:
+            raise ValueError("至少需要一个自然键字段")
+        self.client = client
+        self.class_name = class_name
+        self.key_fields = tuple(key_fields)
+        self.lookup_batch_size = lookup_batch_size
+        self.mapper = PropertyMapper(class_definition) if class_definition is not None else None
+        self.stats = UpsertStats()
+
+    def normalize(self, properties):
+        """按 Schema 规范化属性值（只用于计算哈希，写入的仍是原始记录）"""
+        if self.mapper is None:
+            self.mapper = PropertyMapper(fetch_class_definition(self.client, self.class_name))
+        return self.mapper.map(properties)
+
+    def changed(self, records):
+        """生成器：产出需要写入的 (uuid, properties)，properties 中已带 contentHash"""
+        chunk = []
+        for properties in records:
+            chunk.append(properties)
+            if len(chunk) >= self.lookup_batch_size:
+                yield from self._filter(chunk)
+                chunk = []
+        if chunk:
+            yield from self._filter(chunk)
+
+    def _filter(self, chunk):
+        # 同一组内出现重复的键时以最后一条为准
+        pending = {}
+        for properties in chunk:
+            object_id = object_uuid(self.class_name, properties, self.key_fields)
+            pending[object_id] = {**properties, HASH_PROPERTY: content_hash(self.normalize(properties))}
+
+        existing = fetch_hashes(self.client, self.class_name, list(pending))
+        for object_id, properties in pending.items():
+            if object_id not in existing:
+                self.stats.created += 1
+            elif existing[object_id] != properties[HASH_PROPERTY]:
+                self.stats.updated += 1
+            else:
+                self.stats.unchanged += 1
+                continue
+            yield object_id, properties
+
+
+def upsert_objects(importer, class_name, records, key_fields, vectorizer=None, lookup_batch_size=100,
+                   class_definition=None):
+    """幂等导入：只写入新增和变化的记录（也只为它们计算向量），返回 UpsertStats
+
+    importer 为 BatchImporter / ConcurrentBatchImporter，导入统计见 importer.stats。
+    """
+    detector = ChangeDetector(importer.client, class_name, key_fields, lookup_batch_size, class_definition)
+    changed = detector.changed(records)
+    if vectorizer is None:
+        for object_id, properties in changed:
+            importer.add(class_name, properties, uuid=object_id)
+    else:
+        ids = deque()
+
+        def with_ids():
+            for object_id, properties in changed:
+                ids.append(object_id)
+                yield properties
+
+        for properties, vector in vectorizer.vectorize(with_ids()):
+            importer.add(class_name, properties, uuid=ids.popleft(), vector=vector)
+    importer.finish()
+    return detector.stats
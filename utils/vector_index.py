@@ -0,0 +1,126 @@
+"""
+向量索引配置（vectorIndexType / vectorIndexConfig）
+
+不设置时 Weaviate 使用默认的 HNSW + 未压缩向量。这里用函数生成索引配置，
+写进 config/schema_definitions.py 中的数据类定义：
+
+    MOVIE_CLASS = with_vector_index(MOVIE_CLASS, hnsw_config(ef=128, quantizer=sq()))
+
+参数说明（HNSW）:
+- ef               查询时的候选集大小，越大召回越高、延迟越高；-1 表示动态 ef
+- dynamic_ef_*     动态 ef: ef = clamp(limit * factor, min, max)
+- ef_construction  建索引时的候选集大小，影响索引质量和导入速度（创建后不可修改）
+- max_connections  每个节点的最大邻居数，影响召回和内存（创建后不可修改）
+
+量化（压缩）:
+- pq  乘积量化，每个向量压缩为 segments 个字节（需要训练，training_limit 个对象后生效）
+- bq  二值量化，每个维度 1 bit（压缩 32 倍），适合高维向量，依赖 rescore 保证召回
+- sq  标量量化，每个维度 1 字节（压缩 4 倍）
+
+flat 索引不建图，只做暴力搜索（可配合 BQ），适合小数据量或多租户的小租户。
+"""
+import copy
+
+# 创建后仍可通过 PUT /v1/schema/{class} 修改的索引参数
+MUTABLE_INDEX_KEYS = ("ef", "dynamicEfMin", "dynamicEfMax", "dynamicEfFactor", "flatSearchCutoff",
+                      "vectorCacheMaxObjects", "pq", "bq", "sq")
+
+
+def pq(segments=0, centroids=256, training_limit=100000, encoder="kmeans"):
+    """乘积量化；segments=0 表示由 Weaviate 按维度自动选择"""
+    return "pq", {
+        "enabled": True,
+        "segments": segments,
+        "centroids": centroids,
+        "trainingLimit": training_limit,
+        "encoder": {"type": encoder},
+    }
+
+
+def bq(rescore_limit=None):
+    """二值量化"""
+    config = {"enabled": True}
+    if rescore_limit is not None:
+        config["rescoreLimit"] = rescore_limit
+    return "bq", config
+
+
+def sq(training_limit=100000, rescore_limit=None):
+    """标量量化"""
+    config = {"enabled": True, "trainingLimit": training_limit}
+    if rescore_limit is not None:
+        config["rescoreLimit"] = rescore_limit
+    return "sq", config
+
+
+def hnsw_config(ef=-1, ef_construction=128, max_connections=32, dynamic_ef_min=100,
+                dynamic_ef_max=500, dynamic_ef_factor=8, distance="cosine", quantizer=None):
+    """HNSW 索引配置（默认值与 Weaviate 一致）"""
+    config = {
+        "distance": distance,
+        "ef": ef,
+        "efConstruction": ef_construction,
+        "maxConnections": max_connections,
+        "dynamicEfMin": dynamic_ef_min,
+        "dynamicEfMax": dynamic_ef_max,
+        "dynamicEfFactor": dynamic_ef_factor,
+    }
+    if quantizer is not None:
+        name, quantizer_config = quantizer
+        config[name] = quantizer_config
+    return "hnsw", config
+
+
+def flat_config(distance="cosine", quantizer=None, vector_cache_max_objects=None):
+    """flat 索引配置（只支持 BQ 量化）"""
+    config = {"distance": distance}
+    if quantizer is not None:
+        name, quantizer_config = quantizer
+        if name != "bq":
+            raise ValueError(f"flat 索引只支持 bq 量化，不支持 {name}")
+        config[name] = quantizer_config
+    if vector_cache_max_objects is not None:
+        config["vectorCacheMaxObjects"] = vector_cache_max_objects
+    return "flat", config
+
+
+def with_vector_index(definition, index):
+    """返回带有向量索引配置的数据类定义副本；index 为 hnsw_config()/flat_config() 的返回值"""
+    index_type, index_config = index
+    definition = copy.deepcopy(definition)
+    definition["vectorIndexType"] = index_type
+    definition["vectorIndexConfig"] = copy.deepcopy(index_config)
+    return definition
+
+
+def enabled_quantizer(index_config):
+    """返回启用的量化方式名称（pq/bq/sq），未压缩时返回 None"""
+    for name in ("pq", "bq", "sq"):
+        if (index_config.get(name) or {}).get("enabled"):
+            return name
+    return None
+
+
+def estimate_memory(num_objects, dims, index_type="hnsw", index_config=None):
+    """粗略估算向量索引的常驻内存（字节）
+
+    - 向量: 未压缩 4 字节/维；SQ 1 字节/维；BQ 1 bit/维；PQ 每个 segment 1 字节
+      （压缩后原始向量仍保存在磁盘上用于 rescore，不计入内存）
+    - HNSW 图: 第 0 层每个节点最多 2 * maxConnections 个邻居，每个邻居 8 字节
+    """
+    index_config = index_config or {}
+    quantizer = enabled_quantizer(index_config)
+    if quantizer == "pq":
+        segments = index_config["pq"].get("segments") or max(1, dims // 4)
+        vector_bytes = segments
+    elif quantizer == "bq":
+        vector_bytes = (dims + 7) // 8
+    elif quantizer == "sq":
+        vector_bytes = dims
+    else:
+        vector_bytes = dims * 4
+
+    graph_bytes = 0
+    if index_type == "hnsw":
+        graph_bytes = 2 * index_config.get("maxConnections", 32) * 8
+    return num_objects * (vector_bytes + graph_bytes)
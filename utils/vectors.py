@@ -0,0 +1,83 @@
+"""
+float32 向量的输入 / 输出
+
+REST 接口中的向量是 JSON 浮点数列表，逐个转换成 Python float 既慢又占内存。
+这里把一页结果的向量一次性转换成连续的 float32 矩阵（numpy），
+并让写入侧（nearVector、批量导入）直接接受 numpy 数组。
+gRPC 接口返回的 vector_bytes（小端 float32）可以用 from_bytes 零拷贝转换。
+
+用法:
+    for page in iter_vector_pages(client, "Movie", page_size=500):
+        page.vectors          # shape = (len(page), dims) 的 float32 矩阵
+        page.objects[i]["id"] # 对应第 i 行
+"""
+import numpy as np
+
+from utils.object_iterator import iter_pages, prefetched
+
+
+def to_float32(vector):
+    """把列表或 numpy 数组转换为一维 float32 数组"""
+    return np.asarray(vector, dtype=np.float32)
+
+
+def to_list(vector):
+    """把向量转换为 JSON 可序列化的 float 列表（numpy 数组走 tolist 的 C 实现）"""
+    if hasattr(vector, "tolist"):
+        return vector.tolist()
+    return [float(x) for x in vector]
+
+
+def from_bytes(data, dims=None):
+    """把小端 float32 字节串转换为 numpy 数组（不复制）；给出 dims 时返回二维矩阵"""
+    vector = np.frombuffer(data, dtype="<f4")
+    return vector.reshape(-1, dims) if dims else vector
+
+
+def stack(vectors):
+    """把多个向量合成一个连续的 float32 矩阵"""
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+
+
+class VectorPage:
+    """一页对象: objects 为去掉向量后的对象列表，vectors 为对应的 float32 矩阵"""
+
+    def __init__(self, objects, vectors):
+        self.objects = objects
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.objects)
+
+    @property
+    def ids(self):
+        return [obj["id"] for obj in self.objects]
+
+    @classmethod
+    def from_objects(cls, objects):
+        """从 REST 返回的对象列表构建（没有向量的对象会被跳过）"""
+        objects = [obj for obj in objects if obj.get("vector")]
+        vectors = stack([obj.pop("vector") for obj in objects])
+        return cls(objects, vectors)
+
+
+def iter_vector_pages(client, class_name, page_size=500, after=None, tenant=None, prefetch=1):
+    """生成器：按 after 游标逐页产出 VectorPage（可预取下一页）"""
+    pages = iter_pages(client, class_name, page_size, include_vector=True, after=after, tenant=tenant)
+    for objects in prefetched(pages, prefetch, name=f"prefetch-{class_name}"):
+        yield VectorPage.from_objects(objects)
+
+
+def load_vectors(client, class_name, page_size=500, tenant=None):
+    """读取整个数据类的向量，返回 (ids, float32 矩阵)"""
+    ids = []
+    blocks = []
+    for page in iter_vector_pages(client, class_name, page_size, tenant=tenant):
+        ids.extend(page.ids)
+        blocks.append(page.vectors)
+    blocks = [block for block in blocks if block.size]
+    if not blocks:
+        return ids, np.empty((0, 0), dtype=np.float32)
+    return ids, np.concatenate(blocks)
@@ -0,0 +1,354 @@
+"""
+共享的 Weaviate HTTP 客户端
+
+所有示例脚本共用同一个客户端，底层使用 requests.Session + 连接池：
+TCP 连接在多次请求之间复用（keep-alive），避免每次调用都重新握手。
+"""
+import hashlib
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.weaviate_config import config as default_config
+from utils.async_client import AsyncWeaviateClient, BackgroundLoop
+from utils.grpc_transport import GrpcUnavailable, GrpcUnsupported, create_grpc_transport
+from utils.grpc_transport import supports as grpc_supports
+from utils.object_iterator import iter_objects
+from utils.query_builder import AggregateQuery
+from utils.query_cache import make_key
+from utils.vectors import VectorPage, iter_vector_pages
+
+# 这些状态码通常是暂时性的，值得重试
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class WeaviateClient:
+    """基于连接池的 Weaviate REST/GraphQL 客户端"""
+
+    def __init__(self, weaviate_url=None, pool_connections=None, pool_maxsize=None,
+                 timeout=None, max_retries=None, weaviate_config=None, query_cache=None,
+                 grpc_transport=None):
+        weaviate_config = weaviate_config or default_config
+        pool_config = weaviate_config.get_pool_config()
+        connection_params = weaviate_config.get_connection_params()
+
+        self.weaviate_url = (weaviate_url or connection_params["url"]).rstrip("/")
+        self.headers = {"Content-Type": "application/json"}
+        self.timeout = timeout or connection_params["timeout_config"]
+
+        if pool_connections is None:
+            pool_connections = pool_config["pool_connections"]
+        if pool_maxsize is None:
+            pool_maxsize = pool_config["pool_maxsize"]
+        if max_retries is None:
+            max_retries = pool_config["max_retries"]
+
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.session = create_session(pool_connections, pool_maxsize, max_retries)
+        # 可选的查询结果缓存（utils.query_cache.QueryCache）
+        self.query_cache = query_cache
+        # 可选的 gRPC 传输（utils.grpc_transport.GrpcTransport），为 None 时全部走 REST
+        self.grpc = grpc_transport or create_grpc_transport(weaviate_config, self.weaviate_url)
+        # 并发导入时多个线程可能同时决定停用 gRPC
+        self._grpc_lock = threading.Lock()
+        # gather() 使用的异步客户端和后台事件循环（第一次调用时创建，之后复用）
+        self._async = None
+        self._async_lock = threading.Lock()
+
+    def _request(self, method, path, **kwargs):
+        """发送请求（复用连接池中的连接）"""
+        kwargs.setdefault("timeout", self.timeout)
+        if "json" in kwargs:
+            kwargs.setdefault("headers", self.headers)
+        response = self.session.request(method, f"{self.weaviate_url}{path}", **kwargs)
+
+        # 写操作完成后清空查询缓存（GraphQL 在 Weaviate 中是只读的）
+        if self.query_cache is not None and method != "GET" and path != "/v1/graphql":
+            self.query_cache.invalidate()
+        return response
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+        if self.grpc is not None:
+            self.grpc.close()
+        if self._async is not None:
+            loop, async_client = self._async
+            self._async = None
+            loop.run(async_client.aclose())
+            loop.close()
+
+    def disable_grpc(self):
+        """gRPC 不可用时改为只使用 REST
+
+        其他线程仍在这个通道上的调用会以 CANCELLED 结束，GrpcTransport 会把它们转成
+        GrpcUnavailable，由调用方改走 REST 重发。
+        """
+        with self._grpc_lock:
+            transport, self.grpc = self.grpc, None
+        if transport is not None:
+            transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ============ 元信息 ============
+
+    def get_meta(self):
+        """获取服务器元信息"""
+        return self._request("GET", "/v1/meta")
+
+    # ============ Schema ============
+
+    def create_class(self, class_definition):
+        """创建数据类"""
+        return self._request("POST", "/v1/schema", json=class_definition)
+
+    def list_classes(self):
+        """列出所有数据类"""
+        return self._request("GET", "/v1/schema")
+
+    def get_class(self, class_name):
+        """获取单个数据类定义"""
+        return self._request("GET", f"/v1/schema/{class_name}")
+
+    def update_class(self, class_name, class_definition):
+        """更新数据类（只有部分配置可以在线修改，如 ef、量化）"""
+        return self._request("PUT", f"/v1/schema/{class_name}", json=class_definition)
+
+    def add_property(self, class_name, property_definition):
+        """为已有数据类添加属性（已有数据不受影响）"""
+        return self._request("POST", f"/v1/schema/{class_name}/properties", json=property_definition)
+
+    def delete_class(self, class_name):
+        """删除数据类"""
+        return self._request("DELETE", f"/v1/schema/{class_name}")
+
+    # ============ 别名 ============
+
+    def list_aliases(self):
+        """列出所有别名（Weaviate 1.32+）"""
+        return self._request("GET", "/v1/aliases")
+
+    def get_alias(self, alias):
+        """获取别名指向的数据类（Weaviate 1.32+）"""
+        return self._request("GET", f"/v1/aliases/{alias}")
+
+    def create_alias(self, alias, class_name):
+        """创建别名：查询 / 写入 alias 等价于操作 class_name"""
+        return self._request("POST", "/v1/aliases", json={"alias": alias, "class": class_name})
+
+    def update_alias(self, alias, class_name):
+        """把别名原子地切换到另一个数据类"""
+        return self._request("PUT", f"/v1/aliases/{alias}", json={"class": class_name})
+
+    def delete_alias(self, alias):
+        """删除别名（不影响数据类）"""
+        return self._request("DELETE", f"/v1/aliases/{alias}")
+
+    # ============ 对象 ============
+
+    def create_object(self, class_name, data_object, vector=None):
+        """创建单个对象（可附带客户端计算的向量）"""
+        payload = {
+            "class": class_name,
+            "properties": data_object
+        }
+        if vector is not None:
+            payload["vector"] = vector.tolist() if hasattr(vector, "tolist") else vector
+        return self._request("POST", "/v1/objects", json=payload)
+
+    def patch_object(self, class_name, object_id, properties, tenant=None):
+        """局部更新对象（PATCH 只合并给出的属性，未给出的属性和向量保持不变）"""
+        payload = {
+            "class": class_name,
+            "id": object_id,
+            "properties": properties
+        }
+        if tenant:
+            payload["tenant"] = tenant
+        return self._request("PATCH", f"/v1/objects/{class_name}/{object_id}", json=payload)
+
+    def batch_create_objects(self, objects):
+        """批量创建对象"""
+        payload = {"objects": objects}
+        return self._request("POST", "/v1/batch/objects", json=payload)
+
+    def batch_create_objects_encoded(self, body):
+        """批量创建对象（请求体已序列化为 JSON bytes）"""
+        return self._request("POST", "/v1/batch/objects", data=body, headers=self.headers)
+
+    def batch_create_objects_grpc(self, objects):
+        """通过 gRPC 批量创建对象，返回 (失败对象的 (下标, 错误信息) 列表, 请求字节数)"""
+        transport = self.grpc
+        if transport is None:
+            raise GrpcUnavailable("gRPC 传输已停用")
+        result = transport.batch_objects(objects)
+        if self.query_cache is not None:
+            self.query_cache.invalidate()
+        return result
+
+    def batch_delete_objects(self, class_name, where, dry_run=False, verbose=False, tenant=None):
+        """按 where 条件批量删除对象（DELETE /v1/batch/objects，where 为 Filter.to_dict() 的结果）"""
+        payload = {
+            "match": {"class": class_name, "where": where},
+            "dryRun": dry_run,
+            "output": "verbose" if verbose else "minimal",
+        }
+        params = {"tenant": tenant} if tenant else None
+        return self._request("DELETE", "/v1/batch/objects", json=payload, params=params)
+
+    def get_object_count(self, class_name, tenant=None, where=None):
+        """获取对象数量（Aggregate meta count；totalResults 只是当前页的数量）"""
+        query = AggregateQuery(class_name, where=where, tenant=tenant)
+        return query.count(query.execute(self))
+
+    def list_objects(self, class_name, limit=10):
+        """列出对象"""
+        params = {
+            "class": class_name,
+            "limit": limit,
+            "include": ["vector"]
+        }
+        return self._request("GET", "/v1/objects", params=params)
+
+    def get_objects_page(self, class_name, limit, after=None, include_vector=False, tenant=None):
+        """按 after 游标读取一页对象"""
+        params = {"class": class_name, "limit": limit}
+        if after:
+            params["after"] = after
+        if include_vector:
+            params["include"] = "vector"
+        if tenant:
+            params["tenant"] = tenant
+        return self._request("GET", "/v1/objects", params=params)
+
+    def iter_objects(self, class_name, page_size=100, include_vector=False, prefetch=1):
+        """用 after 游标遍历整个数据类（生成器，后台预取下一页）"""
+        return iter_objects(self, class_name, page_size=page_size,
+                            include_vector=include_vector, prefetch=prefetch)
+
+    def list_vectors(self, class_name, limit=10, after=None, tenant=None):
+        """读取一页对象及其向量，返回 VectorPage（向量为 float32 矩阵）"""
+        response = self.get_objects_page(class_name, limit, after=after, include_vector=True, tenant=tenant)
+        if response.status_code != 200:
+            raise RuntimeError(f"读取 {class_name} 失败: HTTP {response.status_code} {response.text[:200]}")
+        return VectorPage.from_objects(response.json().get("objects") or [])
+
+    def iter_vector_pages(self, class_name, page_size=500, prefetch=1):
+        """逐页遍历整个数据类的向量（生成器，产出 VectorPage）"""
+        return iter_vector_pages(self, class_name, page_size=page_size, prefetch=prefetch)
+
+    def get_objects_rest(self, class_name, limit=5, where_clause=None):
+        """REST查询对象"""
+        params = {"class": class_name, "limit": limit}
+
+        if where_clause:
+            params["where"] = where_clause
+
+        return self._request("GET", "/v1/objects", params=params)
+
+    # ============ 查询 ============
+
+    def search(self, query):
+        """执行 GetQuery 并返回结果列表
+
+        启用 gRPC 且查询受支持时走 gRPC（向量以 float32 numpy 数组返回），
+        否则走 GraphQL。gRPC 无法表达的查询只有这一个走 GraphQL，
+        传输层不可用时才停用 gRPC。
+        """
+        transport = self.grpc
+        if transport is not None and grpc_supports(query):
+            try:
+                return transport.search(query)
+            except GrpcUnsupported:
+                pass
+            except GrpcUnavailable:
+                self.disable_grpc()
+        response = query.execute(self)
+        if response.status_code != 200:
+            raise RuntimeError(f"查询 {query.class_name} 失败: HTTP {response.status_code} {response.text[:200]}")
+        errors = response.json().get("errors")
+        if errors:
+            raise RuntimeError("; ".join(error.get("message", "") for error in errors))
+        return query.results(response)
+
+    def gather(self, queries, max_concurrency=None, return_exceptions=False):
+        """并发执行多条 GraphQL 查询，按输入顺序返回响应（见 AsyncWeaviateClient.gather）
+
+        异步客户端和事件循环只创建一次，与本客户端共用查询缓存、超时、连接池大小和重试次数。
+        """
+        with self._async_lock:
+            if self._async is None:
+                self._async = (BackgroundLoop(), AsyncWeaviateClient.from_client(self))
+            loop, async_client = self._async
+        return loop.run(async_client.gather(queries, max_concurrency, return_exceptions))
+
+    def graphql_query(self, query, variables=None):
+        """GraphQL查询（启用查询缓存时，相同的查询直接返回缓存结果）"""
+        if self.query_cache is None:
+            return self._graphql(query, variables)
+
+        if self.query_cache.needs_validation():
+            self.query_cache.validate(self.data_fingerprint())
+
+        key = make_key(query, variables)
+        response = self.query_cache.get(key)
+        if response is None:
+            response = self._graphql(query, variables)
+            # 只缓存成功且没有 GraphQL 错误的结果
+            if response.status_code == 200 and not response.json().get("errors"):
+                self.query_cache.put(key, response)
+        return response
+
+    def _graphql(self, query, variables=None):
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        return self._request("POST", "/v1/graphql", json=payload)
+
+    def data_fingerprint(self):
+        """Schema + 各数据类对象数量的指纹，用于判断查询缓存是否失效"""
+        response = self.list_classes()
+        if response.status_code != 200:
+            return None
+        schema = response.json()
+        class_names = sorted(cls["class"] for cls in schema.get("classes", []))
+
+        counts = {}
+        if class_names:
+            body = " ".join(f"{name} {{ meta {{ count }} }}" for name in class_names)
+            result = self._graphql(f"{{ Aggregate {{ {body} }} }}")
+            if result.status_code == 200:
+                counts = (result.json().get("data") or {}).get("Aggregate") or {}
+
+        raw = json.dumps([schema, counts], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def create_session(pool_connections=10, pool_maxsize=20, max_retries=3):
+    """创建带连接池和重试策略的 requests.Session"""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.3,
+        status_forcelist=RETRY_STATUS_CODES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session